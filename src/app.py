@@ -1,10 +1,36 @@
 import argparse
 import logging
+import sys
 from os import getenv
+from typing import List, Optional
 
 from dotenv import load_dotenv
 
-from src.crawler.core import YahooFinanceCrawler
+from src.crawler.backends import BACKENDS, DEFAULT_BACKEND, load_backend
+from src.crawler.base import EXTRACT_MODES
+from src.crawler.blocking import (
+    BLOCKING_PROFILES,
+    DEFAULT_PROFILE,
+    compare_profiles,
+    log_comparison,
+)
+from src.crawler.client import DEFAULT_PORT, DEFAULT_QUERY_PORT, submit
+from src.crawler.filter_cache import DEFAULT_TTL_HOURS
+from src.crawler.health import DEFAULT_MAX_ERROR_RATE, DEFAULT_MAX_SLOWDOWN
+from src.crawler.jobs import DEFAULT_LEASE_SECONDS, JOBS_PATH
+from src.crawler.metrics import write_run_report
+from src.crawler.parsing import HTML_PARSER, PARSERS
+from src.crawler.pool import (
+    RegionResult,
+    crawl_region,
+    crawl_regions,
+    exit_status,
+    log_summary,
+    read_regions_file,
+)
+from src.crawler.retry import DEFAULT_FAILURE_THRESHOLD
+from src.crawler.sinks import OUTPUT_DIR, SINKS, SNAPSHOT_READERS
+from src.crawler.store import CONFLICT_POLICIES, KEEP_FIRST
 
 load_dotenv()
 
@@ -16,7 +42,80 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
+def daemon_result(region: str, response: dict) -> RegionResult:
+    return RegionResult(
+        region=region,
+        rows=response.get('rows', 0),
+        seconds=response.get('seconds', 0.0),
+        error=None if response['ok'] else response.get('error'),
+    )
+
+
+def submit_to_daemon(region: str, port: int, options: dict) -> RegionResult:
+    """Run one region on the local daemon and report it like a worker."""
+    response = submit({'region': region, 'options': options}, port=port)
+    return daemon_result(region, response)
+
+
+def run_schedule(args, base_url: str, crawler_class: type, options: dict):
+    """Run the jobs of --schedule in this process until interrupted.
+
+    The selenium backend keeps one warm browser session per concurrent
+    job (as the daemon does) and reuses them across runs; with --submit
+    the jobs go to a running daemon instead. Job options override the
+    command line ones.
+    """
+    from src.crawler.scheduler import Scheduler, load_schedule  # noqa: PLC0415
+
+    jobs, max_concurrency = load_schedule(args.schedule)
+    daemon = None
+    if args.submit:
+
+        def run_job(region: str, job_options: dict) -> RegionResult:
+            return submit_to_daemon(
+                region, args.daemon_port, {**options, **job_options}
+            )
+
+    elif args.backend == 'selenium':
+        from src.crawler.daemon import CrawlerDaemon  # noqa: PLC0415
+
+        daemon = CrawlerDaemon(
+            base_url,
+            sessions=max_concurrency,
+            recycle_after=args.recycle_after,
+            headless=options['headless'],
+            block_profile=args.block_profile,
+        )
+        daemon.warm_up()
+
+        def run_job(region: str, job_options: dict) -> RegionResult:
+            response = daemon.run_job({
+                'region': region,
+                'options': {**options, **job_options},
+            })
+            return daemon_result(region, response)
+
+    else:
+
+        def run_job(region: str, job_options: dict) -> RegionResult:
+            return crawl_region(
+                region,
+                base_url,
+                crawler_class=crawler_class,
+                **{**options, **job_options},
+            )
+
+    scheduler = Scheduler(jobs, run_job, max_concurrency=max_concurrency)
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        logger.info('Scheduler stopped.')
+    finally:
+        if daemon is not None:
+            daemon.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description='Yahoo Finance Crawler')
     parser.add_argument(
         '--region',
@@ -24,25 +123,528 @@ def main():
         default='Brazil',
         help='Region to filter (e.g., "United States", "Argentina")',
     )
+    parser.add_argument(
+        '--regions',
+        nargs='+',
+        metavar='REGION',
+        help='Crawl several regions in parallel (overrides --region)',
+    )
+    parser.add_argument(
+        '--regions-file',
+        help='File with one region per line to crawl in parallel',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help=(
+            'Number of worker processes (one browser each) used with '
+            '--regions/--regions-file. Defaults to the number of CPUs'
+        ),
+    )
+    parser.add_argument(
+        '--backend',
+        choices=tuple(BACKENDS),
+        default=DEFAULT_BACKEND,
+        help=(
+            'selenium drives Chrome through the screener page, http reads '
+            'the screener data directly without a browser, replay parses '
+            'pages saved by a --record run'
+        ),
+    )
+    parser.add_argument(
+        '--record',
+        action='store_true',
+        help=(
+            'Save the HTML of every scraped page to cdn/recordings so the '
+            'run can be replayed with --backend replay'
+        ),
+    )
+    parser.add_argument(
+        '--replay-manifest',
+        metavar='PATH',
+        help=(
+            'Recording manifest to replay (default: the latest one of the '
+            'region)'
+        ),
+    )
+    parser.add_argument(
+        '--replay-workers',
+        type=int,
+        default=1,
+        help='Processes parsing recorded pages in parallel during a replay',
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=0,
+        help=(
+            'Processes parsing captured pages while the browser moves on to '
+            'the next one (selenium backend, sequential pagination). '
+            '0 parses in line'
+        ),
+    )
+    parser.add_argument(
+        '--tabs',
+        type=int,
+        default=1,
+        help=(
+            'Number of browser tabs loading pages by offset at the same '
+            'time (selenium backend). 1 clicks through pages sequentially'
+        ),
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=None,
+        help=(
+            'Retries after the first attempt of each page operation '
+            '(navigation, region filter, rows per page, extraction, next '
+            'page), so 3 means up to 4 attempts. Default: per operation'
+        ),
+    )
+    parser.add_argument(
+        '--failure-threshold',
+        type=int,
+        default=DEFAULT_FAILURE_THRESHOLD,
+        help=(
+            'Failed attempts in a row after which a region is aborted '
+            '(0 never aborts)'
+        ),
+    )
+    parser.add_argument(
+        '--restart-after-pages',
+        type=int,
+        default=0,
+        metavar='PAGES',
+        help=(
+            'Restart the browser mid-run after this many pages '
+            '(selenium backend; 0 only restarts it when it is unhealthy)'
+        ),
+    )
+    parser.add_argument(
+        '--max-browser-mb',
+        type=float,
+        metavar='MB',
+        help=(
+            'Restart the browser mid-run when its processes use more memory '
+            'than this (Linux only; not checked with --tabs). '
+            'Default: no memory limit'
+        ),
+    )
+    parser.add_argument(
+        '--max-slowdown',
+        type=float,
+        default=DEFAULT_MAX_SLOWDOWN,
+        metavar='TIMES',
+        help=(
+            'Restart the browser mid-run when pages load this many times '
+            'slower than its first pages (0 disables)'
+        ),
+    )
+    parser.add_argument(
+        '--max-error-rate',
+        type=float,
+        default=DEFAULT_MAX_ERROR_RATE,
+        metavar='RATE',
+        help=(
+            'Restart the browser mid-run when this share of the last pages '
+            'needed retries (0 disables)'
+        ),
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help=(
+            'Write rows to disk page by page instead of keeping them all in '
+            'memory until the end'
+        ),
+    )
+    parser.add_argument(
+        '--output',
+        choices=tuple(SINKS),
+        default='csv',
+        help=(
+            'Output format: csv, ndjson, parquet (typed columns, needs '
+            'pyarrow) or sqlite (appends to cdn/yahoo_finance_crawler.sqlite)'
+        ),
+    )
+    parser.add_argument(
+        '--delta',
+        action='store_true',
+        help=(
+            'Compare with the previous snapshot of the region and write only '
+            'added/changed/removed rows plus a changelog'
+        ),
+    )
+    parser.add_argument(
+        '--delta-stop-after',
+        type=int,
+        metavar='PAGES',
+        help='With --delta, stop after this many pages without changes',
+    )
+    parser.add_argument(
+        '--checkpoint',
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=(
+            'Save progress to cdn/.checkpoints after each page so an '
+            'interrupted run can be resumed (default: enabled)'
+        ),
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue from the checkpoint left by an interrupted run',
+    )
+    parser.add_argument(
+        '--filter-cache',
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=(
+            'Reuse the filtered screener URL learned by an earlier run '
+            'instead of clicking through the Region menu (default: enabled)'
+        ),
+    )
+    parser.add_argument(
+        '--filter-cache-ttl',
+        type=float,
+        default=DEFAULT_TTL_HOURS,
+        metavar='HOURS',
+        help='Hours a cached filter URL is trusted (default: 24)',
+    )
+    parser.add_argument(
+        '--block-profile',
+        choices=tuple(BLOCKING_PROFILES),
+        default=DEFAULT_PROFILE,
+        help=(
+            'Resources Chrome refuses to download: off, default (images, '
+            'fonts, media, ads and trackers) or strict (also non-essential '
+            'widget scripts)'
+        ),
+    )
+    parser.add_argument(
+        '--measure-weight',
+        action='store_true',
+        help='Log the requests and bytes transferred for each page',
+    )
+    parser.add_argument(
+        '--compare-blocking',
+        action='store_true',
+        help=(
+            'Load the screener once with each blocking profile, log what '
+            'each one saves and exit'
+        ),
+    )
+    parser.add_argument(
+        '--metrics',
+        action='store_true',
+        help=(
+            'Write a JSON report and a Prometheus .prom file with per-phase '
+            'and per-page timings to cdn/metrics'
+        ),
+    )
+    parser.add_argument(
+        '--schedule',
+        metavar='FILE',
+        help=(
+            'Run the recurring crawls described in this TOML file, in this '
+            'process, until interrupted'
+        ),
+    )
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help=(
+            'Keep warm browser sessions open and serve crawl jobs on a '
+            'local socket instead of crawling once'
+        ),
+    )
+    parser.add_argument(
+        '--submit',
+        action='store_true',
+        help='Send the crawl to a running --daemon instead of starting Chrome',
+    )
+    parser.add_argument(
+        '--daemon-port',
+        type=int,
+        default=DEFAULT_PORT,
+        help=f'Local port of the daemon (default: {DEFAULT_PORT})',
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help=(
+            'Serve the latest snapshot of every region in cdn/ over a local '
+            'HTTP query API, reloading new snapshots as they are written'
+        ),
+    )
+    parser.add_argument(
+        '--query-port',
+        type=int,
+        default=DEFAULT_QUERY_PORT,
+        help=f'Local port of the query API (default: {DEFAULT_QUERY_PORT})',
+    )
+    parser.add_argument(
+        '--sessions',
+        type=int,
+        default=1,
+        help='Number of warm browser sessions kept by the daemon',
+    )
+    parser.add_argument(
+        '--recycle-after',
+        type=int,
+        default=20,
+        metavar='JOBS',
+        help='Restart a daemon browser session after this many jobs',
+    )
+    parser.add_argument(
+        '--enqueue',
+        action='store_true',
+        help=(
+            'Add the regions as jobs to the --queue instead of crawling '
+            'them; --work processes on any host run them'
+        ),
+    )
+    parser.add_argument(
+        '--pages-per-job',
+        type=int,
+        metavar='PAGES',
+        help=(
+            'With --enqueue, split each region into jobs of this many pages '
+            '(default: one job per region)'
+        ),
+    )
+    parser.add_argument(
+        '--work',
+        action='store_true',
+        help=(
+            'Claim and run jobs from the --queue with --workers processes '
+            'until no job is left'
+        ),
+    )
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help=(
+            'Merge the rows of finished --queue jobs into one snapshot per '
+            'region'
+        ),
+    )
+    parser.add_argument(
+        '--queue',
+        metavar='FILE',
+        default=JOBS_PATH,
+        help=f'SQLite file shared by the job queue (default: {JOBS_PATH})',
+    )
+    parser.add_argument(
+        '--lease',
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        metavar='SECONDS',
+        help=(
+            'How long a job stays claimed without a heartbeat before another '
+            f'worker takes it over (default: {DEFAULT_LEASE_SECONDS:g})'
+        ),
+    )
     parser.add_argument(
         '--show-browser',
         action='store_true',
         help='Open the browser window visually (disable headless mode)',
     )
+    parser.add_argument(
+        '--on-duplicate',
+        choices=CONFLICT_POLICIES,
+        default=KEEP_FIRST,
+        help=(
+            'What to do when a symbol shows up again on a later page: '
+            'keep the first row, keep the last one or keep the last one '
+            'and flag price changes'
+        ),
+    )
+    parser.add_argument(
+        '--extract-mode',
+        choices=EXTRACT_MODES,
+        default='fragment',
+        help=(
+            'How to read the table from the browser: the whole page source, '
+            'only the table HTML fragment or the cell texts directly'
+        ),
+    )
+    parser.add_argument(
+        '--parser',
+        choices=PARSERS,
+        default=HTML_PARSER,
+        help='HTML parser backend used for the page and fragment modes',
+    )
+    return parser
+
+
+def read_regions(args) -> List[str]:
+    """The regions of --regions and --regions-file, in that order."""
+    regions = list(args.regions or [])
+    if args.regions_file:
+        regions.extend(read_regions_file(args.regions_file))
+    return regions
+
+
+def run_queue(args, base_url: Optional[str], options: dict) -> int:
+    """Handle --enqueue, --work and --merge; returns the exit status."""
+    from src.crawler.jobs import (  # noqa: PLC0415
+        JobQueue,
+        merge_jobs,
+        run_workers,
+    )
+
+    queue = JobQueue(args.queue, args.lease)
+    if args.enqueue:
+        regions = read_regions(args) or [args.region]
+        run_id = queue.enqueue(
+            regions, args.backend, options, args.pages_per_job
+        )
+        logger.info(
+            f'Queued {len(regions)} regions in {args.queue} (run {run_id}).'
+        )
+    if args.work:
+        run_workers(
+            queue,
+            base_url,
+            workers=args.workers or 1,
+            headless=options['headless'],
+        )
+    if not args.merge:
+        return 0
+    results = merge_jobs(queue, OUTPUT_DIR)
+    if results:
+        log_summary(results)
+    logger.info(f'Jobs by status: {queue.counts()}')
+    return exit_status(results)
+
+
+def main() -> Optional[int]:  # noqa: PLR0911
+    """Run the command line; returns 1 when a region of a batch failed."""
+    parser = build_parser()
     args = parser.parse_args()
+    if args.delta and args.output not in SNAPSHOT_READERS:
+        # The previous state is read back from the last snapshot file
+        parser.error(
+            f'--delta needs one snapshot file per run; use --output '
+            f'{" or ".join(SNAPSHOT_READERS)}, not {args.output}'
+        )
+    if args.stream and not args.delta and args.on_duplicate != KEEP_FIRST:
+        # A streamed row is already on disk when its symbol shows up again
+        parser.error(
+            f'--stream keeps the first row of each symbol and cannot be '
+            f'combined with --on-duplicate {args.on_duplicate}'
+        )
+
+    if args.serve:
+        from src.crawler.query import QueryServer  # noqa: PLC0415
+
+        QueryServer(OUTPUT_DIR, port=args.query_port).serve_forever()
+        return
 
     base_url = getenv('BASE_URL')
-    if not base_url:
+    # Replays read recorded pages and never open the site; queuing and
+    # merging jobs open nothing at all
+    needs_site = args.backend != 'replay' and (
+        args.work or not (args.enqueue or args.merge)
+    )
+    if not base_url and needs_site:
         logger.error('BASE_URL environment variable is not set')
         return
 
     is_headless = not args.show_browser
+    options = {
+        'headless': is_headless,
+        'conflict_policy': args.on_duplicate,
+        'extract_mode': args.extract_mode,
+        'parser': args.parser,
+        'tabs': args.tabs,
+        'parse_workers': args.parse_workers,
+        'retries': args.retries,
+        'failure_threshold': args.failure_threshold,
+        'restart_after_pages': args.restart_after_pages,
+        'max_browser_mb': args.max_browser_mb,
+        'max_slowdown': args.max_slowdown,
+        'max_error_rate': args.max_error_rate,
+        'stream': args.stream,
+        'output': args.output,
+        'delta': args.delta,
+        'delta_stop_after': args.delta_stop_after,
+        'checkpoint': args.checkpoint,
+        'resume': args.resume,
+        'filter_cache': args.filter_cache,
+        'filter_cache_ttl': args.filter_cache_ttl,
+        'block_profile': args.block_profile,
+        'measure_weight': args.measure_weight,
+        'metrics': args.metrics,
+        'record': args.record,
+    }
+    if args.backend == 'replay':
+        options['manifest'] = args.replay_manifest
+        options['parse_workers'] = args.replay_workers
 
-    crawler = YahooFinanceCrawler(
-        region=args.region, base_url=base_url, headless=is_headless
-    )
+    if args.enqueue or args.work or args.merge:
+        return run_queue(args, base_url, options)
+
+    if args.compare_blocking:
+        from src.crawler.core import create_driver  # noqa: PLC0415
+
+        weights = compare_profiles(
+            base_url,
+            tuple(BLOCKING_PROFILES),
+            lambda profile: create_driver(is_headless, profile),
+        )
+        log_comparison(weights)
+        return
+
+    if args.daemon:
+        from src.crawler.daemon import CrawlerDaemon  # noqa: PLC0415
+
+        CrawlerDaemon(
+            base_url,
+            port=args.daemon_port,
+            sessions=args.sessions,
+            recycle_after=args.recycle_after,
+            headless=is_headless,
+            block_profile=args.block_profile,
+        ).serve_forever()
+        return
+
+    crawler_class = load_backend(args.backend)
+
+    if args.schedule:
+        run_schedule(args, base_url, crawler_class, options)
+        return
+
+    regions = read_regions(args)
+    if args.submit:
+        results = [
+            submit_to_daemon(region, args.daemon_port, options)
+            for region in regions or [args.region]
+        ]
+        log_summary(results)
+        return exit_status(results)
+
+    if regions:
+        results = crawl_regions(
+            regions,
+            base_url,
+            workers=args.workers,
+            crawler_class=crawler_class,
+            **options,
+        )
+        log_summary(results)
+        if args.metrics:
+            write_run_report(
+                [result.metrics for result in results if result.metrics],
+                OUTPUT_DIR,
+            )
+        return exit_status(results)
+
+    crawler = crawler_class(region=args.region, base_url=base_url, **options)
     crawler.run()
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -1 +1,8 @@
-from .core import YahooFinanceCrawler as YahooFinanceCrawler
+def __getattr__(name: str):
+    # Importing the package must not pull in Selenium; the browser crawler
+    # is only loaded when it is asked for.
+    if name == 'YahooFinanceCrawler':
+        from .core import YahooFinanceCrawler  # noqa: PLC0415
+
+        return YahooFinanceCrawler
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
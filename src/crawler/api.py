@@ -0,0 +1,266 @@
+import json
+import logging
+import math
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import urllib3
+from urllib3.util import Retry
+
+from .base import USER_AGENT, BaseCrawler
+from .schema import Quote, parse_number
+
+logger = logging.getLogger(__name__)
+
+API_URL = 'https://query2.finance.yahoo.com'
+CRUMB_PATH = '/v1/test/getcrumb'
+SCREENER_PATH = '/v1/finance/screener'
+
+# Screener JSON keys of the number columns of the table.
+QUOTE_FIELDS = {
+    'price': 'regularMarketPrice',
+    'change': 'regularMarketChange',
+    'change_percent': 'regularMarketChangePercent',
+    'volume': 'regularMarketVolume',
+    'avg_volume': 'averageDailyVolume3Month',
+    'market_cap': 'marketCap',
+    'pe_ratio': 'trailingPE',
+    'week_52_change_percent': 'fiftyTwoWeekChangePercent',
+    'week_52_low': 'fiftyTwoWeekLow',
+    'week_52_high': 'fiftyTwoWeekHigh',
+}
+
+# Screener region codes for the names shown in the Region filter.
+REGION_CODES = {
+    'Argentina': 'ar',
+    'Australia': 'au',
+    'Austria': 'at',
+    'Belgium': 'be',
+    'Brazil': 'br',
+    'Canada': 'ca',
+    'Chile': 'cl',
+    'China': 'cn',
+    'Denmark': 'dk',
+    'Finland': 'fi',
+    'France': 'fr',
+    'Germany': 'de',
+    'Greece': 'gr',
+    'Hong Kong': 'hk',
+    'India': 'in',
+    'Indonesia': 'id',
+    'Ireland': 'ie',
+    'Israel': 'il',
+    'Italy': 'it',
+    'Japan': 'jp',
+    'Malaysia': 'my',
+    'Mexico': 'mx',
+    'Netherlands': 'nl',
+    'New Zealand': 'nz',
+    'Norway': 'no',
+    'Portugal': 'pt',
+    'Singapore': 'sg',
+    'South Africa': 'za',
+    'South Korea': 'kr',
+    'Spain': 'es',
+    'Sweden': 'se',
+    'Switzerland': 'ch',
+    'Taiwan': 'tw',
+    'Thailand': 'th',
+    'Turkey': 'tr',
+    'United Kingdom': 'gb',
+    'United States': 'us',
+}
+
+
+def region_code(region: str) -> str:
+    """Return the screener code for a region name (or a code itself)."""
+    for name, code in REGION_CODES.items():
+        if region.lower() in {name.lower(), code}:
+            return code
+    raise ValueError(f'Unknown region for the HTTP backend: {region!r}')
+
+
+class YahooFinanceApiCrawler(BaseCrawler):
+    """Browserless crawler that reads the screener data over HTTP.
+
+    Instead of driving Chrome through the screener UI it posts the same
+    region query the page sends to the screener API and pages through the
+    results with offset/size. Requests share a pooled keep-alive session,
+    and the rows end up in the same store and CSV as the Selenium crawler.
+    """
+
+    backend = 'http'
+
+    def __init__(  # noqa: PLR0913
+        self,
+        region: str,
+        base_url: str,
+        headless: bool = True,
+        *,
+        api_url: str = API_URL,
+        fetch_size: int = 100,
+        pool_size: int = 4,
+        **options,
+    ):
+        self.api_url = api_url.rstrip('/')
+        self.http = urllib3.PoolManager(
+            maxsize=pool_size,
+            headers={'User-Agent': USER_AGENT},
+            retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=None,
+            ),
+            timeout=urllib3.Timeout(connect=5.0, read=15.0),
+        )
+        self.cookies: Dict[str, str] = {}
+        self.crumb: Optional[str] = None
+        super().__init__(region, base_url, headless, **options)
+        # A queued range is counted in the page size of the run that split
+        # it, so fetch with that size for the offsets to line up
+        self.page_size = self.range_page_size or fetch_size
+
+    def close(self):
+        """Close the pooled HTTP connections."""
+        self.http.clear()
+
+    def _scrape(self) -> None:
+        """Fetch every page of the screener for the region and save it."""
+        logger.info(f'Initializing HTTP crawler for region: {self.region}')
+        with self.metrics.phase('session'):
+            self._start_session()
+        if self.resume:
+            with self.metrics.phase('resume'):
+                self._restore_checkpoint()
+        with self.metrics.phase('scrape'):
+            self._fetch_all_pages()
+        with self.metrics.phase('save'):
+            self._save_output()
+        if self.checkpoints is not None:
+            self.checkpoints.clear()
+        logger.info(f'Done. Saved {len(self.data)} rows.')
+
+    def _request(self, method: str, url: str, **kwargs):
+        headers = kwargs.pop('headers', {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            )
+        response = self.http.request(method, url, headers=headers, **kwargs)
+        for header in response.headers.getlist('Set-Cookie'):
+            cookie = SimpleCookie()
+            cookie.load(header)
+            self.cookies.update({
+                name: morsel.value for name, morsel in cookie.items()
+            })
+        return response
+
+    def _start_session(self) -> None:
+        """Collect the session cookies and the crumb the API requires."""
+        self._request('GET', self.base_url, redirect=True)
+        response = self._request('GET', f'{self.api_url}{CRUMB_PATH}')
+        if response.status != 200:  # noqa: PLR2004
+            raise RuntimeError(
+                f'Could not get a crumb (HTTP {response.status}).'
+            )
+        self.crumb = response.data.decode('utf-8').strip()
+        logger.info('HTTP session ready.')
+
+    def _fetch_all_pages(self) -> None:
+        """Page through the screener results with offset/size."""
+        page_num = self.start_page
+        offset = (page_num - 1) * self.page_size
+        while True:
+            logger.info(f'Fetching page {page_num} (offset {offset})...')
+            total, quotes = self._fetch_page(offset)
+            self.total_pages = math.ceil(total / self.page_size)
+            self._extract_quotes(quotes)
+            self._page_done(page_num)
+            if self._delta_says_stop():
+                break
+
+            offset += len(quotes)
+            if not quotes or offset >= total:
+                logger.info('No more pages.')
+                break
+            if self._is_last_page(page_num):
+                break
+            page_num += 1
+
+    def _fetch_page(self, offset: int) -> Tuple[int, List[dict]]:
+        body = {
+            'offset': offset,
+            'size': self.page_size,
+            'sortField': 'intradaymarketcap',
+            'sortType': 'DESC',
+            'quoteType': 'EQUITY',
+            'query': {
+                'operator': 'AND',
+                'operands': [
+                    {
+                        'operator': 'EQ',
+                        'operands': ['region', region_code(self.region)],
+                    }
+                ],
+            },
+            'userId': '',
+            'userIdType': 'guid',
+        }
+        with self.metrics.page_step('fetch'):
+            response = self._request(
+                'POST',
+                f'{self.api_url}{SCREENER_PATH}?{self._screener_query()}',
+                body=json.dumps(body).encode('utf-8'),
+                headers={'Content-Type': 'application/json'},
+            )
+        if response.status != 200:  # noqa: PLR2004
+            raise RuntimeError(
+                f'Screener request failed (HTTP {response.status}).'
+            )
+
+        self.metrics.add_page_bytes(len(response.data))
+        with self.metrics.page_step('parse'):
+            payload = json.loads(response.data)
+        finance = payload['finance']
+        if finance.get('error'):
+            raise RuntimeError(f'Screener error: {finance["error"]}')
+        result = finance['result'][0]
+        return result.get('total', 0), result.get('quotes', [])
+
+    def _screener_query(self) -> str:
+        # Crumbs may hold '/', '+' or '=', which must be escaped
+        return urlencode({
+            'crumb': self.crumb,
+            'formatted': 'true',
+            'lang': 'en-US',
+        })
+
+    def _extract_quotes(self, quotes: List[dict]) -> None:
+        """Store quotes as the same typed rows the table extraction makes."""
+        with self.metrics.page_step('parse'):
+            rows = [
+                Quote(
+                    symbol=quote['symbol'],
+                    name=quote.get('shortName') or quote.get('longName', ''),
+                    **{
+                        field: _raw_number(quote.get(key))
+                        for field, key in QUOTE_FIELDS.items()
+                    },
+                )
+                for quote in quotes
+                if quote.get('symbol')
+            ]
+        new_rows = self._store_rows(rows)
+        self.metrics.add_page_rows(new_rows)
+        logger.info(f'Extracted {new_rows} new rows.')
+
+
+def _raw_number(value) -> Optional[float]:
+    """Unwrap a {'raw': ..., 'fmt': ...} value of the formatted API."""
+    if isinstance(value, dict):
+        if 'raw' in value:
+            return parse_number(value['raw'])
+        return parse_number(value.get('fmt'))
+    return parse_number(value)
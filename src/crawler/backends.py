@@ -0,0 +1,40 @@
+"""Registry of crawler backends, imported only when one is used.
+
+Each backend pulls in its own dependencies (Selenium for the browser,
+urllib3 for the HTTP API), so the registry maps names to import paths
+instead of classes: `--help`, the daemon client and the backends that do
+not drive a browser never pay for the others.
+"""
+
+import importlib
+from typing import Dict
+
+BACKENDS: Dict[str, str] = {
+    'selenium': 'src.crawler.core:YahooFinanceCrawler',
+    'http': 'src.crawler.api:YahooFinanceApiCrawler',
+    'replay': 'src.crawler.replay:YahooFinanceReplayCrawler',
+}
+DEFAULT_BACKEND = 'selenium'
+
+
+def register_backend(name: str, target: str) -> None:
+    """Make the crawler class at 'package.module:Class' available as `name`."""
+    if ':' not in target:
+        raise ValueError(
+            f'Invalid backend target: {target!r}. '
+            "Expected 'package.module:Class'."
+        )
+    BACKENDS[name] = target
+
+
+def load_backend(name: str) -> type:
+    """Import and return the crawler class registered under `name`."""
+    try:
+        target = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f'Unknown backend: {name!r}. '
+            f'Expected one of {", ".join(BACKENDS)}.'
+        ) from None
+    module_name, _, class_name = target.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
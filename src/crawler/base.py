@@ -0,0 +1,350 @@
+import abc
+import logging
+from typing import TYPE_CHECKING, List, Optional
+
+from .blocking import DEFAULT_PROFILE, PageWeightMeter
+from .checkpoint import Checkpoint, CheckpointStore
+from .delta import DeltaTracker, load_previous_state, write_delta
+from .filter_cache import DEFAULT_TTL_HOURS, FilterCache
+from .health import DriverHealth, HealthLimits
+from .metrics import RunMetrics, write_report
+from .parsing import HTML_PARSER, Table, parse_table
+from .recording import Recorder
+from .retry import DEFAULT_FAILURE_THRESHOLD, CircuitBreaker, Retrier
+from .schema import ColumnMap, Row
+from .sinks import OUTPUT_DIR, SINKS, SNAPSHOT_READERS, create_sink
+from .store import KEEP_FIRST, RowStore
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_MODES = ('page', 'fragment', 'cells')
+
+DEFAULT_PAGE_SIZE = 25
+
+USER_AGENT = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
+    'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 '
+    'Safari/537.36'
+)
+
+
+class BaseCrawler(abc.ABC):
+    """What every backend shares once the rows of a page are in hand.
+
+    Deduplication, streaming, delta, checkpoints, recording, retries,
+    metrics and output live here, without importing a browser or an HTML
+    parser, so backends that do not drive Chrome never load Selenium.
+    Subclasses set `backend`, implement `_scrape()` and may override
+    `_setup_driver()`.
+    """
+
+    backend: str
+
+    def __init__(  # noqa: PLR0913
+        self,
+        region: str,
+        base_url: str,
+        headless: bool = True,
+        *,
+        conflict_policy: str = KEEP_FIRST,
+        extract_mode: str = 'fragment',
+        parser: str = HTML_PARSER,
+        tabs: int = 1,
+        stream: bool = False,
+        output: Optional[str] = 'csv',
+        output_dir: str = OUTPUT_DIR,
+        delta: bool = False,
+        delta_stop_after: Optional[int] = None,
+        checkpoint: bool = False,
+        resume: bool = False,
+        block_profile: str = DEFAULT_PROFILE,
+        measure_weight: bool = False,
+        metrics: bool = False,
+        record: bool = False,
+        retries: Optional[int] = None,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        filter_cache: bool = False,
+        filter_cache_ttl: float = DEFAULT_TTL_HOURS,
+        parse_workers: int = 0,
+        restart_after_pages: int = 0,
+        max_browser_mb: Optional[float] = None,
+        max_slowdown: Optional[float] = None,
+        max_error_rate: Optional[float] = None,
+        first_page: int = 1,
+        last_page: Optional[int] = None,
+        page_size: Optional[int] = None,
+        driver: Optional['webdriver.Chrome'] = None,
+    ):
+        if extract_mode not in EXTRACT_MODES:
+            raise ValueError(
+                f'Unknown extract mode: {extract_mode!r}. '
+                f'Expected one of {", ".join(EXTRACT_MODES)}.'
+            )
+        if output is not None and output not in SINKS:
+            raise ValueError(
+                f'Unknown output: {output!r}. '
+                f'Expected one of {", ".join(SINKS)}.'
+            )
+        if delta and output is not None and output not in SNAPSHOT_READERS:
+            # The previous state is read back from the last snapshot file
+            raise ValueError(
+                f'Delta mode compares against the last snapshot file, so it '
+                f'needs one of {", ".join(SNAPSHOT_READERS)} as output, '
+                f'not {output!r}.'
+            )
+        if stream and not delta and conflict_policy != KEEP_FIRST:
+            # Streamed rows are on disk before a later page repeats them
+            raise ValueError(
+                f'Streaming keeps the first row of each symbol; the '
+                f'{conflict_policy!r} conflict policy needs stream=False.'
+            )
+        self.region = region
+        self.base_url = base_url
+        self.headless = headless
+        self.block_profile = block_profile
+        self.extract_mode = extract_mode
+        self.parser = parser
+        self.tabs = max(1, tabs)
+        self.parse_workers = max(0, parse_workers)
+        self.page_size = DEFAULT_PAGE_SIZE
+        self.start_page = max(1, first_page)
+        self.last_page = last_page
+        # Rows per page `first_page` and `last_page` are counted in, when
+        # they come from a run with another page size than this one
+        self.range_page_size = page_size
+        # Filled in by backends that can tell how many pages there are
+        self.total_pages: Optional[int] = None
+        self.resume = resume
+        self.output = output
+        self.output_dir = output_dir
+        self.sink = (
+            create_sink(output, region, output_dir)
+            if stream and output is not None
+            else None
+        )
+        # Streaming writes each page to disk as it is extracted, so the
+        # store only keeps the symbol index instead of every row.
+        self.data = RowStore(conflict_policy, keep_rows=self.sink is None)
+        self.delta = self._setup_delta(delta_stop_after) if delta else None
+        self.checkpoints = (
+            CheckpointStore(region, output_dir)
+            if checkpoint or resume
+            else None
+        )
+        if self.checkpoints is not None and not resume:
+            # Rows are appended to the checkpoint, so a run that does not
+            # resume the last one starts it over
+            self.checkpoints.clear()
+        self.page_weights = PageWeightMeter() if measure_weight else None
+        self.filter_cache = (
+            FilterCache(output_dir, filter_cache_ttl) if filter_cache else None
+        )
+        limits = HealthLimits(
+            restart_after_pages, max_browser_mb, max_slowdown, max_error_rate
+        )
+        self.health = DriverHealth(limits) if limits.enabled else None
+        # Compiled from the first table's headers and reused while they hold
+        self.column_map: Optional[ColumnMap] = None
+        # Timings are always collected; `metrics` only controls the export
+        self.metrics = RunMetrics(region, self.backend)
+        self.export_metrics = metrics
+        self.recorder = (
+            Recorder(region, output_dir, base_url) if record else None
+        )
+        # `retries` counts the attempts after the first one, for every
+        # page operation
+        self.retrier = (
+            Retrier.with_attempts(retries + 1, failure_threshold)
+            if retries is not None
+            else Retrier(breaker=CircuitBreaker(failure_threshold))
+        )
+        # A driver passed in (e.g. a warm daemon session) is left open
+        self.owns_driver = driver is None
+        with self.metrics.phase('driver_startup'):
+            self.driver = driver or self._setup_driver()
+
+    def _setup_delta(
+        self, stop_after_unchanged_pages: Optional[int]
+    ) -> Optional[DeltaTracker]:
+        """Load the previous state of the region to compare against."""
+        previous = load_previous_state(
+            self.region, self.output_dir, self.output or 'csv'
+        )
+        if previous is None:
+            logger.info(
+                'No previous snapshot for this region. '
+                'Writing a full snapshot instead of a delta.'
+            )
+            return None
+        return DeltaTracker(previous, stop_after_unchanged_pages)
+
+    def _setup_driver(self) -> Optional['webdriver.Chrome']:  # noqa: PLR6301
+        """The browser this backend drives, if any."""
+        return None
+
+    def close(self):
+        """Close the browser, unless it was lent by the caller."""
+        if self.driver and self.owns_driver:
+            self.driver.quit()
+
+    def run(self):
+        """Scrape the region, save the output and close the run."""
+        status = 'error'
+        try:
+            self._scrape()
+            status = 'ok'
+        except Exception as error:
+            logger.error(f'An error occurred: {error}', exc_info=True)
+            if self.sink is not None:
+                self.sink.abort()
+            raise error
+        finally:
+            self.close()
+            self._finish_run(status)
+
+    @abc.abstractmethod
+    def _scrape(self) -> None:
+        """Scrape every page of the region and save the output."""
+
+    def _finish_run(self, status: str) -> None:
+        """Close the run timings and recording, exporting them if enabled."""
+        outcomes = self.retrier.report()
+        self.metrics.set_outcomes(self.page_size, outcomes)
+        if outcomes['retries'] or outcomes['fallbacks']:
+            logger.warning(
+                f'Run needed {outcomes["retries"]} retries and '
+                f'{outcomes["fallbacks"]} fallbacks '
+                f'(page size {self.page_size}).'
+            )
+        self.metrics.finish(status)
+        try:
+            if self.recorder is not None:
+                self.recorder.close(complete=status == 'ok')
+            if self.export_metrics:
+                write_report(self.metrics, self.output_dir)
+        except OSError as error:
+            logger.warning(f'Could not write the run reports: {error}')
+
+    def _table_rows(
+        self, headers: List[str], rows: List[List[str]]
+    ) -> List[Row]:
+        """Convert the table cells to typed rows with every known column."""
+        if self.column_map is None or not self.column_map.matches(headers):
+            self.column_map = ColumnMap.compile(headers)
+        return self.column_map.convert(rows)
+
+    def _store_rows(self, rows: List[Row]) -> int:
+        """Add a page of rows to the store and stream the new ones.
+
+        Duplicates are resolved by the store's conflict policy. Returns the
+        number of symbols that were not seen before.
+        """
+        new_rows = [row for row in rows if self.data.add(row)]
+        if self.checkpoints is not None:
+            self.checkpoints.append_rows(rows)
+        if self.delta is not None:
+            self.delta.observe(rows)
+        elif self.sink is not None:
+            self.sink.write(new_rows)
+        return len(new_rows)
+
+    def _page_done(self, page_num: int) -> None:
+        """Checkpoint the rows collected up to and including `page_num`."""
+        self.metrics.end_page(page_num)
+        url = self._page_captured(page_num)
+        if self.checkpoints is not None:
+            self.checkpoints.mark_page(page_num, self.page_size, url)
+
+    def _page_captured(self, page_num: int) -> Optional[str]:
+        """Record the page and measure its weight; returns its URL.
+
+        This is the part of finishing a page that needs the browser still
+        on it, so pipelined runs call it before the page is parsed.
+        """
+        url = self.driver.current_url if self.driver else None
+        if self.recorder is not None:
+            self.recorder.mark_page(page_num, url)
+        if self.page_weights is not None and self.driver is not None:
+            weight = self.page_weights.measure(self.driver, page_num)
+            if weight is not None:
+                logger.info(
+                    f'Page {page_num}: {weight.requests} requests, '
+                    f'{weight.bytes / 1024:.0f} KB.'
+                )
+        return url
+
+    def _restore_checkpoint(self) -> Optional[Checkpoint]:
+        """Reload the rows and position saved by an interrupted run."""
+        checkpoint = self.checkpoints.load()
+        if checkpoint is None:
+            logger.info('No checkpoint found. Starting from page 1.')
+            return None
+
+        self.checkpoints.clear()
+        self._store_rows(checkpoint.rows)
+        self.checkpoints.mark_page(
+            checkpoint.page, checkpoint.page_size, checkpoint.url
+        )
+        self.page_size = checkpoint.page_size
+        self.start_page = checkpoint.page + 1
+        logger.info(
+            f'Resuming from page {self.start_page} '
+            f'with {len(checkpoint.rows)} rows from the checkpoint.'
+        )
+        return checkpoint
+
+    def _is_last_page(self, page_num: int) -> bool:
+        """True when `page_num` ends the page range of the run."""
+        return self.last_page is not None and page_num >= self.last_page
+
+    def _delta_says_stop(self) -> bool:
+        """True when delta mode saw enough unchanged pages in a row."""
+        if self.delta is None or not self.delta.should_stop():
+            return False
+        logger.info(
+            f'No changes in the last {self.delta.unchanged_pages} pages. '
+            'Stopping early.'
+        )
+        return True
+
+    def _parse_html(self, html: str) -> Table:
+        self._html_captured(html)
+        with self.metrics.page_step('parse'):
+            return parse_table(html, self.parser)
+
+    def _html_captured(self, html: str) -> None:
+        """Record the HTML of the current page and count its bytes."""
+        if self.recorder is not None:
+            self.recorder.record(html)
+        self.metrics.add_page_bytes(len(html))
+
+    def _save_output(self) -> None:
+        """Save the scraped rows with the sink selected by `self.output`.
+
+        When streaming, the rows are already on disk and this only
+        finishes the file; otherwise every row in self.data is written.
+        In delta mode only the changes and their changelog are written.
+        With `output=None` the rows are only kept in self.data.
+        """
+        if self.output is None:
+            return
+        if self.delta is not None:
+            write_delta(self.delta, self.region, self.output_dir)
+            return
+
+        sink = self.sink
+        if sink is None:
+            if not self.data:
+                logger.warning('No data to save.')
+                return
+            sink = create_sink(self.output, self.region, self.output_dir)
+            sink.write(self.data)
+
+        file_path = sink.close()
+        if file_path is None:
+            logger.warning('No data to save.')
+            return
+        logger.info(f'Saved to {file_path}')
@@ -0,0 +1,405 @@
+"""Offline benchmarks of the extraction pipeline.
+
+Runs YahooFinanceCrawler over synthetic screener pages through a fake
+in-process driver, so it needs neither Chrome nor network access:
+
+    python -m src.crawler.bench --scenario default wide
+    python -m src.crawler.bench --save-baseline
+
+`--startup` times the CLI start-up instead, each command in a fresh
+interpreter, and checks that it does not import modules it has no use for.
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from os import makedirs, path
+from typing import Dict, List
+
+from .base import EXTRACT_MODES
+from .core import YahooFinanceCrawler
+from .parsing import HTML_PARSER, PARSERS
+from .sinks import SINKS
+from .store import RowStore
+from .synthetic import FakeDriver, SyntheticScreener
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = path.join('benchmarks', 'baseline.json')
+DEFAULT_TOLERANCE = 0.25
+# Below this, timing noise dominates and ratios are meaningless.
+MIN_COMPARABLE_SECONDS = 0.005
+
+PROJECT_ROOT = path.dirname(path.dirname(path.dirname(path.abspath(__file__))))
+# Start-up commands, run with `python -c` from the project root.
+STARTUP_COMMANDS = {
+    'help': 'from src.app import build_parser; build_parser().format_help()',
+    'import_app': 'import src.app',
+    'import_http': 'import src.crawler.api',
+    'import_replay': 'import src.crawler.replay',
+}
+# Heavy modules, and the start-up commands that are allowed to load them.
+HEAVY_MODULES = {
+    'selenium': (),
+    'bs4': (),
+    'urllib3': ('import_http',),
+}
+
+
+@dataclass
+class Scenario:
+    """Shape of the synthetic screener a benchmark runs against."""
+
+    name: str
+    rows_per_page: int = 100
+    pages: int = 20
+    extra_columns: int = 0
+    noise_kb: int = 0
+    duplicate_ratio: float = 0.0
+    load_ms: int = 0
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario('small', rows_per_page=25, pages=4),
+        Scenario('default'),
+        Scenario('wide', extra_columns=20),
+        Scenario('noisy', noise_kb=300),
+        Scenario('duplicates', duplicate_ratio=0.2),
+        Scenario('large', pages=100),
+        Scenario('slow', load_ms=50),
+        # A full-market region: 25k rows with every screener column
+        Scenario('market', pages=250, extra_columns=8),
+    )
+}
+# 'large', 'slow' and 'market' take long; 'slow' shows what
+# --parse-workers gains when page loads, not parsing, dominate.
+DEFAULT_SCENARIOS = ('small', 'default', 'wide', 'noisy', 'duplicates')
+
+
+@contextmanager
+def _measure(name: str, seconds: Dict[str, float], peaks: Dict[str, int]):
+    """Time the block and, when tracemalloc is on, record its peak."""
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds[name] = time.perf_counter() - start
+        if tracing:
+            peaks[name] = tracemalloc.get_traced_memory()[1] - before
+
+
+def _run_once(
+    scenario: Scenario, options: dict, output_dir: str
+) -> Dict[str, Dict[str, float]]:
+    screener = SyntheticScreener(
+        scenario.rows_per_page,
+        scenario.pages,
+        extra_columns=scenario.extra_columns,
+        noise_kb=scenario.noise_kb,
+        duplicate_ratio=scenario.duplicate_ratio,
+    )
+    # Pre-render every page, so generating HTML is not measured
+    for page in range(1, screener.pages + 1):
+        screener.page_html(page)
+
+    seconds: Dict[str, float] = {}
+    peaks: Dict[str, int] = {}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        start_memory = tracemalloc.get_traced_memory()[0]
+    crawler = YahooFinanceCrawler(
+        region='Benchmark',
+        base_url=screener.url,
+        driver=FakeDriver(screener, scenario.load_ms / 1000),
+        output_dir=output_dir,
+        **options,
+    )
+    with _measure('scrape', seconds, peaks):
+        crawler._scrape_all_pages()
+    if tracing:
+        # What the crawler still holds once scraped, mostly the stored rows
+        peaks['rows'] = tracemalloc.get_traced_memory()[0] - start_memory
+    with _measure('save', seconds, peaks):
+        crawler._save_output()
+
+    rows = [
+        dict(zip(('symbol', 'name', 'price'), cells))
+        for page in range(1, screener.pages + 1)
+        for cells in screener.rows(page)
+    ]
+    store = RowStore(crawler.data.conflict_policy)
+    with _measure('dedup', seconds, peaks):
+        for row in rows:
+            store.add(row)
+
+    totals = crawler.metrics.report()['page_totals']
+    for step in ('wait', 'fetch', 'parse'):
+        seconds[step] = totals[f'{step}_seconds']
+    return {
+        'seconds': seconds,
+        'peak_kb': {name: peak / 1024 for name, peak in peaks.items()},
+        'rows': len(crawler.data),
+        'html_bytes': totals['html_bytes'],
+    }
+
+
+def run_scenario(
+    scenario: Scenario, repeat: int = 3, memory: bool = True, **options
+) -> dict:
+    """Benchmark one scenario, keeping the fastest of `repeat` runs.
+
+    Peak memory is measured in one extra run under tracemalloc, which
+    slows Python down and would skew the timings.
+    """
+    runs = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for _ in range(max(1, repeat)):
+            runs.append(_run_once(scenario, options, output_dir))
+        peak_kb = {}
+        if memory:
+            tracemalloc.start()
+            try:
+                peak_kb = _run_once(scenario, options, output_dir)['peak_kb']
+            finally:
+                tracemalloc.stop()
+
+    stages = runs[0]['seconds']
+    return {
+        'scenario': asdict(scenario),
+        'options': options,
+        'rows': runs[0]['rows'],
+        'html_bytes': runs[0]['html_bytes'],
+        'seconds': {
+            stage: round(min(run['seconds'][stage] for run in runs), 6)
+            for stage in stages
+        },
+        'peak_kb': {stage: round(kb, 1) for stage, kb in peak_kb.items()},
+    }
+
+
+def _loaded_modules(code: str) -> List[str]:
+    """Heavy modules imported by running `code` in a fresh interpreter."""
+    script = (
+        f'{code}\nimport sys\n'
+        f'print(*(name for name in {tuple(HEAVY_MODULES)!r} '
+        'if name in sys.modules))'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return output.split()
+
+
+def measure_startup(repeat: int = 3) -> dict:
+    """Time every start-up command, keeping the fastest of `repeat` runs."""
+    seconds = {}
+    modules = {}
+    for name, code in STARTUP_COMMANDS.items():
+        times = []
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, '-c', code],
+                cwd=PROJECT_ROOT,
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+            times.append(time.perf_counter() - start)
+        seconds[name] = round(min(times), 6)
+        modules[name] = _loaded_modules(code)
+    return {
+        'options': {},
+        'seconds': seconds,
+        'peak_kb': {},
+        'modules': modules,
+    }
+
+
+def unexpected_imports(result: dict) -> List[str]:
+    """List the heavy modules a start-up command should not have loaded."""
+    return [
+        f'startup/{name}: imports {module}'
+        for name, loaded in result['modules'].items()
+        for module in loaded
+        if name not in HEAVY_MODULES[module]
+    ]
+
+
+def compare(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """List every stage that got slower or hungrier than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        # Numbers from other options (parser, mode...) are not comparable
+        if base is None or base.get('options') != result['options']:
+            continue
+        for metric in ('seconds', 'peak_kb'):
+            for stage, value in result[metric].items():
+                old = base.get(metric, {}).get(stage)
+                if not old:
+                    continue
+                if metric == 'seconds' and old < MIN_COMPARABLE_SECONDS:
+                    continue
+                if value > old * (1 + tolerance):
+                    regressions.append(
+                        f'{name}/{stage}: {metric} {old:g} -> {value:g} '
+                        f'(+{(value / old - 1) * 100:.0f}%)'
+                    )
+    return regressions
+
+
+def log_results(results: Dict[str, dict]) -> None:
+    for name, result in results.items():
+        seconds = result['seconds']
+        rows_per_second = (
+            result['rows'] / seconds['scrape'] if seconds['scrape'] else 0
+        )
+        logger.info(
+            f'{name}: {result["rows"]} rows, '
+            f'{result["html_bytes"] / 1024:.0f} KB, '
+            f'{rows_per_second:,.0f} rows/s'
+        )
+        for stage, value in seconds.items():
+            peak = result['peak_kb'].get(stage)
+            memory = f', peak {peak:,.0f} KB' if peak is not None else ''
+            logger.info(f'  {stage:<7} {value * 1000:9.1f} ms{memory}')
+        held = result['peak_kb'].get('rows')
+        if held is not None:
+            logger.info(f'  rows held {held:,.0f} KB')
+
+
+def log_startup(result: dict) -> None:
+    for name, seconds in result['seconds'].items():
+        loaded = ', '.join(result['modules'][name]) or 'no heavy modules'
+        logger.info(f'{name:<13} {seconds * 1000:7.1f} ms ({loaded})')
+
+
+def load_baseline(file_path: str) -> Dict[str, dict]:
+    if not path.exists(file_path):
+        return {}
+    with open(file_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, dict], file_path: str) -> None:
+    directory = path.dirname(file_path)
+    if directory and not path.exists(directory):
+        makedirs(directory)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Offline benchmarks of the extraction pipeline'
+    )
+    parser.add_argument(
+        '--scenario',
+        nargs='+',
+        choices=tuple(SCENARIOS),
+        default=DEFAULT_SCENARIOS,
+        help='Scenarios to run (default: the quick ones)',
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--extract-mode', choices=EXTRACT_MODES, default='fragment'
+    )
+    parser.add_argument('--parser', choices=PARSERS, default=HTML_PARSER)
+    parser.add_argument('--output', choices=tuple(SINKS), default='csv')
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=0,
+        help='Parse pages in worker processes while the next one loads',
+    )
+    parser.add_argument(
+        '--no-memory',
+        action='store_true',
+        help='Skip the tracemalloc run that measures peak memory',
+    )
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Store these results as the new baseline',
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help='Allowed slowdown over the baseline (default: 0.25 = 25%%)',
+    )
+    parser.add_argument(
+        '--startup',
+        action='store_true',
+        help='Time the CLI start-up instead of the extraction scenarios',
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # The crawler logs every page; keep the benchmark output readable.
+    logging.getLogger('src.crawler').setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    regressions = []
+    if args.startup:
+        results = {'startup': measure_startup(args.repeat)}
+        log_startup(results['startup'])
+        regressions.extend(unexpected_imports(results['startup']))
+    else:
+        results = {
+            name: run_scenario(
+                SCENARIOS[name],
+                repeat=args.repeat,
+                memory=not args.no_memory,
+                extract_mode=args.extract_mode,
+                parser=args.parser,
+                output=args.output,
+                parse_workers=args.parse_workers,
+            )
+            for name in args.scenario
+        }
+        log_results(results)
+
+    if args.save_baseline:
+        baseline = {**load_baseline(args.baseline), **results}
+        save_baseline(baseline, args.baseline)
+        logger.info(f'Baseline saved to {args.baseline}')
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline:
+        regressions.extend(compare(results, baseline, args.tolerance))
+    else:
+        logger.info(f'No baseline at {args.baseline} to compare against.')
+    for regression in regressions:
+        logger.warning(f'Regression: {regression}')
+    if not regressions:
+        logger.info('No regressions against the baseline.')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+OFF = 'off'
+DEFAULT_PROFILE = 'default'
+STRICT = 'strict'
+
+# Network.setBlockedURLs only matches URLs, so resource types are blocked
+# through the file extensions that carry them.
+RESOURCE_TYPE_PATTERNS = {
+    'image': [
+        '*.png*',
+        '*.jpg*',
+        '*.jpeg*',
+        '*.gif*',
+        '*.webp*',
+        '*.avif*',
+        '*.svg*',
+        '*.ico*',
+    ],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ts?*'],
+}
+
+# Ads, trackers and video players loaded around the screener; none of them
+# is needed to render or paginate the quotes table. Every entry names its
+# host: the consent manager (consent.cmp.oath.com) and the shared scripts
+# on s.yimg.com must load, or the first-visit popups cannot be dismissed.
+AD_TRACKER_PATTERNS = [
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*googletagmanager.com*',
+    '*google-analytics.com*',
+    '*googletagservices.com*',
+    '*adservice.google.*',
+    '*amazon-adsystem.com*',
+    '*adsrvr.org*',
+    '*criteo.*',
+    '*taboola.com*',
+    '*outbrain.com*',
+    '*scorecardresearch.com*',
+    '*chartbeat.*',
+    '*facebook.net*',
+    '*bing.com/bat*',
+    '*analytics.yahoo.com*',
+    '*geo.yahoo.com*',
+    '*ads.yahoo.com*',
+    '*s.yimg.com/rq/darla*',
+    '*udc.yahoo.com*',
+    '*beap.gemini.yahoo.com*',
+    '*pixel.quantserve.com*',
+    '*pixel.advertising.com*',
+]
+
+# Scripts for widgets the screener page does not need (video, comments,
+# recommendations). Only used by the strict profile, since a wrong entry
+# here can break the page.
+NON_ESSENTIAL_SCRIPT_PATTERNS = [
+    '*s.yimg.com/*/video*',
+    '*spotim.market*',
+    '*openweb*',
+    '*vidible*',
+    '*jwplayer*',
+]
+
+
+@dataclass
+class BlockingProfile:
+    """What a browser session refuses to download.
+
+    `url_patterns` and `resource_types` are sent to Chrome through the
+    DevTools protocol (Network.setBlockedURLs). `block_images` also turns
+    images off in Chrome's content settings, so they are not even
+    requested. `disable_javascript` stops script execution entirely; the
+    screener is rendered by JavaScript, so it is only useful against
+    pages that are already server-rendered (e.g. recorded fixtures).
+    """
+
+    name: str
+    url_patterns: List[str] = field(default_factory=list)
+    resource_types: List[str] = field(default_factory=list)
+    block_images: bool = False
+    disable_javascript: bool = False
+
+    def blocked_urls(self) -> List[str]:
+        """Every URL pattern blocked by this profile, without repeats."""
+        patterns = list(self.url_patterns)
+        for resource_type in self.resource_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        if self.block_images:
+            patterns.extend(RESOURCE_TYPE_PATTERNS['image'])
+        return list(dict.fromkeys(patterns))
+
+
+BLOCKING_PROFILES = {
+    OFF: BlockingProfile(OFF),
+    DEFAULT_PROFILE: BlockingProfile(
+        DEFAULT_PROFILE,
+        url_patterns=AD_TRACKER_PATTERNS,
+        resource_types=['font', 'media'],
+        block_images=True,
+    ),
+    STRICT: BlockingProfile(
+        STRICT,
+        url_patterns=[*AD_TRACKER_PATTERNS, *NON_ESSENTIAL_SCRIPT_PATTERNS],
+        resource_types=['font', 'media'],
+        block_images=True,
+    ),
+}
+
+
+def get_profile(name: str) -> BlockingProfile:
+    """Return the profile registered under `name`."""
+    try:
+        return BLOCKING_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f'Unknown blocking profile: {name!r}. '
+            f'Expected one of {", ".join(BLOCKING_PROFILES)}.'
+        ) from None
+
+
+def configure_options(options, profile: BlockingProfile) -> None:
+    """Set the Chrome options a profile needs before the browser starts."""
+    if profile.block_images:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option(
+            'prefs', {'profile.managed_default_content_settings.images': 2}
+        )
+
+
+def apply_profile(driver, profile: BlockingProfile) -> None:
+    """Install the profile's URL blocking on a running Chrome session."""
+    patterns = profile.blocked_urls()
+    if patterns:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    if profile.disable_javascript:
+        driver.execute_cdp_cmd(
+            'Emulation.setScriptExecutionDisabled', {'value': True}
+        )
+    logger.info(
+        f'Blocking profile "{profile.name}": {len(patterns)} URL patterns.'
+    )
+
+
+# Requests and bytes transferred so far by the current document, from the
+# Resource Timing API. timeOrigin identifies the document, so a new page
+# load (or another tab) starts counting from zero again.
+PAGE_WEIGHT_SCRIPT = """
+if (performance.setResourceTimingBufferSize) {
+    performance.setResourceTimingBufferSize(100000);
+}
+const entries = [
+    ...performance.getEntriesByType('navigation'),
+    ...performance.getEntriesByType('resource'),
+];
+return {
+    origin: performance.timeOrigin,
+    requests: entries.length,
+    bytes: entries.reduce((sum, entry) => sum + (entry.transferSize || 0), 0),
+};
+"""
+
+
+@dataclass
+class PageWeight:
+    """Requests made and bytes transferred while a page was scraped."""
+
+    page: int
+    requests: int
+    bytes: int
+
+
+class PageWeightMeter:
+    """Per-page requests and bytes, measured inside the browser.
+
+    Cross-origin responses without a Timing-Allow-Origin header report a
+    transfer size of 0, so bytes are a lower bound; request counts are
+    exact. Run the same crawl with `off` and another profile to see what
+    the profile saves.
+    """
+
+    def __init__(self):
+        self.pages: List[PageWeight] = []
+        self._seen: Dict[float, tuple] = {}
+
+    def measure(self, driver, page: int) -> Optional[PageWeight]:
+        try:
+            counters = driver.execute_script(PAGE_WEIGHT_SCRIPT)
+        except Exception as error:
+            logger.debug(f'Could not measure page weight: {error}')
+            return None
+        if not isinstance(counters, dict):
+            return None
+
+        origin = counters['origin']
+        requests, total_bytes = counters['requests'], counters['bytes']
+        last_requests, last_bytes = self._seen.get(origin, (0, 0))
+        self._seen[origin] = (requests, total_bytes)
+        weight = PageWeight(
+            page=page,
+            requests=requests - last_requests,
+            bytes=total_bytes - last_bytes,
+        )
+        self.pages.append(weight)
+        return weight
+
+    @property
+    def total_requests(self) -> int:
+        return sum(weight.requests for weight in self.pages)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(weight.bytes for weight in self.pages)
+
+    def log_summary(self) -> None:
+        if not self.pages:
+            return
+        count = len(self.pages)
+        logger.info(
+            f'Page weight: {self.total_requests} requests, '
+            f'{self.total_bytes / 1024:.0f} KB over {count} pages '
+            f'({self.total_requests / count:.0f} requests, '
+            f'{self.total_bytes / count / 1024:.0f} KB per page).'
+        )
+
+
+def compare_profiles(
+    url: str,
+    profiles: Sequence[str],
+    driver_factory: Callable,
+) -> Dict[str, PageWeight]:
+    """Load `url` once per profile, each in a fresh browser.
+
+    `driver_factory(profile_name)` must return a driver with the profile
+    already applied.
+    """
+    weights = {}
+    for name in profiles:
+        driver = driver_factory(name)
+        try:
+            driver.get(url)
+            weight = PageWeightMeter().measure(driver, page=1)
+        finally:
+            driver.quit()
+        if weight is not None:
+            weights[name] = weight
+    return weights
+
+
+def log_comparison(
+    weights: Dict[str, PageWeight], baseline: str = OFF
+) -> None:
+    """Log each profile's weight and what it saves over `baseline`."""
+    base = weights.get(baseline)
+    for name, weight in weights.items():
+        line = (
+            f'{name}: {weight.requests} requests, {weight.bytes / 1024:.0f} KB'
+        )
+        if base is not None and name != baseline:
+            line += (
+                f' (saves {base.requests - weight.requests} requests, '
+                f'{(base.bytes - weight.bytes) / 1024:.0f} KB)'
+            )
+        logger.info(line)
@@ -0,0 +1,96 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from os import makedirs, path, remove, replace
+from typing import Iterable, List, Optional
+
+from .schema import Row
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = '.checkpoints'
+
+
+@dataclass
+class Checkpoint:
+    """Progress of an interrupted crawl."""
+
+    region: str
+    page: int
+    page_size: int
+    rows_count: int
+    url: Optional[str] = None
+    rows: List[Row] = field(default_factory=list)
+
+
+class CheckpointStore:
+    """Per-region checkpoint files kept under `<output_dir>/.checkpoints`.
+
+    Rows are appended to '<region>.rows.ndjson' as they are stored, so a
+    checkpoint costs one small append per page instead of rewriting every
+    row collected so far. '<region>.json' is rewritten atomically after
+    each completed page with the page number, the page size in effect and
+    how many rows belong to that page; rows appended after it (a page
+    that was interrupted halfway) are ignored on load.
+    """
+
+    def __init__(self, region: str, output_dir: str):
+        self.region = region
+        directory = path.join(output_dir, CHECKPOINT_DIR)
+        name = region.replace(' ', '_')
+        self.directory = directory
+        self.meta_path = path.join(directory, f'{name}.json')
+        self.rows_path = path.join(directory, f'{name}.rows.ndjson')
+        self.rows_count = 0
+
+    def append_rows(self, rows: Iterable[Row]) -> None:
+        """Append rows collected for the page in progress."""
+        lines = [
+            json.dumps(dict(row), ensure_ascii=False) + '\n' for row in rows
+        ]
+        if not lines:
+            return
+        if not path.exists(self.directory):
+            makedirs(self.directory)
+        with open(self.rows_path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+        self.rows_count += len(lines)
+
+    def mark_page(
+        self, page: int, page_size: int, url: Optional[str] = None
+    ) -> None:
+        """Record that every row up to `page` is safely on disk."""
+        if not path.exists(self.directory):
+            makedirs(self.directory)
+        meta = {
+            'region': self.region,
+            'page': page,
+            'page_size': page_size,
+            'rows_count': self.rows_count,
+            'url': url,
+        }
+        with open(f'{self.meta_path}.part', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        replace(f'{self.meta_path}.part', self.meta_path)
+
+    def load(self) -> Optional[Checkpoint]:
+        """Return the last checkpoint with its rows, or None."""
+        if not path.exists(self.meta_path):
+            return None
+        with open(self.meta_path, encoding='utf-8') as f:
+            checkpoint = Checkpoint(**json.load(f))
+
+        if path.exists(self.rows_path):
+            with open(self.rows_path, encoding='utf-8') as f:
+                for line in f:
+                    if len(checkpoint.rows) >= checkpoint.rows_count:
+                        break
+                    checkpoint.rows.append(json.loads(line))
+        return checkpoint
+
+    def clear(self) -> None:
+        """Delete the checkpoint files."""
+        for file_path in (self.meta_path, self.rows_path):
+            if path.exists(file_path):
+                remove(file_path)
+        self.rows_count = 0
@@ -0,0 +1,27 @@
+import json
+import socket
+from typing import Optional
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_QUERY_PORT = 8766
+
+
+def submit(
+    request: dict,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    timeout: Optional[float] = None,
+) -> dict:
+    """Send one request to a running daemon and return its answer.
+
+    Kept apart from the daemon itself, which needs Selenium, so that
+    submitting a job starts without loading the browser stack.
+    """
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        conn.sendall(json.dumps(request).encode() + b'\n')
+        with conn.makefile('rb') as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError('The crawler daemon closed the connection.')
+    return json.loads(line)
@@ -1,95 +1,275 @@
-import csv
-import datetime
 import logging
+import math
+import re
 import time
-from os import makedirs, path
-from typing import Dict, List
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-from bs4 import BeautifulSoup
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from .base import DEFAULT_PAGE_SIZE, USER_AGENT, BaseCrawler
+from .blocking import (
+    DEFAULT_PROFILE,
+    apply_profile,
+    configure_options,
+    get_profile,
+)
+from .metrics import PageMetrics
+from .parsing import TABLE_SELECTOR, Table, parse_table
+from .retry import CircuitOpenError
+from .waits import TableState, TableWaiter
+
 logger = logging.getLogger(__name__)
 
+# Returns the outerHTML of the data table, or null when it is not there.
+TABLE_HTML_SCRIPT = f"""
+const table = document.querySelector('{TABLE_SELECTOR}');
+return table ? table.outerHTML : null;
+"""
+
+REGION_BUTTON_XPATH = (
+    '//button[contains(@class, "menuBtn") and contains(., "Region")]'
+)
+
+# Text around the Next button, e.g. "1-100 of 2,345".
+PAGINATION_LABEL_SCRIPT = """
+const next = document.querySelector('[data-testid="next-page-button"]');
+return next && next.parentElement ? next.parentElement.textContent : null;
+"""
+
+# Marks the current document before navigating away, so TAB_READY_SCRIPT
+# can tell the new page from the one still on screen.
+NAVIGATE_SCRIPT = """
+window.__crawlerLeaving = true;
+window.location.href = arguments[0];
+"""
+
+TAB_READY_SCRIPT = f"""
+return !window.__crawlerLeaving
+    && document.readyState !== 'loading'
+    && document.querySelector('{TABLE_SELECTOR}') !== null;
+"""
+
+# Returns {headers, rows} with the stripped text of every cell, mirroring
+# what parse_table() does on the HTML side.
+TABLE_CELLS_SCRIPT = f"""
+const table = document.querySelector('{TABLE_SELECTOR}');
+if (!table) return null;
+const text = (cell) => {{
+    const walker = document.createTreeWalker(cell, NodeFilter.SHOW_TEXT);
+    let value = '';
+    while (walker.nextNode()) value += walker.currentNode.nodeValue.trim();
+    return value;
+}};
+const cells = (row) => Array.from(row.querySelectorAll('td, th'), text);
+const head = table.querySelector('thead');
+let headers = head ? cells(head) : [];
+if (!headers.length) {{
+    const firstRow = table.querySelector('tr');
+    headers = firstRow ? cells(firstRow) : [];
+}}
+const body = table.querySelector('tbody') || table;
+return {{
+    headers: headers,
+    rows: Array.from(body.querySelectorAll('tr'), cells),
+}};
+"""
+
+
+def create_driver(
+    headless: bool = True, block_profile: str = DEFAULT_PROFILE
+) -> webdriver.Chrome:
+    """Configure and return an instance of the Chrome WebDriver."""
+    profile = get_profile(block_profile)
+    chrome_options = Options()
+
+    if headless:
+        chrome_options.add_argument('--headless')
+
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+
+    # 'eager' strategy: releases script as soon as HTML loads
+    chrome_options.page_load_strategy = 'eager'
+    configure_options(chrome_options, profile)
+
+    driver = webdriver.Chrome(options=chrome_options)
+    apply_profile(driver, profile)
+    return driver
+
+
+def dismiss_initial_popup(driver: webdriver.Chrome, timeout: int = 5) -> None:
+    """Close the "Explore..." popup shown on the first visit, if present."""
+    try:
+        initial_done = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable((
+                By.XPATH,
+                '//div[contains(text(), "Explore")]//following::button[contains(., "Done")]',
+            ))
+        )
+        initial_done.click()
+        logger.info('Initial popup closed.')
+    except Exception:
+        pass
 
-class YahooFinanceCrawler:
-    def __init__(self, region: str, base_url: str, headless: bool = True):
-        self.region = region
-        self.base_url = base_url
-        self.headless = headless
-        self.data: List[Dict[str, str]] = []
-        self.driver = self._setup_driver()
 
-    def _setup_driver(self) -> webdriver.Chrome:
-        """Configure and return an instance of the Chrome WebDriver."""
-        chrome_options = Options()
+def _parse_page(job: tuple) -> Tuple[Table, float]:
+    """Worker entry point: parse one captured page, timing the parse."""
+    html, parser = job
+    start = time.perf_counter()
+    table = parse_table(html, parser)
+    return table, time.perf_counter() - start
 
-        if self.headless:
-            chrome_options.add_argument('--headless')
 
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(
-            'user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 '
-            'Safari/537.36'
-        )
+@dataclass
+class CapturedPage:
+    """A page whose HTML was taken from the browser and is being parsed."""
 
-        # 'eager' strategy: releases script as soon as HTML loads
-        chrome_options.page_load_strategy = 'eager'
+    page_num: int
+    url: Optional[str]
+    metrics: PageMetrics
+    parsed: Future
 
-        driver = webdriver.Chrome(options=chrome_options)
-        return driver
 
-    def close(self):
-        """Close the browser."""
-        if self.driver:
-            self.driver.quit()
+class YahooFinanceCrawler(BaseCrawler):
+    """Drives Chrome through the screener UI and reads its table."""
 
-    def run(self):
-        """Main method that orchestrates the execution."""
-        try:
-            logger.info(f'Initializing crawler for region: {self.region}')
-            self.driver.get(self.base_url)
+    backend = 'selenium'
 
-            self._apply_region_filter()
+    def __init__(self, *args, wait_timeout: float = 10.0, **options):
+        super().__init__(*args, **options)
+        self.waiter = TableWaiter(self.driver, timeout=wait_timeout)
+        # Failed attempts already counted by the driver health
+        self._failures_seen = 0
+        if self.health is not None and not self.owns_driver:
+            logger.info(
+                'The browser was lent by the caller; it is not restarted '
+                'when it wears out.'
+            )
+
+    def _setup_driver(self) -> webdriver.Chrome:
+        """Configure and return an instance of the Chrome WebDriver."""
+        return create_driver(self.headless, self.block_profile)
+
+    def _scrape(self) -> None:
+        """Open the filtered screener, scrape every page and save them."""
+        logger.info(f'Initializing crawler for region: {self.region}')
+        self._open_filtered_screener()
+        with self.metrics.phase('rows_per_page'):
             self._set_rows_per_page_to_100()
+        if self.resume:
+            with self.metrics.phase('resume'):
+                self._resume_from_checkpoint()
+        elif self.start_page > 1:
+            self._open_start_page()
+        with self.metrics.phase('scrape'):
             self._scrape_all_pages()
-            self._save_to_csv()
-            logger.info(f'Done. Saved {len(self.data)} rows to CSV.')
+        with self.metrics.phase('save'):
+            self._save_output()
+        if self.checkpoints is not None:
+            self.checkpoints.clear()
+        if self.page_weights is not None:
+            self.page_weights.log_summary()
+        logger.info(f'Done. Saved {len(self.data)} rows.')
+
+    def _open_filtered_screener(self) -> None:
+        """Open the screener with the region filter applied."""
+        with self.metrics.phase('open_page'):
+            filtered = self._open_cached_filter()
+            if not filtered:
+                self.retrier.call(
+                    'navigate', lambda: self.driver.get(self.base_url)
+                )
 
-        except Exception as error:
-            logger.error(f'An error occurred: {error}', exc_info=True)
-            raise error
-        finally:
-            self.close()
+        if not filtered:
+            with self.metrics.phase('region_filter'):
+                self.retrier.call(
+                    'region_filter',
+                    self._apply_region_filter,
+                    on_retry=self._reload_page,
+                )
+            self._learn_filter_url()
+
+    def _reload_page(self) -> None:
+        """Start over from the screener, e.g. after a half-applied filter."""
+        self.driver.get(self.base_url)
+        dismiss_initial_popup(self.driver)
+
+    def _open_cached_filter(self) -> bool:
+        """Go straight to the filtered screener URL of an earlier run.
+
+        False on a cache miss, or when the page it opens does not show the
+        region as selected; the entry is dropped then and the caller goes
+        through the Region menu instead.
+        """
+        if self.filter_cache is None:
+            return False
+        url = self.filter_cache.get(self.region)
+        if url is None:
+            return False
+
+        logger.info(f'Opening the cached filter URL for {self.region}...')
+        self.retrier.call('navigate', lambda: self.driver.get(url))
+        if self.owns_driver:
+            dismiss_initial_popup(self.driver)
+        if self._region_selected():
+            logger.info(f"Region '{self.region}' selected from the cache.")
+            return True
+
+        logger.warning(
+            'The cached filter URL did not select the region. '
+            'Applying the filter through the menu.'
+        )
+        self.filter_cache.invalidate(self.region)
+        return False
+
+    def _region_selected(self) -> bool:
+        """True when the Region button shows this crawler's region."""
+        try:
+            region_btn = WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located((By.XPATH, REGION_BUTTON_XPATH))
+            )
+        except TimeoutException:
+            return False
+        return self.region.lower() in region_btn.text.lower()
+
+    def _learn_filter_url(self) -> None:
+        """Cache the URL of the filtered screener for the next runs."""
+        if self.filter_cache is None:
+            return
+        url = self.driver.current_url
+        if not isinstance(url, str) or url.rstrip('/') == (
+            self.base_url.rstrip('/')
+        ):
+            logger.info(
+                'The screener URL does not carry the region filter; '
+                'not caching it.'
+            )
+            return
+        self.filter_cache.put(self.region, url)
 
     def _apply_region_filter(self) -> None:
         """Robustly applies the region filter."""
         logger.info(f'Attempting to select region: {self.region}')
 
         # 1. Try to close initial "Explore..." popup if present
-        try:
-            initial_done = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((
-                    By.XPATH,
-                    '//div[contains(text(), "Explore")]//following::button[contains(., "Done")]',
-                ))
-            )
-            initial_done.click()
-            logger.info('Initial popup closed.')
-        except Exception:
-            pass
+        # (a warm session lent by the caller has already dismissed it)
+        if self.owns_driver:
+            dismiss_initial_popup(self.driver)
 
         logger.info('Looking for Region button...')
         region_btn = WebDriverWait(self.driver, 15).until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                '//button[contains(@class, "menuBtn") and contains(., "Region")]',
-            ))
+            EC.element_to_be_clickable((By.XPATH, REGION_BUTTON_XPATH))
         )
 
         # Check if the region is already selected
@@ -106,25 +286,7 @@ class YahooFinanceCrawler:
 
         logger.info('Clearing previous selections...')
         try:
-            # Wait for list to load
-            WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located((
-                    By.CSS_SELECTOR,
-                    'input[placeholder="Search..."]',
-                ))
-            )
-
-            # Find all checked checkboxes within the menu
-            checked_boxes = self.driver.find_elements(
-                By.XPATH,
-                '//div[contains(@class,"menu-surface-dialog")]//input[@type="checkbox"]',
-            )
-
-            for box in checked_boxes:
-                if box.is_selected():
-                    self.driver.execute_script('arguments[0].click();', box)
-                    logger.info('Previous checkbox unchecked.')
-                    time.sleep(0.5)
+            self._clear_region_selection()
         except Exception as error:
             logger.warning(f'Error while clearing selection: {error}')
 
@@ -165,175 +327,517 @@ class YahooFinanceCrawler:
         )
         logger.info('Filter applied (menu closed).')
 
+    def _clear_region_selection(self) -> None:
+        """Uncheck the regions already selected in the filter menu."""
+        # Wait for list to load
+        WebDriverWait(self.driver, 10).until(
+            EC.visibility_of_element_located((
+                By.CSS_SELECTOR,
+                'input[placeholder="Search..."]',
+            ))
+        )
+
+        # Find all checked checkboxes within the menu
+        checked_boxes = self.driver.find_elements(
+            By.XPATH,
+            '//div[contains(@class,"menu-surface-dialog")]//input[@type="checkbox"]',
+        )
+
+        for box in checked_boxes:
+            if box.is_selected():
+                self.driver.execute_script('arguments[0].click();', box)
+                # Wait for the click to land instead of a fixed sleep
+                WebDriverWait(self.driver, 2).until(
+                    lambda driver, box=box: not box.is_selected()
+                )
+                logger.info('Previous checkbox unchecked.')
+
     def _set_rows_per_page_to_100(self) -> None:
-        """Changes the rows per page from default (25) to 100."""
+        """Changes the rows per page from default (25) to 100.
+
+        If it still fails after its retries, the crawl goes on with the
+        default page size (four times as many page loads), which is
+        recorded as a fallback in the run outcomes.
+        """
         logger.info('Changing rows per page to 100...')
         try:
-            # 1. Click on the dropdown "25"
-            rows_dropdown = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((
-                    By.XPATH,
-                    '//span[contains(text(), "Rows per page")]/following::button[1] | //button[@title="25"]',
-                ))
+            self.retrier.call('rows_per_page', self._change_rows_per_page)
+        except CircuitOpenError:
+            raise
+        except Exception as error:
+            self.retrier.fallback('rows_per_page')
+            logger.warning(
+                'Could not change rows per page (sticking to default): '
+                f'{error}'
             )
-            self.driver.execute_script('arguments[0].click();', rows_dropdown)
-            logger.info('Rows dropdown clicked.')
 
-            # 2. Click on the option "100"
-            option_100 = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((
-                    By.CSS_SELECTOR,
-                    'div[role="option"][data-value="100"]',
-                ))
-            )
-            self.driver.execute_script('arguments[0].click();', option_100)
-            logger.info('Selected 100 rows per page via JS.')
+    def _change_rows_per_page(self) -> None:
+        # 1. Click on the dropdown "25"
+        rows_dropdown = WebDriverWait(self.driver, 10).until(
+            EC.element_to_be_clickable((
+                By.XPATH,
+                '//span[contains(text(), "Rows per page")]/following::button[1] | //button[@title="25"]',
+            ))
+        )
+        self.driver.execute_script('arguments[0].click();', rows_dropdown)
+        logger.info('Rows dropdown clicked.')
+        before = self.waiter.snapshot()
 
-            # 3. Wait for the table to update (the button should change the title to "100")
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((
-                    By.XPATH,
-                    '//button[@title="100"]',
-                ))
-            )
-            logger.info('Table updated to 100 rows.')
-            time.sleep(3)  # Extra pause to ensure data is loaded
+        # 2. Click on the option "100"
+        option_100 = WebDriverWait(self.driver, 5).until(
+            EC.element_to_be_clickable((
+                By.CSS_SELECTOR,
+                'div[role="option"][data-value="100"]',
+            ))
+        )
+        self.driver.execute_script('arguments[0].click();', option_100)
+        logger.info('Selected 100 rows per page via JS.')
 
-        except Exception as error:
-            logger.warning(
-                f'Could not change rows per page (sticking to default): {error}'
-            )
+        # 3. Wait for the table to update (the button should change the title to "100")
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located((
+                By.XPATH,
+                '//button[@title="100"]',
+            ))
+        )
+        logger.info('Table updated to 100 rows.')
+        self.waiter.wait_for_change(before, 'rows per page')
+        self.page_size = 100
 
     def _scrape_all_pages(self) -> None:
         """Loops through all pages and scrapes data."""
-        page_num = 1
+        if self.tabs > 1 or self.last_page is not None:
+            self.total_pages = self._count_pages()
+        if self.tabs > 1:
+            total_pages = self.total_pages
+            if total_pages:
+                if self.last_page is not None:
+                    total_pages = min(total_pages, self.last_page)
+                self._scrape_pages_in_tabs(total_pages)
+                return
+            logger.warning(
+                'Could not read the number of pages. Scraping sequentially.'
+            )
+
+        if self.parse_workers and self.extract_mode != 'cells':
+            self._scrape_pipelined()
+            return
+
+        page_num = self.start_page
         while True:
             logger.info(f'Scraping page {page_num}...')
-            self._extract_current_page()
+            self.retrier.call('extract', self._extract_current_page)
+            self._page_done(page_num)
+            if self._delta_says_stop() or self._is_last_page(page_num):
+                break
+            if self._restart_worn_out_driver(page_num + 1):
+                page_num += 1
+                continue
 
+            if not self._paginate_to(page_num + 1):
+                break
+            page_num += 1
+
+    def _paginate_to(self, page_num: int) -> bool:
+        """Click Next to reach `page_num`; False after the last page."""
+        first_state: List[TableState] = []
+        try:
+            return self.retrier.call(
+                'next_page',
+                lambda: self._go_to_next_page(page_num, first_state),
+            )
+        except Exception as error:
+            logger.error(f'Pagination stopped: {error}')
+            raise
+
+    def _scrape_pipelined(self) -> None:
+        """Scrape pages sequentially, parsing them in worker processes.
+
+        The browser only waits for the table and takes its HTML, then moves
+        on to the next page while `parse_workers` processes parse it. The
+        parsed pages are stored and checkpointed in page order as they come
+        back, so the result is the same as parsing in line. The delta early
+        stop sees a page only once it is stored, so it may load a page or
+        two more than needed.
+        """
+        pending: Deque[CapturedPage] = deque()
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
             try:
-                # Find Next button by data-testid
-                next_btn = self.driver.find_elements(
-                    By.CSS_SELECTOR, '[data-testid="next-page-button"]'
+                self._capture_pages(executor, pending)
+            except BaseException:
+                self._drain_parsed(pending)
+                raise
+            self._store_parsed(pending, wait=True)
+
+    def _capture_pages(
+        self, executor: ProcessPoolExecutor, pending: Deque[CapturedPage]
+    ) -> None:
+        """Capture pages until the last one, queueing them for parsing."""
+        page_num = self.start_page
+        while True:
+            logger.info(f'Capturing page {page_num}...')
+            html = self.retrier.call('extract', self._capture_html)
+            self._html_captured(html)
+            page = self.metrics.end_page(page_num)
+            url = self._page_captured(page_num)
+            parsed = executor.submit(_parse_page, (html, self.parser))
+            pending.append(CapturedPage(page_num, url, page, parsed))
+            self._store_parsed(pending)
+            if self._delta_says_stop() or self._is_last_page(page_num):
+                break
+            if self._restart_worn_out_driver(page_num + 1):
+                page_num += 1
+                continue
+            if not self._paginate_to(page_num + 1):
+                break
+            page_num += 1
+
+    def _store_parsed(
+        self, pending: Deque[CapturedPage], wait: bool = False
+    ) -> None:
+        """Store the parsed pages at the front of `pending`, in page order.
+
+        Stops at the first page still being parsed unless `wait` is set.
+        """
+        while pending and (wait or pending[0].parsed.done()):
+            page = pending.popleft()
+            (headers, rows), parse_seconds = page.parsed.result()
+            new_rows = 0
+            if headers or rows:
+                start = time.perf_counter()
+                new_rows = self._store_rows(self._table_rows(headers, rows))
+                parse_seconds += time.perf_counter() - start
+            self.metrics.add_parsed_page(page.metrics, new_rows, parse_seconds)
+            logger.info(
+                f'Extracted {new_rows} new rows from page {page.page_num}.'
+            )
+            if self.checkpoints is not None:
+                self.checkpoints.mark_page(
+                    page.page_num, self.page_size, page.url
                 )
 
-                # Check if exists and enabled
-                if next_btn and next_btn[0].is_enabled():
-                    if next_btn[0].get_attribute('disabled') is not None:
-                        logger.info('Next button is disabled. End of pages.')
-                        break
-
-                    # JS click to be safe
-                    self.driver.execute_script(
-                        'arguments[0].click();', next_btn[0]
-                    )
-                    logger.info(
-                        f'Next button clicked. Going to page {page_num + 1}...'
-                    )
-
-                    # Wait for table reload
-                    time.sleep(3)
-                    page_num += 1
-                else:
-                    logger.info(
-                        'No more pages (Next button not found or disabled).'
-                    )
-                    break
-            except Exception as error:
-                logger.error(f'Pagination stopped: {error}')
-                break
+    def _drain_parsed(self, pending: Deque[CapturedPage]) -> None:
+        """Store what was parsed before the run stopped on another error.
 
-    def _extract_current_page(self) -> None:
-        """Extracts data from the currently visible table."""
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((
-                By.CSS_SELECTOR,
-                'table, [role="table"], [data-testid="data-table"]',
-            ))
+        A page that failed to parse is logged instead of raised, so it does
+        not hide the error that stopped the run. The pages after it are
+        dropped to keep the checkpoint in page order.
+        """
+        try:
+            self._store_parsed(pending, wait=True)
+        except Exception as error:
+            logger.error(
+                f'Could not parse a captured page ({error}); dropping it '
+                f'and the {len(pending)} pages after it.'
+            )
+            pending.clear()
+
+    def _go_to_next_page(
+        self, page_num: int, first_state: List[TableState]
+    ) -> bool:
+        """Click Next and wait for `page_num`. False when it was the last.
+
+        The first attempt stores the table state in `first_state`; a retry
+        whose earlier click went through late finds the label changed and
+        does not click again, which would skip a page.
+        """
+        before = self.waiter.snapshot()
+        if not first_state:
+            first_state.append(before)
+        elif before.label and before.label != first_state[0].label:
+            logger.info(f'Page {page_num} loaded after all.')
+            return True
+
+        next_btn = self._next_button()
+        if next_btn is None:
+            logger.info('No more pages (Next button not found or disabled).')
+            return False
+
+        # JS click to be safe
+        self.driver.execute_script('arguments[0].click();', next_btn)
+        logger.info(f'Next button clicked. Going to page {page_num}...')
+
+        with self.metrics.page_step('wait'):
+            timing = self.waiter.wait_for_change(before, f'page {page_num}')
+        if timing.reason == 'timeout':
+            raise TimeoutException(f'Page {page_num} did not load.')
+        return True
+
+    def _next_button(self) -> Optional[WebElement]:
+        """The Next button, or None when it is missing or disabled."""
+        # Find Next button by data-testid
+        next_btn = self.driver.find_elements(
+            By.CSS_SELECTOR, '[data-testid="next-page-button"]'
         )
-
-        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-        table = (
-            soup.find('table')
-            or soup.find(attrs={'role': 'table'})
-            or soup.find(attrs={'data-testid': 'data-table'})
+        # Check if exists and enabled
+        if not next_btn or not next_btn[0].is_enabled():
+            return None
+        if next_btn[0].get_attribute('disabled') is not None:
+            return None
+        return next_btn[0]
+
+    def _restart_worn_out_driver(self, page_num: int) -> bool:
+        """Restart the browser on `page_num` if the driver health says so.
+
+        Records the page just scraped first. True when the new browser is
+        already showing `page_num`, so the caller must not click Next.
+        """
+        if self.health is None or not self.owns_driver:
+            return False
+        failures = sum(
+            outcome.failures for outcome in self.retrier.outcomes.values()
         )
-
-        if not table:
+        self.health.record_page(
+            self.metrics.pages[-1], failures - self._failures_seen
+        )
+        self._failures_seen = failures
+        reason = self.health.restart_reason(self.driver)
+        if reason is None or self._next_button() is None:
+            return False
+        self._restart_driver(page_num, reason)
+        return True
+
+    def _restart_driver(self, page_num: int, reason: str) -> None:
+        """Replace the browser with a fresh one showing `page_num`.
+
+        The filter and the page size come back with the offset URL of the
+        page, like in tabs and resumed runs. When the new browser does not
+        show the region as selected, they are applied through the menus
+        again before opening the page.
+        """
+        logger.warning(
+            f'Restarting the browser before page {page_num}: {reason}.'
+        )
+        url = self._page_url(page_num, self.driver.current_url)
+        with self.metrics.phase('driver_restart'):
+            old_driver, self.driver = self.driver, None
+            try:
+                old_driver.quit()
+            except Exception as error:
+                logger.warning(f'Could not quit the old browser: {error}')
+            self.driver = self._setup_driver()
+            self.waiter.driver = self.driver
+            self.retrier.call('navigate', lambda: self.driver.get(url))
+            dismiss_initial_popup(self.driver)
+            self._keep_region(page_num)
+        self.health.reset()
+        self.metrics.driver_restarts += 1
+
+    def _keep_region(self, page_num: int) -> None:
+        """Filter the region again if the offset URL of a page lost it."""
+        if self._region_selected():
             return
-
-        headers = []
-        header_row = table.find('thead')
-        if header_row:
-            headers = [
-                th.get_text(strip=True).lower()
-                for th in header_row.find_all(['th', 'td'])
-            ]
-        if not headers:
-            first_row = table.find('tr')
-            if first_row:
-                headers = [
-                    th.get_text(strip=True).lower()
-                    for th in first_row.find_all(['th', 'td'])
-                ]
-
-        idx_symbol = 0
-        idx_name = 1
-        idx_price = 2
-        for index, header in enumerate(headers):
-            if 'symbol' in header:
-                idx_symbol = index
-            elif 'name' in header:
-                idx_name = index
-            elif 'price' in header:
-                idx_price = index
-
-        tbody = table.find('tbody') or table
-        rows = tbody.find_all('tr')
-
-        count_before = len(self.data)
-        for row in rows:
-            cells = row.find_all(['td', 'th'])
-            if cells and cells[0].get_text(strip=True).lower() == 'symbol':
-                continue
-            if len(cells) > max(idx_symbol, idx_name, idx_price):
-                symbol = cells[idx_symbol].get_text(strip=True)
-                name = cells[idx_name].get_text(strip=True)
-                price = cells[idx_price].get_text(strip=True).replace(',', '')
-
-                # Avoid duplicates
-                if symbol and not any(
-                    data['symbol'] == symbol for data in self.data
-                ):
-                    self.data.append({
-                        'symbol': symbol,
-                        'name': name,
-                        'price': price,
-                    })
-
-        logger.info(f'Extracted {len(self.data) - count_before} new rows.')
-
-    def _save_to_csv(self) -> None:
-        """Save self.data to a CSV file."""
-        if not self.data:
-            logger.warning('No data to save.')
+        logger.warning(
+            'The page URL did not keep the region filter. '
+            'Applying it through the menu.'
+        )
+        self._restore_filter(page_num)
+
+    def _restore_filter(self, page_num: int) -> None:
+        """Filter the region and set the page size again, then open a page."""
+        self.retrier.call('navigate', self._reload_page)
+        self.retrier.call(
+            'region_filter',
+            self._apply_region_filter,
+            on_retry=self._reload_page,
+        )
+        if self.page_size != DEFAULT_PAGE_SIZE:
+            self._set_rows_per_page_to_100()
+        self._open_page(page_num)
+
+    def _count_pages(self) -> Optional[int]:
+        """Read the total of rows from the pagination label (or None)."""
+        label = self.driver.execute_script(PAGINATION_LABEL_SCRIPT)
+        if not isinstance(label, str):
+            return None
+        match = re.search(r'of\s+([\d,]+)', label)
+        if not match:
+            return None
+        total_rows = int(match.group(1).replace(',', ''))
+        return max(1, math.ceil(total_rows / self.page_size))
+
+    def _page_url(self, page_num: int, url: str) -> str:
+        """Return `url` pointing at the given 1-based page."""
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query))
+        query['start'] = str((page_num - 1) * self.page_size)
+        query['count'] = str(self.page_size)
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    def _scrape_pages_in_tabs(self, total_pages: int) -> None:
+        """Load pages by offset in several tabs of the same browser.
+
+        The first page (1, or the resumed one) is already on screen. The
+        remaining pages are
+        opened directly by URL (start/count), keeping up to `self.tabs`
+        loads in flight. Tabs are read back in page order, and a tab that
+        was read immediately gets the next pending page, so the browser
+        keeps loading while rows are extracted and merged in order.
+        """
+        logger.info(
+            f'Scraping {total_pages} pages with up to {self.tabs} tabs...'
+        )
+        logger.info(f'Scraping page {self.start_page}...')
+        self.retrier.call('extract', self._extract_current_page)
+        self._page_done(self.start_page)
+        if self._delta_says_stop():
             return
 
-        output_dir = 'cdn'
-        if not path.exists(output_dir):
-            makedirs(output_dir)
+        filtered_url = self.driver.current_url
+        origin = self.driver.current_window_handle
+        pending = deque(range(self.start_page + 1, total_pages + 1))
+        handles = [origin]
+        profile = get_profile(self.block_profile)
+        for _ in range(min(self.tabs, len(pending)) - 1):
+            self.driver.switch_to.new_window('tab')
+            # DevTools URL blocking only covers the tab it was sent to
+            apply_profile(self.driver, profile)
+            handles.append(self.driver.current_window_handle)
+
+        in_flight = deque()
+        for handle in handles:
+            if pending:
+                page_num = pending.popleft()
+                self._open_page_in_tab(handle, page_num, filtered_url)
+                in_flight.append((handle, page_num))
+
+        try:
+            self._read_tabs(in_flight, pending, filtered_url)
+        except Exception as error:
+            logger.error(f'Pagination stopped: {error}')
+            raise
+        finally:
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(origin)
+
+    def _read_tabs(
+        self, in_flight: Deque, pending: Deque[int], filtered_url: str
+    ) -> None:
+        """Extract the tabs in turn, opening the next pending page in each."""
+        while in_flight:
+            handle, page_num = in_flight.popleft()
+            self.driver.switch_to.window(handle)
+            logger.info(f'Scraping page {page_num}...')
+            self.retrier.call(
+                'extract',
+                lambda page_num=page_num: self._extract_tab(page_num),
+                # Reload the page in the same tab before trying again
+                on_retry=lambda handle=handle, page_num=page_num: (
+                    self._open_page_in_tab(handle, page_num, filtered_url)
+                ),
+            )
+            self._page_done(page_num)
+            if self._delta_says_stop():
+                break
 
-        current_datetime = datetime.datetime.now()
-        timestamp = int(current_datetime.timestamp())
-        filename = f'{timestamp}_yahoo_finance_crawler_{self.region.replace(" ", "_")}.csv'
-        file_path = path.join(output_dir, filename)
+            if pending:
+                next_page = pending.popleft()
+                self._open_page_in_tab(handle, next_page, filtered_url)
+                in_flight.append((handle, next_page))
 
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=['symbol', 'name', 'price'],
-                quoting=csv.QUOTE_ALL,
+    def _extract_tab(self, page_num: int) -> None:
+        """Wait for the page loading in the current tab, then extract it."""
+        with self.metrics.page_step('wait'):
+            WebDriverWait(self.driver, self.waiter.timeout).until(
+                lambda driver: driver.execute_script(TAB_READY_SCRIPT)
             )
-            writer.writeheader()
-            writer.writerows(self.data)
-        logger.info(f'Saved to {file_path}')
+        self._keep_region(page_num)
+        self._extract_current_page()
+
+    def _open_page_in_tab(self, handle: str, page_num: int, url: str) -> None:
+        """Start loading a page in a tab without waiting for it."""
+        self.driver.switch_to.window(handle)
+        self.driver.execute_script(
+            NAVIGATE_SCRIPT, self._page_url(page_num, url)
+        )
+
+    def _wait_for_table(self) -> None:
+        with self.metrics.page_step('wait'):
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((
+                    By.CSS_SELECTOR,
+                    TABLE_SELECTOR,
+                ))
+            )
+
+    def _extract_current_page(self) -> None:
+        """Extracts data from the currently visible table."""
+        self._wait_for_table()
+        headers, rows = self._capture_table()
+        if not headers and not rows:
+            return
+        with self.metrics.page_step('parse'):
+            page_rows = self._table_rows(headers, rows)
+
+        new_rows = self._store_rows(page_rows)
+        self.metrics.add_page_rows(new_rows)
+        logger.info(f'Extracted {new_rows} new rows.')
+
+    def _resume_from_checkpoint(self) -> None:
+        """Restore the checkpoint and jump straight to the next page."""
+        checkpoint = self._restore_checkpoint()
+        if checkpoint is not None:
+            self._open_start_page(checkpoint.url)
+        elif self.start_page > 1:
+            self._open_start_page()
+
+    def _open_start_page(self, url: Optional[str] = None) -> None:
+        """Open `self.start_page` directly by offset."""
+        if url is None and self.range_page_size:
+            # The offset URL sets the page size, so the range starts and
+            # ends on the same rows as in the run that split the region
+            self.page_size = self.range_page_size
+        self._open_page(self.start_page, url)
+        self._keep_region(self.start_page)
+
+    def _open_page(self, page_num: int, url: Optional[str] = None) -> None:
+        """Open `page_num` by offset from `url`, or from the current URL."""
+        url = self._page_url(page_num, url or self.driver.current_url)
+        self.retrier.call('navigate', lambda: self.driver.get(url))
+
+    def _capture_table(self) -> Table:
+        """Read the table headers and cell texts according to extract_mode.
+
+        - 'page': parses the whole page_source.
+        - 'fragment': parses only the table outerHTML taken from the browser.
+        - 'cells': reads the cell texts straight from the DOM, no parsing.
+
+        'fragment' and 'cells' fall back to 'page' when the browser does
+        not return the expected value.
+        """
+        if self.extract_mode == 'cells':
+            with self.metrics.page_step('fetch'):
+                table = self.driver.execute_script(TABLE_CELLS_SCRIPT)
+            if isinstance(table, dict):
+                if self.recorder is not None:
+                    self._record_table_html()
+                headers = [header.lower() for header in table['headers']]
+                return headers, table['rows']
+        return self._parse_html(self._fetch_html())
+
+    def _capture_html(self) -> str:
+        """Wait for the table and return the HTML to parse, unparsed."""
+        self._wait_for_table()
+        return self._fetch_html()
+
+    def _fetch_html(self) -> str:
+        """The table outerHTML in 'fragment' mode, else the page source."""
+        if self.extract_mode == 'fragment':
+            with self.metrics.page_step('fetch'):
+                html = self.driver.execute_script(TABLE_HTML_SCRIPT)
+            if isinstance(html, str):
+                logger.debug(f'Fetched {len(html)} bytes of table HTML.')
+                return html
+
+        with self.metrics.page_step('fetch'):
+            html = self.driver.page_source
+        logger.debug(f'Fetched {len(html)} bytes of page source.')
+        return html
+
+    def _record_table_html(self) -> None:
+        """The cells mode parses nothing, so fetch the HTML to record."""
+        html = self.driver.execute_script(TABLE_HTML_SCRIPT)
+        if isinstance(html, str):
+            self.recorder.record(html)
@@ -0,0 +1,200 @@
+import json
+import logging
+import queue
+import socketserver
+import threading
+import time
+from typing import Optional
+
+from .blocking import DEFAULT_PROFILE
+from .client import DEFAULT_HOST, DEFAULT_PORT
+from .core import YahooFinanceCrawler, create_driver, dismiss_initial_popup
+
+logger = logging.getLogger(__name__)
+
+
+class DaemonServer(socketserver.ThreadingTCPServer):
+    """Threading TCP server that can be restarted on the same port at once."""
+
+    allow_reuse_address = True
+
+
+class BrowserSession:
+    """A warm Chrome instance: screener already loaded, popup dismissed."""
+
+    def __init__(
+        self,
+        base_url: str,
+        headless: bool = True,
+        block_profile: str = DEFAULT_PROFILE,
+    ):
+        self.jobs = 0
+        self.broken = False
+        self.driver = create_driver(headless, block_profile)
+        self.driver.get(base_url)
+        dismiss_initial_popup(self.driver)
+
+    def close(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as error:
+            logger.warning(f'Could not quit browser session: {error}')
+
+
+class CrawlerDaemon:
+    """Long-lived process that runs crawl jobs on warm browser sessions.
+
+    Jobs arrive as one JSON object per line on a local TCP socket, e.g.
+    {"region": "Brazil", "options": {"output": "ndjson"}}, and are answered
+    with one JSON line. Each job borrows a session from the pool, so up to
+    `sessions` jobs run at the same time and later ones wait for a free
+    session. A session is recycled (quit and replaced by a fresh one)
+    after `recycle_after` jobs, or right away when a job fails on it.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        base_url: str,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        sessions: int = 1,
+        recycle_after: int = 20,
+        headless: bool = True,
+        block_profile: str = DEFAULT_PROFILE,
+    ):
+        self.base_url = base_url
+        self.host = host
+        self.port = port
+        self.sessions = max(1, sessions)
+        self.recycle_after = recycle_after
+        self.headless = headless
+        self.block_profile = block_profile
+        self.jobs_done = 0
+        self.server: Optional[DaemonServer] = None
+        # None is a placeholder for a session that still has to be started
+        self._pool = queue.Queue()
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        """Start every browser session before accepting jobs."""
+        for index in range(self.sessions):
+            logger.info(f'Warming up session {index + 1}/{self.sessions}...')
+            self._pool.put(self._new_session())
+
+    def _new_session(self) -> Optional[BrowserSession]:
+        try:
+            return BrowserSession(
+                self.base_url, self.headless, self.block_profile
+            )
+        except Exception as error:
+            logger.error(f'Could not start a browser session: {error}')
+            return None
+
+    def run_job(self, job: dict) -> dict:
+        """Run one crawl job on a pooled session and describe the result."""
+        region = job.get('region')
+        if not region:
+            return {'ok': False, 'error': 'Missing "region".'}
+        options = dict(job.get('options') or {})
+        # Browser settings belong to the daemon's sessions, not to a job
+        options.pop('headless', None)
+        options.pop('block_profile', None)
+
+        session = self._pool.get()
+        if session is None:
+            session = self._new_session()
+        if session is None:
+            self._pool.put(None)
+            return {
+                'ok': False,
+                'region': region,
+                'error': 'No browser session available.',
+            }
+
+        start = time.perf_counter()
+        try:
+            crawler = YahooFinanceCrawler(
+                region=region,
+                base_url=self.base_url,
+                driver=session.driver,
+                **options,
+            )
+            crawler.run()
+            result = {'ok': True, 'region': region, 'rows': len(crawler.data)}
+        except Exception as error:
+            session.broken = True
+            result = {
+                'ok': False,
+                'region': region,
+                'error': f'{type(error).__name__}: {error}',
+            }
+        finally:
+            session.jobs += 1
+            with self._lock:
+                self.jobs_done += 1
+            self._release(session)
+
+        result['seconds'] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _release(self, session: BrowserSession) -> None:
+        if session.broken or session.jobs >= self.recycle_after:
+            reason = 'failed job' if session.broken else f'{session.jobs} jobs'
+            logger.info(f'Recycling browser session after {reason}.')
+            session.close()
+            session = self._new_session()
+        self._pool.put(session)
+
+    def status(self) -> dict:
+        return {
+            'ok': True,
+            'sessions': self.sessions,
+            'idle_sessions': self._pool.qsize(),
+            'jobs_done': self.jobs_done,
+        }
+
+    def handle(self, request: dict) -> dict:
+        """Dispatch a request: {"command": "crawl" | "status", ...}."""
+        command = request.get('command', 'crawl')
+        if command == 'status':
+            return self.status()
+        if command == 'crawl':
+            return self.run_job(request)
+        return {'ok': False, 'error': f'Unknown command: {command!r}'}
+
+    def serve_forever(self) -> None:
+        """Warm up the sessions and answer jobs until interrupted."""
+        self.warm_up()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                    except ValueError:
+                        response = {'ok': False, 'error': 'Invalid JSON.'}
+                    else:
+                        response = daemon.handle(request)
+                    self.wfile.write(json.dumps(response).encode() + b'\n')
+
+        self.server = DaemonServer((self.host, self.port), Handler)
+        self.port = self.server.server_address[1]
+        logger.info(f'Crawler daemon listening on {self.host}:{self.port}')
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.close()
+
+    def shutdown(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+
+    def close(self) -> None:
+        """Quit every idle browser session."""
+        while not self._pool.empty():
+            session = self._pool.get_nowait()
+            if session is not None:
+                session.close()
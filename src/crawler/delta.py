@@ -0,0 +1,198 @@
+import csv
+import json
+import logging
+import re
+from os import listdir, makedirs, path, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .schema import Row, typed_row
+from .sinks import FIELDNAMES, read_snapshot, snapshot_path
+
+logger = logging.getLogger(__name__)
+
+ADDED = 'added'
+CHANGED = 'changed'
+REMOVED = 'removed'
+# Not 'change', which is the price change column of the schema
+DELTA_COLUMN = 'delta'
+DELTA_FIELDNAMES = [*FIELDNAMES, DELTA_COLUMN]
+
+
+def _snapshot_files(region: str, output_dir: str, suffix: str) -> List[tuple]:
+    """List (timestamp, path) of the region's files ending in `suffix`."""
+    if not path.isdir(output_dir):
+        return []
+    pattern = re.compile(
+        rf'^(\d+)_yahoo_finance_crawler_'
+        rf'{re.escape(region.replace(" ", "_"))}{re.escape(suffix)}$'
+    )
+    files = []
+    for filename in listdir(output_dir):
+        match = pattern.match(filename)
+        if match:
+            files.append((
+                int(match.group(1)),
+                path.join(output_dir, filename),
+            ))
+    return sorted(files)
+
+
+def read_delta(file_path: str) -> Iterator[Tuple[str, Row]]:
+    """(kind of change, typed row) for every row of a delta CSV."""
+    with open(file_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            # Delta files written before the schema had a 'change' column
+            # used that name for the marker
+            change = row.pop(DELTA_COLUMN, None) or row.pop('change')
+            yield change, typed_row(row)
+
+
+def load_previous_state(
+    region: str, output_dir: str, output: str = 'csv'
+) -> Optional[Dict[str, Row]]:
+    """Rebuild the last known rows of a region, keyed by symbol.
+
+    Starts from the latest full snapshot in the `output` format (csv,
+    ndjson or parquet) and replays every delta file written after it,
+    with the number columns as floats. Returns None when there is no full
+    snapshot yet.
+    """
+    snapshots = _snapshot_files(region, output_dir, f'.{output}')
+    if not snapshots:
+        return None
+    base_timestamp, base_path = snapshots[-1]
+
+    state = {row['symbol']: row for row in read_snapshot(base_path)}
+
+    for timestamp, delta_path in _snapshot_files(
+        region, output_dir, '.delta.csv'
+    ):
+        if timestamp <= base_timestamp:
+            continue
+        for change, row in read_delta(delta_path):
+            if change == REMOVED:
+                state.pop(row['symbol'], None)
+            else:
+                state[row['symbol']] = row
+
+    logger.info(
+        f'Loaded {len(state)} rows from the previous snapshot {base_path}.'
+    )
+    return state
+
+
+class DeltaTracker:
+    """Compares extracted rows with the previous state of a region.
+
+    Rows are fed page by page through `observe()`. When
+    `stop_after_unchanged_pages` is set, `should_stop()` becomes true after
+    that many consecutive pages without changes, which lets a crawl of a
+    sorted screener end early; in that case symbols that were not seen
+    are not reported as removed, since they were never checked.
+    """
+
+    def __init__(
+        self,
+        previous: Dict[str, Row],
+        stop_after_unchanged_pages: Optional[int] = None,
+    ):
+        self.previous = previous
+        self.stop_after_unchanged_pages = stop_after_unchanged_pages
+        self.changes: Dict[str, Row] = {}
+        self.seen = set()
+        self.unchanged_pages = 0
+        self.stopped_early = False
+
+    def observe(self, rows: Iterable[Row]) -> int:
+        """Record the changes in a page of rows and return how many."""
+        page_changes = 0
+        for row in rows:
+            symbol = row['symbol']
+            self.seen.add(symbol)
+            old = self.previous.get(symbol)
+            if old is None:
+                change = ADDED
+            elif old['price'] != row['price'] or old['name'] != row['name']:
+                change = CHANGED
+            else:
+                self.changes.pop(symbol, None)
+                continue
+            self.changes[symbol] = {**row, DELTA_COLUMN: change}
+            page_changes += 1
+
+        if page_changes:
+            self.unchanged_pages = 0
+        else:
+            self.unchanged_pages += 1
+        return page_changes
+
+    def should_stop(self) -> bool:
+        limit = self.stop_after_unchanged_pages
+        self.stopped_early = bool(limit) and self.unchanged_pages >= limit
+        return self.stopped_early
+
+    def removed(self) -> List[Row]:
+        if self.stopped_early:
+            return []
+        return [
+            {**row, DELTA_COLUMN: REMOVED}
+            for symbol, row in self.previous.items()
+            if symbol not in self.seen
+        ]
+
+    def delta_rows(self) -> List[Row]:
+        return [*self.changes.values(), *self.removed()]
+
+
+def write_delta(
+    tracker: DeltaTracker, region: str, output_dir: str
+) -> Optional[str]:
+    """Write the delta CSV and its changelog, returning the CSV path.
+
+    Nothing is written when there are no changes.
+    """
+    rows = tracker.delta_rows()
+    if not rows:
+        logger.info('No changes since the previous snapshot.')
+        return None
+
+    if not path.exists(output_dir):
+        makedirs(output_dir)
+    delta_path = snapshot_path(region, 'delta.csv', output_dir)
+    changelog_path = delta_path.replace('.delta.csv', '.changelog.json')
+
+    with open(f'{delta_path}.part', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(
+            f, fieldnames=DELTA_FIELDNAMES, quoting=csv.QUOTE_ALL
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+
+    changelog = {
+        'region': region,
+        'added': [row['symbol'] for row in rows if row[DELTA_COLUMN] == ADDED],
+        'removed': [
+            row['symbol'] for row in rows if row[DELTA_COLUMN] == REMOVED
+        ],
+        'changed': [
+            {
+                'symbol': row['symbol'],
+                'old_price': tracker.previous[row['symbol']]['price'],
+                'new_price': row['price'],
+            }
+            for row in rows
+            if row[DELTA_COLUMN] == CHANGED
+        ],
+        'stopped_early': tracker.stopped_early,
+    }
+    with open(f'{changelog_path}.part', 'w', encoding='utf-8') as f:
+        json.dump(changelog, f, ensure_ascii=False, indent=2)
+
+    replace(f'{changelog_path}.part', changelog_path)
+    replace(f'{delta_path}.part', delta_path)
+    logger.info(
+        f'{len(changelog["added"])} added, {len(changelog["changed"])} '
+        f'changed, {len(changelog["removed"])} removed. '
+        f'Changelog saved to {changelog_path}'
+    )
+    return delta_path
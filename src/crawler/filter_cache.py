@@ -0,0 +1,78 @@
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from os import makedirs, path, remove, replace
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+FILTER_CACHE_DIR = '.filters'
+DEFAULT_TTL_HOURS = 24.0
+
+
+@dataclass
+class CachedFilter:
+    """A screener URL that opens already filtered by a region."""
+
+    region: str
+    url: str
+    learned_at: float
+
+
+class FilterCache:
+    """Filtered screener URLs per region, under `<output_dir>/.filters`.
+
+    The URL is learned after the region filter is applied through the UI
+    and reused by later runs until it is `ttl_hours` old, so they can skip
+    the Region menu altogether. Each region has its own '<region>.json',
+    written atomically, so parallel workers never overwrite each other.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = path.join(output_dir, FILTER_CACHE_DIR)
+        self.ttl_seconds = ttl_hours * 3600
+        self.clock = clock
+
+    def _path(self, region: str) -> str:
+        return path.join(self.directory, f'{region.replace(" ", "_")}.json')
+
+    def get(self, region: str) -> Optional[str]:
+        """The cached URL for `region`, or None if missing or expired."""
+        file_path = self._path(region)
+        if not path.exists(file_path):
+            return None
+        try:
+            with open(file_path, encoding='utf-8') as f:
+                entry = CachedFilter(**json.load(f))
+        except (OSError, ValueError, TypeError) as error:
+            logger.warning(f'Ignoring unreadable filter cache: {error}')
+            return None
+        age = self.clock() - entry.learned_at
+        if age > self.ttl_seconds:
+            logger.info(
+                f'Cached filter URL for {region} expired '
+                f'({age / 3600:.1f}h old).'
+            )
+            return None
+        return entry.url
+
+    def put(self, region: str, url: str) -> None:
+        if not path.exists(self.directory):
+            makedirs(self.directory)
+        file_path = self._path(region)
+        entry = CachedFilter(region=region, url=url, learned_at=self.clock())
+        with open(f'{file_path}.part', 'w', encoding='utf-8') as f:
+            json.dump(asdict(entry), f)
+        replace(f'{file_path}.part', file_path)
+        logger.info(f'Cached the filter URL for {region}.')
+
+    def invalidate(self, region: str) -> None:
+        file_path = self._path(region)
+        if path.exists(file_path):
+            remove(file_path)
@@ -0,0 +1,184 @@
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional
+
+from .metrics import PageMetrics
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 10
+
+# What the command line uses; a crawler built in code monitors nothing
+DEFAULT_MAX_SLOWDOWN = 3.0
+DEFAULT_MAX_ERROR_RATE = 0.5
+
+PROC_DIR = '/proc'
+
+
+@dataclass(frozen=True)
+class HealthLimits:
+    """When a browser is worn out enough to be replaced in the middle of a run.
+
+    - `restart_after_pages`: restart after this many pages, healthy or not.
+    - `max_browser_mb`: resident memory of the browser and its child
+      processes (renderers, GPU...).
+    - `max_slowdown`: how many times slower the last `window` pages may
+      load (wait plus fetch) than the first `window` pages of the browser.
+    - `max_error_rate`: share of the last `window` pages that needed a
+      retry.
+
+    Zero or None turns a limit off.
+    """
+
+    restart_after_pages: int = 0
+    max_browser_mb: Optional[float] = None
+    max_slowdown: Optional[float] = None
+    max_error_rate: Optional[float] = None
+    window: int = DEFAULT_WINDOW
+
+    @property
+    def enabled(self) -> bool:
+        return bool(
+            self.restart_after_pages
+            or self.max_browser_mb
+            or self.max_slowdown
+            or self.max_error_rate
+        )
+
+
+def _read_processes() -> Dict[int, List[int]]:
+    """[parent pid, resident pages] of every process, by pid."""
+    processes = {}
+    for entry in os.listdir(PROC_DIR):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'{PROC_DIR}/{entry}/stat', encoding='utf-8') as f:
+                stat = f.read()
+        except OSError:
+            # The process ended while the table was being read
+            continue
+        # The command name may hold spaces; the fields after it do not.
+        # They start at the state (field 3): ppid is field 4, rss field 24
+        fields = stat[stat.rfind(')') + 2 :].split()
+        processes[int(entry)] = [int(fields[1]), int(fields[21])]
+    return processes
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Resident bytes of `pid` and all its descendants, read from /proc.
+
+    None where /proc is not available (anything but Linux) or when the
+    process is gone.
+    """
+    # os.sysconf only exists on Unix
+    sysconf = getattr(os, 'sysconf', None)
+    if sysconf is None:
+        return None
+    try:
+        processes = _read_processes()
+        page_size = sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+    if pid not in processes:
+        return None
+
+    children: Dict[int, List[int]] = {}
+    for child, (parent, _) in processes.items():
+        children.setdefault(parent, []).append(child)
+    pages = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        pages += processes[current][1]
+        stack.extend(children.get(current, ()))
+    return pages * page_size
+
+
+def browser_rss(driver: 'webdriver.Chrome') -> Optional[int]:
+    """Resident bytes of chromedriver and the Chrome processes it started.
+
+    None for drivers without a local service process, e.g. remote ones.
+    """
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    pid = getattr(process, 'pid', None)
+    if not isinstance(pid, int):
+        return None
+    return process_tree_rss(pid)
+
+
+class DriverHealth:
+    """Watches the browser page by page and tells when to restart it.
+
+    `record_page()` is called once per scraped page with its timings and
+    the failed attempts since the previous page; `restart_reason()` then
+    says why the browser should be replaced, or None while it is fine.
+    `reset()` starts over for the new browser.
+    """
+
+    def __init__(self, limits: HealthLimits):
+        self.limits = limits
+        self.window = max(1, limits.window)
+        self._warned_rss = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.pages = 0
+        self.baseline: List[float] = []
+        self.recent: Deque[float] = deque(maxlen=self.window)
+        self.errors: Deque[bool] = deque(maxlen=self.window)
+
+    def record_page(self, page: PageMetrics, failures: int = 0) -> None:
+        load_seconds = page.wait_seconds + page.fetch_seconds
+        self.pages += 1
+        if len(self.baseline) < self.window:
+            self.baseline.append(load_seconds)
+        self.recent.append(load_seconds)
+        self.errors.append(failures > 0)
+
+    def slowdown(self) -> Optional[float]:
+        """Mean load time of the recent pages over the first ones."""
+        if self.pages < 2 * self.window:
+            return None
+        baseline = sum(self.baseline) / len(self.baseline)
+        if baseline <= 0:
+            return None
+        return sum(self.recent) / len(self.recent) / baseline
+
+    def error_rate(self) -> Optional[float]:
+        if len(self.errors) < self.window:
+            return None
+        return sum(self.errors) / len(self.errors)
+
+    def restart_reason(
+        self, driver: Optional['webdriver.Chrome'] = None
+    ) -> Optional[str]:
+        limits = self.limits
+        if limits.restart_after_pages and (
+            self.pages >= limits.restart_after_pages
+        ):
+            return f'{self.pages} pages on the same browser'
+        if limits.max_browser_mb and driver is not None:
+            rss = browser_rss(driver)
+            if rss is None and not self._warned_rss:
+                self._warned_rss = True
+                logger.warning(
+                    'Cannot read the memory of the browser processes; '
+                    'the memory limit is not enforced.'
+                )
+            elif rss is not None and rss / 2**20 > limits.max_browser_mb:
+                return f'browser using {rss / 2**20:.0f} MB'
+        slowdown = self.slowdown()
+        if limits.max_slowdown and slowdown is not None:
+            if slowdown > limits.max_slowdown:
+                return f'pages loading {slowdown:.1f}x slower'
+        error_rate = self.error_rate()
+        if limits.max_error_rate and error_rate is not None:
+            if error_rate > limits.max_error_rate:
+                return f'{error_rate:.0%} of the last pages needed retries'
+        return None
@@ -0,0 +1,590 @@
+import json
+import logging
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from os import getpid, makedirs, path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from .backends import DEFAULT_BACKEND, load_backend
+from .pool import RegionResult
+from .schema import Quote, Row
+from .sinks import OUTPUT_DIR, create_sink
+from .store import KEEP_FIRST, RowStore
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from .base import BaseCrawler
+
+logger = logging.getLogger(__name__)
+
+JOBS_PATH = path.join(OUTPUT_DIR, 'jobs.sqlite')
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_POLL_INTERVAL = 5.0
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# A job's rows go back to the queue and the coordinator writes the region
+# snapshot, so these whole-region options are turned off in the workers.
+JOB_OVERRIDES = {
+    'output': None,
+    'stream': False,
+    'delta': False,
+    'checkpoint': False,
+    'resume': False,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    options TEXT NOT NULL,
+    first_page INTEGER NOT NULL DEFAULT 1,
+    last_page INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    rows INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (job_id, position)
+);
+CREATE TABLE IF NOT EXISTS merges (
+    run_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    path TEXT,
+    rows INTEGER NOT NULL,
+    merged_at REAL NOT NULL,
+    PRIMARY KEY (run_id, region)
+);
+"""
+
+
+@dataclass
+class Job:
+    """A region, or a range of its pages, to crawl."""
+
+    id: int
+    run_id: str
+    region: str
+    backend: str
+    options: dict
+    first_page: int = 1
+    last_page: Optional[int] = None
+    attempts: int = 0
+    status: str = PENDING
+    error: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self.last_page is None and self.first_page == 1:
+            pages = 'all pages'
+        else:
+            pages = f'pages {self.first_page}-{self.last_page or ""}'
+        return f'job {self.id} ({self.region}, {pages})'
+
+
+def _job(record: 'sqlite3.Row') -> Job:
+    return Job(
+        id=record['id'],
+        run_id=record['run_id'],
+        region=record['region'],
+        backend=record['backend'],
+        options=json.loads(record['options']),
+        first_page=record['first_page'],
+        last_page=record['last_page'],
+        attempts=record['attempts'],
+        status=record['status'],
+        error=record['error'],
+    )
+
+
+def worker_name() -> str:
+    return f'{socket.gethostname()}:{getpid()}'
+
+
+class JobQueue:
+    """Crawl jobs in a SQLite file shared by the workers and coordinator.
+
+    Workers claim the oldest pending job with a lease of `lease_seconds`
+    and renew it with `heartbeat()`. A job whose lease ran out (its worker
+    died, hung or lost the share) is handed to the next worker that asks,
+    and a failed one is queued again, up to `max_attempts` runs in total.
+    Finished jobs keep their rows in the file until they are merged.
+
+    Every call opens its own connection and writes in a BEGIN IMMEDIATE
+    transaction, so processes on several hosts can share the file as long
+    as its filesystem has working locks. Another broker can stand in for
+    it by implementing the same methods.
+    """
+
+    def __init__(
+        self,
+        file_path: str = JOBS_PATH,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = file_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.clock = clock
+        directory = path.dirname(file_path)
+        if directory and not path.exists(directory):
+            makedirs(directory)
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator['sqlite3.Connection']:
+        # Imported here so the CLI does not load sqlite3 just for --help
+        import sqlite3  # noqa: PLC0415
+
+        connection = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None
+        )
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator['sqlite3.Connection']:
+        """A connection inside a write transaction, so claims never race."""
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield connection
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+    def enqueue(
+        self,
+        regions: Sequence[str],
+        backend: str = DEFAULT_BACKEND,
+        options: Optional[dict] = None,
+        pages_per_job: Optional[int] = None,
+    ) -> str:
+        """Queue one job per region and return the id of the run.
+
+        With `pages_per_job` each job only covers the first pages of its
+        region; the worker that runs it reads the number of pages and
+        queues the rest of the region in ranges of the same size.
+        """
+        run_id = uuid.uuid4().hex[:12]
+        with self._transaction() as connection:
+            connection.executemany(
+                'INSERT INTO jobs (run_id, region, backend, options, '
+                'last_page, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        run_id,
+                        region,
+                        backend,
+                        json.dumps(options or {}),
+                        pages_per_job,
+                        self.clock(),
+                    )
+                    for region in dict.fromkeys(regions)
+                ],
+            )
+        return run_id
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Lease the oldest job that is pending or whose lease expired."""
+        now = self.clock()
+        with self._transaction() as connection:
+            connection.execute(
+                'UPDATE jobs SET status = ?, worker = NULL, '
+                "error = 'Lease expired on the last attempt.', "
+                'finished_at = ? '
+                'WHERE status = ? AND lease_until < ? AND attempts >= ?',
+                (FAILED, now, RUNNING, now, self.max_attempts),
+            )
+            record = connection.execute(
+                'SELECT * FROM jobs WHERE status = ? '
+                'OR (status = ? AND lease_until < ?) ORDER BY id LIMIT 1',
+                (PENDING, RUNNING, now),
+            ).fetchone()
+            if record is None:
+                return None
+            connection.execute(
+                'UPDATE jobs SET status = ?, worker = ?, lease_until = ?, '
+                'attempts = attempts + 1 WHERE id = ?',
+                (RUNNING, worker, now + self.lease_seconds, record['id']),
+            )
+        job = _job(record)
+        job.status = RUNNING
+        job.attempts += 1
+        return job
+
+    def heartbeat(self, job: Job, worker: str) -> bool:
+        """Extend the lease; False when the job is no longer ours."""
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE jobs SET lease_until = ? '
+                'WHERE id = ? AND worker = ? AND status = ?',
+                (self.clock() + self.lease_seconds, job.id, worker, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(
+        self,
+        job: Job,
+        worker: str,
+        rows: Sequence[Row],
+        total_pages: Optional[int] = None,
+        page_size: Optional[int] = None,
+    ) -> bool:
+        """Store the rows of a job and mark it done.
+
+        Returns False, discarding the rows, when the lease was lost and
+        the job went to another worker. The first range of a region also
+        queues the remaining ranges here, counted in its `page_size`.
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE jobs SET status = ?, rows = ?, error = NULL, '
+                'finished_at = ? WHERE id = ? AND worker = ? AND status = ?',
+                (DONE, len(rows), self.clock(), job.id, worker, RUNNING),
+            )
+            if cursor.rowcount != 1:
+                return False
+            connection.executemany(
+                'INSERT OR REPLACE INTO job_rows (job_id, position, row) '
+                'VALUES (?, ?, ?)',
+                (
+                    (job.id, position, json.dumps(dict(row)))
+                    for position, row in enumerate(rows)
+                ),
+            )
+            self._queue_remaining_pages(
+                connection, job, total_pages, page_size
+            )
+        return True
+
+    def _queue_remaining_pages(
+        self,
+        connection: 'sqlite3.Connection',
+        job: Job,
+        total_pages: Optional[int],
+        page_size: Optional[int],
+    ) -> None:
+        size = job.last_page
+        if job.first_page != 1 or size is None:
+            return
+        if total_pages is None:
+            # The page count could not be read: one job crawls the rest
+            logger.warning(
+                f'{job.region}: unknown number of pages; queuing the rest '
+                'of the region as a single job.'
+            )
+            ranges = [(size + 1, None)]
+        else:
+            starts = range(size + 1, total_pages + 1, size)
+            # The last range is open ended, in case the region grew a page
+            ranges = [(start, start + size - 1) for start in starts[:-1]]
+            if starts:
+                ranges.append((starts[-1], None))
+        # Every range must count pages in the page size of the first one,
+        # or a worker left with another page size would skip rows
+        options = (
+            {**job.options, 'page_size': page_size}
+            if page_size
+            else job.options
+        )
+        connection.executemany(
+            'INSERT INTO jobs (run_id, region, backend, options, '
+            'first_page, last_page, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [
+                (
+                    job.run_id,
+                    job.region,
+                    job.backend,
+                    json.dumps(options),
+                    first,
+                    last,
+                    self.clock(),
+                )
+                for first, last in ranges
+            ],
+        )
+        if ranges and total_pages is not None:
+            logger.info(
+                f'{job.region}: {total_pages} pages, queued '
+                f'{len(ranges)} more jobs.'
+            )
+
+    def fail(self, job: Job, worker: str, error: str) -> None:
+        """Queue the job again, or give up after its last attempt."""
+        status = PENDING if job.attempts < self.max_attempts else FAILED
+        with self._transaction() as connection:
+            connection.execute(
+                'UPDATE jobs SET status = ?, worker = NULL, error = ?, '
+                'finished_at = ? WHERE id = ? AND worker = ? AND status = ?',
+                (status, error, self.clock(), job.id, worker, RUNNING),
+            )
+
+    def has_work(self) -> bool:
+        """True while any job is pending or running."""
+        with self._transaction() as connection:
+            record = connection.execute(
+                'SELECT 1 FROM jobs WHERE status IN (?, ?) LIMIT 1',
+                (PENDING, RUNNING),
+            ).fetchone()
+        return record is not None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status, over every run."""
+        with self._transaction() as connection:
+            records = connection.execute(
+                'SELECT status, COUNT(*) AS jobs FROM jobs GROUP BY status'
+            ).fetchall()
+        return {record['status']: record['jobs'] for record in records}
+
+    def unmerged_regions(self) -> List[tuple]:
+        """(run_id, region, jobs) of every region not merged yet."""
+        with self._transaction() as connection:
+            records = connection.execute(
+                'SELECT * FROM jobs WHERE (run_id, region) NOT IN '
+                '(SELECT run_id, region FROM merges) ORDER BY id'
+            ).fetchall()
+        regions: Dict[tuple, List[Job]] = {}
+        for record in records:
+            key = (record['run_id'], record['region'])
+            regions.setdefault(key, []).append(_job(record))
+        return [(*key, jobs) for key, jobs in regions.items()]
+
+    def job_rows(self, job_id: int) -> Iterator[Quote]:
+        with self._transaction() as connection:
+            records = connection.execute(
+                'SELECT row FROM job_rows WHERE job_id = ? ORDER BY position',
+                (job_id,),
+            ).fetchall()
+        for record in records:
+            yield Quote(**json.loads(record['row']))
+
+    def mark_merged(
+        self, run_id: str, region: str, file_path: Optional[str], rows: int
+    ) -> None:
+        """Record the merge and drop the rows it consumed."""
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO merges '
+                '(run_id, region, path, rows, merged_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (run_id, region, file_path, rows, self.clock()),
+            )
+            connection.execute(
+                'DELETE FROM job_rows WHERE job_id IN '
+                '(SELECT id FROM jobs WHERE run_id = ? AND region = ?)',
+                (run_id, region),
+            )
+
+
+class JobWorker:
+    """Claims jobs from a JobQueue and runs them until none is left.
+
+    A thread renews the lease of the running job every third of the lease
+    time, so a worker that dies stops renewing and its job goes to another
+    one. `options` (e.g. headless) override the options of every job.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        base_url: str,
+        *,
+        worker: Optional[str] = None,
+        crawler_class: Optional[type] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        **options,
+    ):
+        self.queue = queue
+        self.base_url = base_url
+        self.worker = worker or worker_name()
+        self.crawler_class = crawler_class
+        self.poll_interval = poll_interval
+        self.options = options
+
+    def run(self, max_jobs: Optional[int] = None) -> int:
+        """Run jobs until the queue has no pending or running one left.
+
+        Returns the number of jobs run. While other workers still hold
+        jobs, this one polls, since they may fail or queue more pages.
+        """
+        jobs_run = 0
+        while max_jobs is None or jobs_run < max_jobs:
+            job = self.queue.claim(self.worker)
+            if job is None:
+                if not self.queue.has_work():
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self.run_job(job)
+            jobs_run += 1
+        logger.info(f'[{self.worker}] No jobs left after {jobs_run} jobs.')
+        return jobs_run
+
+    def run_job(self, job: Job) -> bool:
+        """Crawl one job and report it to the queue; True when stored."""
+        logger.info(f'[{self.worker}] Running {job}...')
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._keep_lease, args=(job, stop), daemon=True
+        )
+        heartbeat.start()
+        try:
+            crawler_class = self.crawler_class or load_backend(job.backend)
+            crawler = crawler_class(
+                region=job.region,
+                base_url=self.base_url,
+                first_page=job.first_page,
+                last_page=job.last_page,
+                **{**job.options, **self.options, **JOB_OVERRIDES},
+            )
+            crawler.run()
+        except Exception as error:
+            logger.error(f'[{self.worker}] {job} failed: {error}')
+            self.queue.fail(
+                job, self.worker, f'{type(error).__name__}: {error}'
+            )
+            return False
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        stored = self.queue.complete(
+            job,
+            self.worker,
+            list(crawler.data),
+            _total_pages(job, crawler),
+            crawler.page_size,
+        )
+        if not stored:
+            logger.warning(
+                f'[{self.worker}] Lost the lease on {job}; '
+                'another worker runs it again.'
+            )
+        return stored
+
+    def _keep_lease(self, job: Job, stop: threading.Event) -> None:
+        while not stop.wait(self.queue.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(job, self.worker):
+                    return
+            except Exception as error:
+                logger.warning(f'Could not renew the lease on {job}: {error}')
+
+
+def _total_pages(job: Job, crawler: 'BaseCrawler') -> Optional[int]:
+    """The page count read by the crawler, or the one its run implies.
+
+    A range that ended before its last page reached the end of the
+    region, even when the page count itself could not be read.
+    """
+    if crawler.total_pages is not None or job.last_page is None:
+        return crawler.total_pages
+    last_scraped = job.first_page + len(crawler.metrics.pages) - 1
+    if last_scraped < job.last_page:
+        return last_scraped
+    return None
+
+
+def _work(queue_path: str, lease_seconds: float, base_url: str, options):
+    """Worker process entry point."""
+    queue = JobQueue(queue_path, lease_seconds)
+    return JobWorker(queue, base_url, **options).run()
+
+
+def run_workers(
+    queue: JobQueue, base_url: str, workers: int = 1, **options
+) -> int:
+    """Run `workers` JobWorker processes, each with its own browser."""
+    if workers <= 1:
+        return JobWorker(queue, base_url, **options).run()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _work, queue.path, queue.lease_seconds, base_url, options
+            )
+            for _ in range(workers)
+        ]
+        return sum(future.result() for future in futures)
+
+
+def merge_jobs(
+    queue: JobQueue, output_dir: str = OUTPUT_DIR
+) -> List[RegionResult]:
+    """Write one snapshot per region whose jobs are all done.
+
+    Job rows are added in page order to a RowStore with the run's conflict
+    policy, so a symbol that moved across two page ranges between their
+    loads is kept once. A region with a failed job is reported and not
+    written, since its snapshot would miss pages; regions with jobs still
+    queued or running are left for a later merge.
+    """
+    results = []
+    for run_id, region, jobs in queue.unmerged_regions():
+        waiting = [job for job in jobs if job.status in {PENDING, RUNNING}]
+        if waiting:
+            logger.info(
+                f'{region} (run {run_id}): {len(waiting)} of {len(jobs)} '
+                'jobs not finished yet.'
+            )
+            continue
+        failed = [job for job in jobs if job.status == FAILED]
+        if failed:
+            results.append(
+                RegionResult(
+                    region=region,
+                    error=f'{failed[0]} failed: {failed[0].error}',
+                )
+            )
+            continue
+
+        options = jobs[0].options
+        store = RowStore(options.get('conflict_policy', KEEP_FIRST))
+        for job in sorted(jobs, key=lambda job: job.first_page):
+            for row in queue.job_rows(job.id):
+                store.add(row)
+        file_path = None
+        if store:
+            sink = create_sink(
+                options.get('output', 'csv'), region, output_dir
+            )
+            sink.write(store)
+            file_path = sink.close()
+            logger.info(f'{region}: merged {len(jobs)} jobs into {file_path}')
+        queue.mark_merged(run_id, region, file_path, len(store))
+        results.append(RegionResult(region=region, rows=len(store)))
+    return results
@@ -0,0 +1,325 @@
+import datetime
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from os import makedirs, path, replace
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = 'metrics'
+PAGE_STEPS = ('wait', 'fetch', 'parse')
+
+
+@dataclass
+class PageMetrics:
+    """Where the time of a single page went."""
+
+    page: int
+    rows: int = 0
+    seconds: float = 0.0
+    wait_seconds: float = 0.0
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    html_bytes: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class RunMetrics:
+    """Timings of one crawler run, per phase and per page.
+
+    Phases are the big steps of a run (driver startup, region filter,
+    scraping, saving...) timed with `phase()`. Inside the scraping phase
+    every page is split into waiting for the table, fetching its HTML (or
+    JSON) and parsing it with `page_step()`; `end_page()` closes the page
+    that was being measured. A page's clock starts at its first step, so
+    the wait for page N+1 after clicking Next is counted on page N+1.
+    """
+
+    def __init__(self, region: str, backend: str = 'selenium'):
+        self.region = region
+        self.backend = backend
+        self.started_at = time.time()
+        self.phases: Dict[str, float] = {}
+        self.pages: List[PageMetrics] = []
+        self.rows = 0
+        self.status = 'running'
+        self.seconds = 0.0
+        self.page_size: Optional[int] = None
+        self.outcomes: dict = {}
+        # Browsers replaced in the middle of the run by the driver health
+        self.driver_restarts = 0
+        self._start = time.perf_counter()
+        self._page: Optional[PageMetrics] = None
+        self._page_start = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        """Add the time spent in the block to the phase `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def page_step(self, name: str):
+        """Add the time spent in the block to a step of the current page."""
+        page = self._current_page()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            field = f'{name}_seconds'
+            setattr(page, field, getattr(page, field) + elapsed)
+
+    def add_page_bytes(self, size: int) -> None:
+        self._current_page().html_bytes += size
+
+    def add_page_rows(self, rows: int) -> None:
+        self._current_page().rows += rows
+
+    def end_page(self, page_num: int) -> PageMetrics:
+        """Close the current page and start counting the next one."""
+        page = self._current_page()
+        page.page = page_num
+        page.seconds = time.perf_counter() - self._page_start
+        self.pages.append(page)
+        self.rows += page.rows
+        self._page = None
+        return page
+
+    def add_parsed_page(
+        self, page: PageMetrics, rows: int, parse_seconds: float
+    ) -> None:
+        """Add rows and parse time to a page closed before it was parsed."""
+        page.rows += rows
+        page.parse_seconds += parse_seconds
+        self.rows += rows
+
+    def _current_page(self) -> PageMetrics:
+        if self._page is None:
+            self._page = PageMetrics(page=len(self.pages) + 1)
+            self._page_start = time.perf_counter()
+        return self._page
+
+    def set_outcomes(self, page_size: Optional[int], outcomes: dict) -> None:
+        """Keep the effective page size and the retries/fallbacks needed."""
+        self.page_size = page_size
+        self.outcomes = outcomes
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.seconds = time.perf_counter() - self._start
+
+    def report(self) -> dict:
+        """The run as a JSON-serializable dict."""
+        totals = {
+            f'{step}_seconds': round(
+                sum(getattr(page, f'{step}_seconds') for page in self.pages), 6
+            )
+            for step in PAGE_STEPS
+        }
+        totals['html_bytes'] = sum(page.html_bytes for page in self.pages)
+        return {
+            'region': self.region,
+            'backend': self.backend,
+            'status': self.status,
+            'started_at': datetime.datetime.fromtimestamp(
+                self.started_at, datetime.UTC
+            ).isoformat(),
+            'seconds': round(self.seconds, 6),
+            'rows': self.rows,
+            'pages': len(self.pages),
+            'rows_per_second': round(
+                self.rows / self.seconds if self.seconds else 0.0, 3
+            ),
+            'phases': {
+                name: round(seconds, 6)
+                for name, seconds in self.phases.items()
+            },
+            'page_size': self.page_size,
+            'retries': self.outcomes.get('retries', 0),
+            'fallbacks': self.outcomes.get('fallbacks', 0),
+            'circuit_open': self.outcomes.get('circuit_open', False),
+            'driver_restarts': self.driver_restarts,
+            'operations': self.outcomes.get('operations', {}),
+            'page_totals': totals,
+            'per_page': [
+                {
+                    **asdict(page),
+                    'rows_per_second': round(page.rows_per_second, 3),
+                }
+                for page in self.pages
+            ],
+        }
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _labels(report: dict) -> str:
+    return (
+        f'region="{_label(report["region"])}",'
+        f'backend="{_label(report["backend"])}"'
+    )
+
+
+def to_prometheus(reports: Iterable[dict]) -> str:
+    """Render run reports in the Prometheus text exposition format.
+
+    Every value is a gauge describing the last run of a region, meant for
+    node_exporter's textfile collector.
+    """
+    reports = list(reports)
+    gauges = [
+        ('crawler_run_seconds', 'Wall time of the last run.', 'seconds'),
+        ('crawler_run_rows', 'Rows extracted by the last run.', 'rows'),
+        ('crawler_run_pages', 'Pages scraped by the last run.', 'pages'),
+        (
+            'crawler_run_rows_per_second',
+            'Rows per second of the last run.',
+            'rows_per_second',
+        ),
+        (
+            'crawler_run_retries',
+            'Page operations retried by the last run.',
+            'retries',
+        ),
+        (
+            'crawler_run_fallbacks',
+            'Page operations that fell back to a slower path.',
+            'fallbacks',
+        ),
+        (
+            'crawler_run_driver_restarts',
+            'Browsers restarted in the middle of the last run.',
+            'driver_restarts',
+        ),
+    ]
+    lines = []
+    for name, help_text, key in gauges:
+        lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} gauge'])
+        lines.extend(
+            f'{name}{{{_labels(report)}}} {report[key]}' for report in reports
+        )
+
+    lines.extend([
+        '# HELP crawler_run_success 1 when the last run finished without '
+        'errors.',
+        '# TYPE crawler_run_success gauge',
+    ])
+    lines.extend(
+        f'crawler_run_success{{{_labels(report)}}} '
+        f'{int(report["status"] == "ok")}'
+        for report in reports
+    )
+
+    lines.extend([
+        '# HELP crawler_phase_seconds Time spent in each phase of the last '
+        'run.',
+        '# TYPE crawler_phase_seconds gauge',
+    ])
+    for report in reports:
+        for phase, seconds in report['phases'].items():
+            lines.append(
+                f'crawler_phase_seconds{{{_labels(report)},'
+                f'phase="{_label(phase)}"}} {seconds}'
+            )
+
+    lines.extend([
+        '# HELP crawler_page_step_seconds Time spent in each page step of '
+        'the last run, summed over its pages.',
+        '# TYPE crawler_page_step_seconds gauge',
+    ])
+    for report in reports:
+        for step in PAGE_STEPS:
+            lines.append(
+                f'crawler_page_step_seconds{{{_labels(report)},'
+                f'step="{step}"}} {report["page_totals"][f"{step}_seconds"]}'
+            )
+
+    lines.extend([
+        '# HELP crawler_run_page_size Rows per page the last run used.',
+        '# TYPE crawler_run_page_size gauge',
+    ])
+    lines.extend(
+        f'crawler_run_page_size{{{_labels(report)}}} {report["page_size"]}'
+        for report in reports
+        if report.get('page_size') is not None
+    )
+
+    lines.extend([
+        '# HELP crawler_page_bytes HTML or JSON bytes read by the last run.',
+        '# TYPE crawler_page_bytes gauge',
+    ])
+    lines.extend(
+        f'crawler_page_bytes{{{_labels(report)}}} '
+        f'{report["page_totals"]["html_bytes"]}'
+        for report in reports
+    )
+    return '\n'.join(lines) + '\n'
+
+
+def _write_atomically(file_path: str, content: str) -> None:
+    with open(f'{file_path}.part', 'w', encoding='utf-8') as f:
+        f.write(content)
+    replace(f'{file_path}.part', file_path)
+
+
+def write_report(metrics: RunMetrics, output_dir: str) -> str:
+    """Write the JSON report and the .prom file of a run.
+
+    The JSON report is kept per run; the .prom file holds the last run of
+    the region and is replaced every time. Returns the JSON path.
+    """
+    directory = path.join(output_dir, METRICS_DIR)
+    if not path.exists(directory):
+        makedirs(directory)
+    report = metrics.report()
+    name = metrics.region.replace(' ', '_')
+    json_path = path.join(directory, f'{int(metrics.started_at)}_{name}.json')
+    _write_atomically(json_path, json.dumps(report, indent=2))
+    _write_atomically(
+        path.join(directory, f'{name}.prom'), to_prometheus([report])
+    )
+    logger.info(
+        f'Metrics: {report["rows"]} rows in {report["seconds"]:.1f}s '
+        f'({report["rows_per_second"]:.1f} rows/s). Report saved to '
+        f'{json_path}'
+    )
+    return json_path
+
+
+def write_run_report(reports: List[dict], output_dir: str) -> Optional[str]:
+    """Aggregate the reports of a multi-region run into one JSON file."""
+    if not reports:
+        return None
+    directory = path.join(output_dir, METRICS_DIR)
+    if not path.exists(directory):
+        makedirs(directory)
+    rows = sum(report['rows'] for report in reports)
+    phases: Dict[str, float] = {}
+    for report in reports:
+        for phase, seconds in report['phases'].items():
+            phases[phase] = round(phases.get(phase, 0.0) + seconds, 6)
+    summary = {
+        'regions': len(reports),
+        'succeeded': sum(report['status'] == 'ok' for report in reports),
+        'rows': rows,
+        'pages': sum(report['pages'] for report in reports),
+        'phases': phases,
+        'by_region': reports,
+    }
+    run_path = path.join(directory, f'{int(time.time())}_run.json')
+    _write_atomically(run_path, json.dumps(summary, indent=2))
+    logger.info(f'Run report saved to {run_path}')
+    return run_path
@@ -0,0 +1,153 @@
+from typing import List, Tuple
+
+HTML_PARSER = 'html.parser'
+LXML_PARSER = 'lxml'
+SELECTOLAX_PARSER = 'selectolax'
+PARSERS = (HTML_PARSER, LXML_PARSER, SELECTOLAX_PARSER)
+
+TABLE_SELECTOR = 'table, [role="table"], [data-testid="data-table"]'
+
+Table = Tuple[List[str], List[List[str]]]
+
+
+def parse_table(html: str, parser: str = HTML_PARSER) -> Table:
+    """Parse the first data table found in `html`.
+
+    Returns a tuple of (headers, rows): headers are lowercased cell texts
+    of the table header (or of its first row when there is no <thead>),
+    rows are the cell texts of every row in the table body.
+    Both are empty when no table is found.
+    """
+    if parser == SELECTOLAX_PARSER:
+        return _parse_with_selectolax(html)
+    if parser == LXML_PARSER:
+        return _parse_with_lxml(html)
+    if parser == HTML_PARSER:
+        return _parse_with_bs4(html, parser)
+    raise ValueError(
+        f'Unknown parser: {parser!r}. Expected one of {", ".join(PARSERS)}.'
+    )
+
+
+def _parse_with_bs4(html: str, parser: str) -> Table:
+    # Imported here so backends that never parse with bs4 do not load it
+    from bs4 import BeautifulSoup  # noqa: PLC0415
+
+    soup = BeautifulSoup(html, parser)
+    table = (
+        soup.find('table')
+        or soup.find(attrs={'role': 'table'})
+        or soup.find(attrs={'data-testid': 'data-table'})
+    )
+    if not table:
+        return [], []
+
+    def texts(row) -> List[str]:
+        return [
+            cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])
+        ]
+
+    headers = []
+    header_row = table.find('thead')
+    if header_row:
+        headers = texts(header_row)
+    if not headers:
+        first_row = table.find('tr')
+        if first_row:
+            headers = texts(first_row)
+
+    tbody = table.find('tbody') or table
+    rows = [texts(row) for row in tbody.find_all('tr')]
+    return [header.lower() for header in headers], rows
+
+
+def _parse_with_lxml(html: str) -> Table:
+    """Same walk as _parse_with_bs4, on an lxml tree without BeautifulSoup.
+
+    Skipping the soup objects makes this several times faster, which is
+    what makes replaying recorded pages cheap.
+    """
+    try:
+        import lxml.html  # noqa: PLC0415
+    except ImportError as error:
+        raise ImportError(
+            'The lxml parser requires the "lxml" package. '
+            'Install it with `poetry install --extras lxml`.'
+        ) from error
+
+    if not html.strip():
+        return [], []
+    root = lxml.html.fromstring(html)
+    # iter() includes the root itself, which is the table for fragments
+    table = next(root.iter('table'), None)
+    if table is None:
+        table = next(
+            (
+                element
+                for element in root.iter()
+                if element.get('role') == 'table'
+                or element.get('data-testid') == 'data-table'
+            ),
+            None,
+        )
+    if table is None:
+        return [], []
+
+    def texts(row) -> List[str]:
+        return [
+            ''.join(text.strip() for text in cell.xpath('.//text()'))
+            for cell in row.iter('td', 'th')
+        ]
+
+    headers = []
+    header_row = table.find('.//thead')
+    if header_row is not None:
+        headers = texts(header_row)
+    if not headers:
+        first_row = next(table.iter('tr'), None)
+        if first_row is not None:
+            headers = texts(first_row)
+
+    tbody = table.find('.//tbody')
+    if tbody is None:
+        tbody = table
+    rows = [texts(row) for row in tbody.iter('tr')]
+    return [header.lower() for header in headers], rows
+
+
+def _parse_with_selectolax(html: str) -> Table:
+    try:
+        from selectolax.lexbor import LexborHTMLParser  # noqa: PLC0415
+    except ImportError as error:
+        raise ImportError(
+            'The selectolax parser requires the "selectolax" package. '
+            'Install it with `poetry install --extras selectolax`.'
+        ) from error
+
+    tree = LexborHTMLParser(html)
+    table = (
+        tree.css_first('table')
+        or tree.css_first('[role="table"]')
+        or tree.css_first('[data-testid="data-table"]')
+    )
+    if table is None:
+        return [], []
+
+    def texts(row) -> List[str]:
+        return [
+            cell.text(deep=True, separator='', strip=True)
+            for cell in row.css('td, th')
+        ]
+
+    headers = []
+    header_row = table.css_first('thead')
+    if header_row is not None:
+        headers = texts(header_row)
+    if not headers:
+        first_row = table.css_first('tr')
+        if first_row is not None:
+            headers = texts(first_row)
+
+    tbody = table.css_first('tbody') or table
+    rows = [texts(row) for row in tbody.css('tr')]
+    return [header.lower() for header in headers], rows
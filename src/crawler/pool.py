@@ -0,0 +1,138 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from os import cpu_count
+from typing import List, Optional, Sequence
+
+from .backends import DEFAULT_BACKEND, load_backend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RegionResult:
+    """Outcome of crawling a single region in a worker."""
+
+    region: str
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    metrics: Optional[dict] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def read_regions_file(file_path: str) -> List[str]:
+    """Read one region per line, skipping blank lines and # comments."""
+    with open(file_path, encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith('#')]
+
+
+def crawl_region(
+    region: str,
+    base_url: str,
+    crawler_class: Optional[type] = None,
+    **options,
+) -> RegionResult:
+    """Crawl one region with its own driver, never raising.
+
+    Runs inside a worker process, so any failure is turned into an error
+    result instead of taking the pool down.
+    """
+    crawler_class = crawler_class or load_backend(DEFAULT_BACKEND)
+    start = time.perf_counter()
+    crawler = None
+    try:
+        crawler = crawler_class(region=region, base_url=base_url, **options)
+        crawler.run()
+    except Exception as error:
+        return RegionResult(
+            region=region,
+            seconds=time.perf_counter() - start,
+            error=f'{type(error).__name__}: {error}',
+            metrics=crawler.metrics.report() if crawler else None,
+        )
+    return RegionResult(
+        region=region,
+        rows=len(crawler.data),
+        seconds=time.perf_counter() - start,
+        metrics=crawler.metrics.report(),
+    )
+
+
+def crawl_regions(
+    regions: Sequence[str],
+    base_url: str,
+    workers: Optional[int] = None,
+    crawler_class: Optional[type] = None,
+    **options,
+) -> List[RegionResult]:
+    """Crawl several regions over a pool of worker processes.
+
+    Each worker owns one Chrome instance at a time, so `workers` is also
+    the number of browsers alive at once; lower it when memory, not CPU,
+    is the limit. Results are returned in the same order as `regions`.
+    """
+    regions = list(dict.fromkeys(regions))
+    workers = workers or min(len(regions), cpu_count() or 1)
+    logger.info(f'Crawling {len(regions)} regions with {workers} workers.')
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                crawl_region, region, base_url, crawler_class, **options
+            ): region
+            for region in regions
+        }
+        for future in as_completed(futures):
+            region = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:
+                # The worker process itself died (e.g. killed by the OOM
+                # killer), so crawl_region could not report the failure.
+                result = RegionResult(
+                    region=region, error=f'{type(error).__name__}: {error}'
+                )
+            if result.ok:
+                logger.info(
+                    f'[{region}] {result.rows} rows in {result.seconds:.1f}s.'
+                )
+            else:
+                logger.error(f'[{region}] failed: {result.error}')
+            results[region] = result
+
+    return [results[region] for region in regions]
+
+
+def log_summary(results: Sequence[RegionResult]) -> None:
+    """Log one line per region plus the totals."""
+    succeeded = [result for result in results if result.ok]
+    logger.info('Summary:')
+    for result in results:
+        status = 'ok' if result.ok else f'FAILED ({result.error})'
+        outcomes = ''
+        if result.metrics and result.metrics.get('page_size'):
+            outcomes = (
+                f', page size {result.metrics["page_size"]}, '
+                f'{result.metrics["retries"]} retries, '
+                f'{result.metrics["fallbacks"]} fallbacks'
+            )
+        logger.info(
+            f'  {result.region}: {result.rows} rows, '
+            f'{result.seconds:.1f}s{outcomes}, {status}'
+        )
+    logger.info(
+        f'{len(succeeded)}/{len(results)} regions succeeded, '
+        f'{sum(result.rows for result in succeeded)} rows in total.'
+    )
+
+
+def exit_status(results: Sequence[RegionResult]) -> int:
+    """Process exit status for a batch: 1 when any region failed."""
+    return 0 if all(result.ok for result in results) else 1
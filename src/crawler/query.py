@@ -0,0 +1,479 @@
+import bisect
+import heapq
+import json
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice, repeat
+from os import listdir, path, stat
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .client import DEFAULT_HOST, DEFAULT_QUERY_PORT
+from .delta import REMOVED, read_delta
+from .schema import FIELD_NAMES, NUMBER_FIELDS, Quote
+from .sinks import OUTPUT_DIR, read_snapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELOAD_INTERVAL = 1.0
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 1000
+
+SNAPSHOT_PATTERN = re.compile(
+    r'^(\d+)_yahoo_finance_crawler_(.+?)\.(csv|ndjson|parquet|delta\.csv)$'
+)
+
+
+class QueryError(ValueError):
+    """A query the index cannot answer, e.g. an unknown field."""
+
+
+def _quote(row: Mapping[str, object]) -> Quote:
+    """A Quote from any row that has the schema fields, typed or not."""
+    return Quote(*(row.get(name) for name in FIELD_NAMES))
+
+
+@dataclass
+class SnapshotFiles:
+    """The newest full snapshot of a region and the deltas written after."""
+
+    snapshot: str
+    deltas: List[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> Tuple[str, ...]:
+        return (self.snapshot, *self.deltas)
+
+
+def find_snapshots(output_dir: str) -> Dict[str, SnapshotFiles]:
+    """The files to load for each region of `output_dir`, in one listing.
+
+    Regions are named as in the file names, with '_' for spaces.
+    """
+    if not path.isdir(output_dir):
+        return {}
+    latest: Dict[str, Tuple[int, str]] = {}
+    deltas: Dict[str, List[Tuple[int, str]]] = {}
+    for filename in listdir(output_dir):
+        match = SNAPSHOT_PATTERN.match(filename)
+        if match is None:
+            continue
+        timestamp, region, kind = match.groups()
+        entry = (int(timestamp), path.join(output_dir, filename))
+        if kind == 'delta.csv':
+            deltas.setdefault(region, []).append(entry)
+        elif entry > latest.get(region, (-1, '')):
+            latest[region] = entry
+
+    files = {}
+    for region, (timestamp, snapshot) in latest.items():
+        files[region] = SnapshotFiles(
+            snapshot,
+            [
+                delta_path
+                for delta_timestamp, delta_path in sorted(
+                    deltas.get(region, ())
+                )
+                if delta_timestamp > timestamp
+            ],
+        )
+    return files
+
+
+class RegionIndex:
+    """The rows of one region snapshot, indexed for the query API.
+
+    Built once per snapshot and never changed afterwards, so queries read
+    it without locks while a newer one is being built.
+
+    - `rows`: Quote by symbol.
+    - `keys`: sorted (lowercase name or symbol, symbol) pairs, for prefix
+      searches with bisect.
+    - `values`/`symbols`: per number field, the values in ascending order
+      and the symbol of each, for range and top-N queries.
+    """
+
+    def __init__(
+        self, region: str, files: SnapshotFiles, rows: Dict[str, Quote]
+    ):
+        self.region = region.replace('_', ' ')
+        self.files = files
+        self.rows = rows
+        self.loaded_at = time.time()
+        keys = set()
+        for symbol, row in rows.items():
+            keys.add((symbol.lower(), symbol))
+            if row.name:
+                keys.add((row.name.lower(), symbol))
+        self.keys = sorted(keys)
+        self.values: Dict[str, List[float]] = {}
+        self.symbols: Dict[str, List[str]] = {}
+        for name in NUMBER_FIELDS:
+            pairs = sorted(
+                (row[name], symbol)
+                for symbol, row in rows.items()
+                if row[name] is not None
+            )
+            self.values[name] = [value for value, _ in pairs]
+            self.symbols[name] = [symbol for _, symbol in pairs]
+
+    @classmethod
+    def load(cls, region: str, files: SnapshotFiles) -> 'RegionIndex':
+        """Read the snapshot, then replay the deltas written after it."""
+        rows = {
+            row['symbol']: _quote(row)
+            for row in read_snapshot(files.snapshot)
+            if row.get('symbol')
+        }
+        for delta_path in files.deltas:
+            for change, row in read_delta(delta_path):
+                if change == REMOVED:
+                    rows.pop(row['symbol'], None)
+                else:
+                    rows[row['symbol']] = _quote(row)
+        return cls(region, files, rows)
+
+    def search(self, prefix: str) -> Iterator[str]:
+        """Symbols whose name or symbol starts with `prefix`, by key."""
+        prefix = prefix.lower()
+        keys = self.keys
+        seen = set()
+        for position in range(bisect.bisect_left(keys, (prefix,)), len(keys)):
+            key, symbol = keys[position]
+            if not key.startswith(prefix):
+                break
+            if symbol not in seen:
+                seen.add(symbol)
+                yield symbol
+
+    def between(
+        self, name: str, low: Optional[float], high: Optional[float]
+    ) -> Iterator[Tuple[float, str]]:
+        """(value, symbol) with `low <= value <= high`, ascending."""
+        values, symbols = self.values[name], self.symbols[name]
+        start = 0 if low is None else bisect.bisect_left(values, low)
+        end = (
+            len(values) if high is None else bisect.bisect_right(values, high)
+        )
+        for position in range(start, end):
+            yield values[position], symbols[position]
+
+    def top(self, name: str, n: int, largest: bool) -> List[Tuple[float, str]]:
+        values, symbols = self.values[name], self.symbols[name]
+        if largest:
+            start = max(0, len(values) - n)
+            return list(zip(values[start:], symbols[start:]))[::-1]
+        return list(zip(values[:n], symbols[:n]))
+
+    def describe(self) -> dict:
+        return {
+            'region': self.region,
+            'rows': len(self.rows),
+            'snapshot': path.basename(self.files.snapshot),
+            'deltas': len(self.files.deltas),
+            'loaded_at': round(self.loaded_at, 3),
+        }
+
+
+class SnapshotIndex:
+    """The latest snapshot of every region in `output_dir`, in memory.
+
+    `refresh()` reloads the regions that have a newer snapshot or delta
+    on disk. Sinks publish a file by renaming it into the directory, which
+    changes the directory's mtime, so a refresh with nothing new costs a
+    single stat. A region index is swapped in whole once it is built;
+    queries running meanwhile keep reading the previous one.
+    """
+
+    def __init__(self, output_dir: str = OUTPUT_DIR):
+        self.output_dir = output_dir
+        self.regions: Dict[str, RegionIndex] = {}
+        self._mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> List[str]:
+        """Load new snapshots and return the regions that were reloaded."""
+        with self._lock:
+            try:
+                mtime = stat(self.output_dir).st_mtime_ns
+            except OSError:
+                return []
+            if mtime == self._mtime:
+                return []
+            self._mtime = mtime
+
+            reloaded = []
+            found = find_snapshots(self.output_dir)
+            regions = dict(self.regions)
+            for key in set(regions) - set(found):
+                del regions[key]
+            for key, files in found.items():
+                current = regions.get(key)
+                if current is not None and current.files.key == files.key:
+                    continue
+                start = time.perf_counter()
+                try:
+                    regions[key] = RegionIndex.load(key, files)
+                except (OSError, ValueError, ImportError) as error:
+                    logger.warning(f'Could not load {files.snapshot}: {error}')
+                    continue
+                reloaded.append(regions[key].region)
+                logger.info(
+                    f'Loaded {len(regions[key].rows)} rows of '
+                    f'{regions[key].region} in '
+                    f'{time.perf_counter() - start:.2f}s.'
+                )
+            self.regions = regions
+            return reloaded
+
+    def _selected(self, region: Optional[str]) -> List[RegionIndex]:
+        regions = self.regions
+        if region is None:
+            return list(regions.values())
+        index = regions.get(region.replace(' ', '_'))
+        if index is None:
+            raise KeyError(region)
+        return [index]
+
+    @staticmethod
+    def _row(index: RegionIndex, symbol: str) -> dict:
+        return {'region': index.region, **index.rows[symbol]}
+
+    def lookup(
+        self, symbols: List[str], region: Optional[str] = None
+    ) -> List[dict]:
+        """The rows of `symbols`, in every region that has them."""
+        return [
+            self._row(index, symbol)
+            for symbol in symbols
+            for index in self._selected(region)
+            if symbol in index.rows
+        ]
+
+    def search(
+        self,
+        prefix: str,
+        region: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> List[dict]:
+        """Rows whose name or symbol starts with `prefix` (any case)."""
+        return [
+            self._row(index, symbol)
+            for index in self._selected(region)
+            for symbol in islice(index.search(prefix), limit)
+        ][:limit]
+
+    def range(  # noqa: PLR0913, PLR0917
+        self,
+        name: str,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+        region: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> List[dict]:
+        """Rows with `low <= row[name] <= high`, in ascending order."""
+        _check_field(name)
+        matches = heapq.merge(
+            *(
+                zip(index.between(name, low, high), repeat(index))
+                for index in self._selected(region)
+            ),
+            key=lambda match: match[0],
+        )
+        return [
+            self._row(index, symbol)
+            for (_, symbol), index in islice(matches, limit)
+        ]
+
+    def top(
+        self,
+        name: str,
+        n: int = DEFAULT_LIMIT,
+        region: Optional[str] = None,
+        largest: bool = True,
+    ) -> List[dict]:
+        """The `n` rows with the largest (or smallest) `row[name]`."""
+        _check_field(name)
+        candidates = [
+            (value, symbol, index)
+            for index in self._selected(region)
+            for value, symbol in index.top(name, n, largest)
+        ]
+        select = heapq.nlargest if largest else heapq.nsmallest
+        return [
+            self._row(index, symbol)
+            for _, symbol, index in select(
+                n, candidates, key=lambda match: match[:2]
+            )
+        ]
+
+    def describe(self) -> List[dict]:
+        return [index.describe() for index in self.regions.values()]
+
+
+def _check_field(name: str) -> None:
+    if name not in NUMBER_FIELDS:
+        raise QueryError(
+            f'Unknown number field: {name!r}. '
+            f'Expected one of {", ".join(sorted(NUMBER_FIELDS))}.'
+        )
+
+
+def _number(query: Dict[str, List[str]], key: str) -> Optional[float]:
+    value = query.get(key, [None])[0]
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise QueryError(f'{key} must be a number, not {value!r}.') from None
+
+
+def _limit(query: Dict[str, List[str]], key: str = 'limit') -> int:
+    value = _number(query, key)
+    if value is None:
+        return DEFAULT_LIMIT
+    return max(1, min(MAX_LIMIT, int(value)))
+
+
+def _required(query: Dict[str, List[str]], key: str) -> str:
+    if not query.get(key):
+        raise QueryError(f'Missing {key!r}.')
+    return query[key][0]
+
+
+class QueryServer:
+    """Read-only HTTP API over a SnapshotIndex, reloaded in the background.
+
+    Every answer is JSON. GET routes:
+
+    - /regions: the loaded snapshots.
+    - /quote?symbol=PETR4.SA&symbol=VALE3.SA[&region=Brazil]
+    - /search?prefix=petro[&region=...][&limit=20]: name or symbol prefix.
+    - /range?field=price&min=10&max=20[&region=...][&limit=20]
+    - /top?field=volume[&n=20][&order=desc|asc][&region=...]
+
+    A new snapshot published under `output_dir` is picked up within
+    `reload_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = OUTPUT_DIR,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_QUERY_PORT,
+        reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+    ):
+        self.index = SnapshotIndex(output_dir)
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+
+    def handle(self, url: str) -> Tuple[int, object]:
+        """Answer a GET of `url` with (HTTP status, JSON-serializable body)."""
+        parts = urlsplit(url)
+        routes = {
+            '/regions': self._regions,
+            '/quote': self._quote,
+            '/search': self._search,
+            '/range': self._range,
+            '/top': self._top,
+        }
+        route = routes.get(parts.path)
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {
+                'error': f'Unknown path: {parts.path}'
+            }
+        query = parse_qs(parts.query)
+        try:
+            return HTTPStatus.OK, route(query, query.get('region', [None])[0])
+        except QueryError as error:
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+        except KeyError as error:
+            return HTTPStatus.NOT_FOUND, {
+                'error': f'No snapshot for region {error.args[0]!r}.'
+            }
+
+    def _regions(self, query: dict, region: Optional[str]) -> List[dict]:
+        return self.index.describe()
+
+    def _quote(self, query: dict, region: Optional[str]) -> List[dict]:
+        if not query.get('symbol'):
+            raise QueryError("Missing 'symbol'.")
+        return self.index.lookup(query['symbol'], region)
+
+    def _search(self, query: dict, region: Optional[str]) -> List[dict]:
+        return self.index.search(
+            _required(query, 'prefix'), region, _limit(query)
+        )
+
+    def _range(self, query: dict, region: Optional[str]) -> List[dict]:
+        return self.index.range(
+            _required(query, 'field'),
+            _number(query, 'min'),
+            _number(query, 'max'),
+            region,
+            _limit(query),
+        )
+
+    def _top(self, query: dict, region: Optional[str]) -> List[dict]:
+        order = query.get('order', ['desc'])[0]
+        if order not in {'asc', 'desc'}:
+            raise QueryError("order must be 'asc' or 'desc'.")
+        return self.index.top(
+            _required(query, 'field'),
+            _limit(query, 'n'),
+            region,
+            largest=order == 'desc',
+        )
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.index.refresh()
+            except Exception as error:
+                logger.warning(f'Could not reload the snapshots: {error}')
+
+    def serve_forever(self) -> None:
+        """Load the snapshots and answer queries until interrupted."""
+        self.index.refresh()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                status, body = server.handle(self.path)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):  # noqa: A002, PLR6301
+                logger.debug(format % args)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.server.server_address[1]
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        logger.info(
+            f'Query API listening on http://{self.host}:{self.port} '
+            f'({len(self.index.regions)} regions loaded)'
+        )
+        try:
+            self.server.serve_forever()
+        finally:
+            self._stop.set()
+            self.server.server_close()
+
+    def shutdown(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
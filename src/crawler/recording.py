@@ -0,0 +1,146 @@
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from os import listdir, makedirs, path, replace
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = 'recordings'
+OBJECTS_DIR = 'objects'
+
+
+@dataclass
+class RecordedPage:
+    """One page of a recording: which object holds its HTML."""
+
+    page: int
+    sha256: str
+    bytes: int
+    url: Optional[str] = None
+
+
+@dataclass
+class Manifest:
+    """Everything needed to replay a recorded run."""
+
+    region: str
+    recorded_at: int
+    base_url: Optional[str] = None
+    complete: bool = False
+    pages: List[RecordedPage] = field(default_factory=list)
+
+
+def recordings_dir(output_dir: str) -> str:
+    return path.join(output_dir, RECORDINGS_DIR)
+
+
+def object_path(output_dir: str, sha256: str) -> str:
+    """Where the gzipped HTML with this digest is stored."""
+    return path.join(
+        recordings_dir(output_dir),
+        OBJECTS_DIR,
+        sha256[:2],
+        f'{sha256}.html.gz',
+    )
+
+
+class Recorder:
+    """Stores the HTML of every scraped page for later replay.
+
+    Pages are gzipped and saved under their SHA-256 digest in
+    `<output_dir>/recordings/objects`, so an unchanged page is stored only
+    once across runs. Each run gets a manifest,
+    '<timestamp>_<region>.json', listing its pages in order; it is written
+    when the run ends, with complete = false for runs that failed halfway.
+    """
+
+    def __init__(
+        self, region: str, output_dir: str, base_url: Optional[str] = None
+    ):
+        self.output_dir = output_dir
+        self.manifest = Manifest(
+            region=region,
+            recorded_at=int(datetime.datetime.now().timestamp()),
+            base_url=base_url,
+        )
+        self._pending: Optional[RecordedPage] = None
+        self.new_objects = 0
+
+    def record(self, html: str) -> str:
+        """Save the HTML of the page being scraped and return its digest."""
+        data = html.encode('utf-8')
+        sha256 = hashlib.sha256(data).hexdigest()
+        file_path = object_path(self.output_dir, sha256)
+        if not path.exists(file_path):
+            makedirs(path.dirname(file_path), exist_ok=True)
+            # mtime=0 keeps the compressed bytes identical between runs
+            with open(f'{file_path}.part', 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=6, mtime=0))
+            replace(f'{file_path}.part', file_path)
+            self.new_objects += 1
+        self._pending = RecordedPage(page=0, sha256=sha256, bytes=len(data))
+        return sha256
+
+    def mark_page(self, page: int, url: Optional[str] = None) -> None:
+        """Add the page recorded last to the manifest as `page`."""
+        if self._pending is None:
+            return
+        self._pending.page = page
+        self._pending.url = url
+        self.manifest.pages.append(self._pending)
+        self._pending = None
+
+    def close(self, complete: bool) -> Optional[str]:
+        """Write the manifest and return its path (None if no pages)."""
+        if not self.manifest.pages:
+            return None
+        self.manifest.complete = complete
+        directory = recordings_dir(self.output_dir)
+        makedirs(directory, exist_ok=True)
+        name = self.manifest.region.replace(' ', '_')
+        manifest_path = path.join(
+            directory, f'{self.manifest.recorded_at}_{name}.json'
+        )
+        with open(f'{manifest_path}.part', 'w', encoding='utf-8') as f:
+            json.dump(asdict(self.manifest), f, indent=2)
+        replace(f'{manifest_path}.part', manifest_path)
+        logger.info(
+            f'Recorded {len(self.manifest.pages)} pages '
+            f'({self.new_objects} new) in {manifest_path}'
+        )
+        return manifest_path
+
+
+def load_manifest(manifest_path: str) -> Manifest:
+    with open(manifest_path, encoding='utf-8') as f:
+        data = json.load(f)
+    data['pages'] = [RecordedPage(**page) for page in data['pages']]
+    return Manifest(**data)
+
+
+def latest_manifest(region: str, output_dir: str) -> Optional[str]:
+    """Path of the newest manifest recorded for `region`, or None."""
+    directory = recordings_dir(output_dir)
+    if not path.isdir(directory):
+        return None
+    pattern = re.compile(
+        rf'^(\d+)_{re.escape(region.replace(" ", "_"))}\.json$'
+    )
+    manifests = sorted(
+        (int(match.group(1)), filename)
+        for filename in listdir(directory)
+        if (match := pattern.match(filename))
+    )
+    if not manifests:
+        return None
+    return path.join(directory, manifests[-1][1])
+
+
+def read_page(output_dir: str, sha256: str) -> str:
+    with gzip.open(object_path(output_dir, sha256), 'rb') as f:
+        return f.read().decode('utf-8')
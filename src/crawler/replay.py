@@ -0,0 +1,118 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from .base import BaseCrawler
+from .parsing import Table, parse_table
+from .recording import (
+    Manifest,
+    latest_manifest,
+    load_manifest,
+    read_page,
+    recordings_dir,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_recorded_page(job: tuple) -> Table:
+    """Worker entry point: load one recorded page and parse its table."""
+    output_dir, sha256, parser = job
+    return parse_table(read_page(output_dir, sha256), parser)
+
+
+class YahooFinanceReplayCrawler(BaseCrawler):
+    """Feeds recorded pages back to the extractor, without a browser.
+
+    Pages are read from a manifest written by a run with `record=True`
+    and go through the same parsing, deduplication, checkpoint and output
+    code as a live crawl, so a new extractor can be checked against
+    historical captures. With `parse_workers` > 1 the pages are decompressed
+    and parsed in worker processes and merged in page order.
+    """
+
+    backend = 'replay'
+
+    def __init__(  # noqa: PLR0913
+        self,
+        region: str,
+        base_url: Optional[str] = None,
+        headless: bool = True,
+        *,
+        manifest: Optional[str] = None,
+        **options,
+    ):
+        self.manifest_path = manifest
+        super().__init__(region, base_url, headless, **options)
+
+    def close(self):
+        """Nothing to release."""
+
+    def _scrape(self) -> None:
+        """Parse every recorded page and save the output."""
+        manifest = self._load_manifest()
+        with self.metrics.phase('scrape'):
+            self._replay_pages(manifest)
+        with self.metrics.phase('save'):
+            self._save_output()
+        if self.checkpoints is not None:
+            self.checkpoints.clear()
+        logger.info(f'Done. Saved {len(self.data)} rows.')
+
+    def _load_manifest(self) -> Manifest:
+        manifest_path = self.manifest_path or latest_manifest(
+            self.region, self.output_dir
+        )
+        if manifest_path is None:
+            raise FileNotFoundError(
+                f'No recording found for region {self.region!r} in '
+                f'{recordings_dir(self.output_dir)}.'
+            )
+        manifest = load_manifest(manifest_path)
+        if manifest.complete and manifest.pages:
+            self.total_pages = manifest.pages[-1].page
+        manifest.pages = [
+            page
+            for page in manifest.pages
+            if page.page >= self.start_page
+            and (self.last_page is None or page.page <= self.last_page)
+        ]
+        if not manifest.complete:
+            logger.warning(
+                f'{manifest_path} is from an interrupted run; '
+                'replaying the pages it has.'
+            )
+        logger.info(
+            f'Replaying {len(manifest.pages)} pages from {manifest_path}'
+        )
+        return manifest
+
+    def _replay_pages(self, manifest: Manifest) -> None:
+        for page, (headers, rows) in zip(
+            manifest.pages, self._parsed_pages(manifest)
+        ):
+            page_rows = self._table_rows(headers, rows)
+            new_rows = self._store_rows(page_rows)
+            self.metrics.add_page_rows(new_rows)
+            self.metrics.add_page_bytes(page.bytes)
+            self._page_done(page.page)
+
+    def _parsed_pages(self, manifest: Manifest) -> Iterator[Table]:
+        if self.parse_workers <= 1:
+            for page in manifest.pages:
+                with self.metrics.page_step('fetch'):
+                    html = read_page(self.output_dir, page.sha256)
+                with self.metrics.page_step('parse'):
+                    table = parse_table(html, self.parser)
+                yield table
+            return
+
+        jobs = [
+            (self.output_dir, page.sha256, self.parser)
+            for page in manifest.pages
+        ]
+        chunksize = max(1, len(jobs) // (self.parse_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
+            yield from executor.map(
+                _parse_recorded_page, jobs, chunksize=chunksize
+            )
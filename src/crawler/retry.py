@@ -0,0 +1,199 @@
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+DEFAULT_FAILURE_THRESHOLD = 5
+
+
+class CircuitOpenError(RuntimeError):
+    """Too many failures in a row: the region is not worth more time."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how patiently an operation is retried.
+
+    A failed call is tried again up to `attempts` times in total, waiting
+    `base_delay * multiplier ** (retry - 1)` seconds (capped at
+    `max_delay`, with up to 50% jitter) in between. `budget` caps the
+    seconds spent waiting on retries of the operation over a whole run,
+    since operations like page extraction run hundreds of times.
+    """
+
+    attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    budget: Optional[float] = None
+
+    def delay(self, retry: int, rand: random.Random) -> float:
+        delay = min(
+            self.max_delay, self.base_delay * self.multiplier ** (retry - 1)
+        )
+        return delay * rand.uniform(0.5, 1.0)
+
+
+DEFAULT_POLICIES = {
+    'navigate': RetryPolicy(attempts=3, base_delay=2.0),
+    'region_filter': RetryPolicy(attempts=3, base_delay=1.0),
+    'rows_per_page': RetryPolicy(attempts=2, base_delay=1.0),
+    'extract': RetryPolicy(attempts=3, base_delay=0.5, budget=30.0),
+    'next_page': RetryPolicy(attempts=3, base_delay=0.5, budget=30.0),
+}
+
+
+@dataclass
+class OperationOutcome:
+    """What happened to one kind of operation during a run."""
+
+    calls: int = 0
+    failures: int = 0
+    retries: int = 0
+    fallbacks: int = 0
+    retry_seconds: float = 0.0
+
+
+class CircuitBreaker:
+    """Opens after `threshold` failed attempts in a row, of any operation.
+
+    Any successful attempt closes it again. Once open, every guarded call
+    raises CircuitOpenError, so the run of the region ends right away.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_FAILURE_THRESHOLD):
+        self.threshold = threshold
+        self.consecutive_failures = 0
+        self.is_open = False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.threshold and self.consecutive_failures >= self.threshold:
+            self.is_open = True
+
+    def check(self, operation: str) -> None:
+        if self.is_open:
+            raise CircuitOpenError(
+                f'Circuit open after {self.consecutive_failures} failures '
+                f'in a row; not running {operation}.'
+            )
+
+
+class Retrier:
+    """Runs page operations under their retry policy and a circuit breaker.
+
+    Keeps an OperationOutcome per operation name, so a run can report how
+    many retries and fallbacks it needed.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, RetryPolicy]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        *,
+        sleep: Callable[[float], None] = time.sleep,
+        seed: Optional[int] = None,
+    ):
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.random = random.Random(seed)
+        self.outcomes: Dict[str, OperationOutcome] = {}
+
+    @classmethod
+    def with_attempts(
+        cls,
+        attempts: int,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        **kwargs,
+    ) -> 'Retrier':
+        """Use the default delays, but `attempts` tries per operation."""
+        policies = {
+            name: replace(policy, attempts=max(1, attempts))
+            for name, policy in DEFAULT_POLICIES.items()
+        }
+        return cls(policies, CircuitBreaker(failure_threshold), **kwargs)
+
+    def outcome(self, operation: str) -> OperationOutcome:
+        return self.outcomes.setdefault(operation, OperationOutcome())
+
+    def call(
+        self,
+        operation: str,
+        func: Callable[[], T],
+        on_retry: Optional[Callable[[], None]] = None,
+    ) -> T:
+        """Call `func`, retrying it on any exception.
+
+        `on_retry` runs before every new attempt, e.g. to reload the page.
+        The last error is raised when attempts or budget run out, and
+        CircuitOpenError as soon as the breaker opens.
+        """
+        policy = self.policies.get(operation, RetryPolicy())
+        outcome = self.outcome(operation)
+        outcome.calls += 1
+        attempt = 1
+        while True:
+            self.breaker.check(operation)
+            try:
+                result = func()
+            except CircuitOpenError:
+                raise
+            except Exception as error:
+                outcome.failures += 1
+                self.breaker.record_failure()
+                delay = policy.delay(attempt, self.random)
+                out_of_budget = policy.budget is not None and (
+                    outcome.retry_seconds + delay > policy.budget
+                )
+                if attempt >= policy.attempts or out_of_budget:
+                    raise
+                self.breaker.check(operation)
+                logger.warning(
+                    f'{operation} failed (attempt {attempt}/'
+                    f'{policy.attempts}): {error}. '
+                    f'Retrying in {delay:.1f}s...'
+                )
+                self.sleep(delay)
+                outcome.retries += 1
+                outcome.retry_seconds += delay
+                if on_retry is not None:
+                    try:
+                        on_retry()
+                    except Exception as retry_error:
+                        logger.warning(
+                            f'Could not reset before retrying {operation}: '
+                            f'{retry_error}'
+                        )
+                attempt += 1
+            else:
+                self.breaker.record_success()
+                return result
+
+    def fallback(self, operation: str) -> None:
+        """Record that `operation` gave up and a slower path is used."""
+        self.outcome(operation).fallbacks += 1
+
+    def report(self) -> dict:
+        return {
+            'circuit_open': self.breaker.is_open,
+            'retries': sum(item.retries for item in self.outcomes.values()),
+            'fallbacks': sum(
+                item.fallbacks for item in self.outcomes.values()
+            ),
+            'operations': {
+                name: {
+                    **asdict(outcome),
+                    'retry_seconds': round(outcome.retry_seconds, 3),
+                }
+                for name, outcome in self.outcomes.items()
+            },
+        }
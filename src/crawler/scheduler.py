@@ -0,0 +1,372 @@
+import datetime
+import logging
+import random
+import re
+import threading
+import time
+import tomllib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from .pool import RegionResult
+
+logger = logging.getLogger(__name__)
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+JOB_KEYS = frozenset({
+    'region',
+    'interval',
+    'cron',
+    'market_hours',
+    'weekdays',
+    'timezone',
+    'jitter',
+    'options',
+})
+# A cron expression that never matches fails instead of looping forever
+CRON_SEARCH_DAYS = 366 * 5
+# Cron times tried when looking for one inside the market hours
+MAX_CRON_CANDIDATES = 10_000
+
+
+def parse_duration(value) -> float:
+    """Seconds in a duration like 90, '90s', '15m', '2h' or '1d'."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*', str(value))
+    if not match:
+        raise ValueError(f'Invalid duration: {value!r}')
+    number, unit = match.groups()
+    return float(number) * DURATION_UNITS[unit or 's']
+
+
+def _parse_cron_field(text: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for item in text.split(','):
+        part, _, step_text = item.partition('/')
+        step = int(step_text) if step_text else 1
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if not low <= start <= end <= high or step < 1:
+            raise ValueError(f'Invalid cron field: {text!r}')
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A standard five-field cron expression: minute hour day month weekday.
+
+    Supports '*', lists, ranges and steps. Weekdays go from 0 (Sunday) to
+    7 (Sunday again). As in cron, when both the day of month and the
+    weekday are restricted a time matches if either one does.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:  # noqa: PLR2004
+            raise ValueError(f'Cron expression needs 5 fields: {expression!r}')
+        self.expression = expression
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        weekdays = _parse_cron_field(fields[4], 0, 7)
+        # cron counts from Sunday, datetime.weekday() from Monday
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, moment: datetime.datetime) -> bool:
+        day = moment.day in self.days
+        weekday = moment.weekday() in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """First matching minute strictly after `moment`."""
+        candidate = moment.replace(second=0, microsecond=0)
+        candidate += datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=CRON_SEARCH_DAYS)
+        while candidate <= limit:
+            if candidate.month not in self.months or not self._day_matches(
+                candidate
+            ):
+                candidate = candidate.replace(
+                    hour=0, minute=0
+                ) + datetime.timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + datetime.timedelta(
+                    hours=1
+                )
+            elif candidate.minute not in self.minutes:
+                candidate += datetime.timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f'Cron expression never matches: {self.expression}')
+
+
+@dataclass
+class MarketHours:
+    """Daily window, in the job's timezone, in which a job may run."""
+
+    start: datetime.time
+    end: datetime.time
+    weekdays: Set[int] = field(default_factory=lambda: set(range(5)))
+
+    @classmethod
+    def parse(
+        cls, window: str, weekdays: Optional[List[str]] = None
+    ) -> 'MarketHours':
+        """Build from '10:00-17:30' and names like ['mon', 'tue']."""
+        try:
+            start, end = (
+                datetime.time.fromisoformat(part.strip())
+                for part in window.split('-')
+            )
+        except ValueError:
+            raise ValueError(
+                f'Invalid market hours: {window!r} (expected HH:MM-HH:MM)'
+            ) from None
+        if start >= end:
+            raise ValueError(f'Market hours end before they start: {window}')
+        market_hours = cls(start, end)
+        if weekdays is not None:
+            market_hours.weekdays = {
+                WEEKDAYS.index(day.lower()[:3]) for day in weekdays
+            }
+        return market_hours
+
+    def contains(self, moment: datetime.datetime) -> bool:
+        return (
+            moment.weekday() in self.weekdays
+            and self.start <= moment.time() < self.end
+        )
+
+    def next_open(self, moment: datetime.datetime) -> datetime.datetime:
+        """`moment` itself when inside the window, else the next opening."""
+        if self.contains(moment):
+            return moment
+        day = moment.date()
+        if moment.time() >= self.start:
+            day += datetime.timedelta(days=1)
+        for _ in range(7):
+            if day.weekday() in self.weekdays:
+                return datetime.datetime.combine(
+                    day, self.start, tzinfo=moment.tzinfo
+                )
+            day += datetime.timedelta(days=1)
+        raise ValueError('Market hours have no weekday.')
+
+
+@dataclass
+class ScheduledJob:
+    """A region crawled every `interval` seconds or on a cron schedule."""
+
+    region: str
+    interval: Optional[float] = None
+    cron: Optional[CronSchedule] = None
+    market_hours: Optional[MarketHours] = None
+    timezone: Optional[ZoneInfo] = None
+    jitter: float = 0.0
+    options: Dict[str, object] = field(default_factory=dict)
+    next_run: float = 0.0
+
+    def schedule_after(self, now: float, rand: random.Random) -> float:
+        """Set and return the next run time after the timestamp `now`."""
+        moment = datetime.datetime.fromtimestamp(now, self.timezone)
+        if self.cron is not None:
+            moment = self._next_cron_time(moment)
+        else:
+            moment += datetime.timedelta(seconds=self.interval)
+            if self.market_hours is not None:
+                moment = self.market_hours.next_open(moment)
+        self.next_run = moment.timestamp() + rand.uniform(0, self.jitter)
+        return self.next_run
+
+    def _next_cron_time(self, moment: datetime.datetime) -> datetime.datetime:
+        moment = self.cron.next_after(moment)
+        if self.market_hours is None:
+            return moment
+        for _ in range(MAX_CRON_CANDIDATES):
+            if self.market_hours.contains(moment):
+                return moment
+            moment = self.cron.next_after(moment)
+        raise ValueError(
+            f'Cron expression {self.cron.expression!r} of {self.region} '
+            'never falls inside its market hours.'
+        )
+
+    def schedule_first(self, now: float, rand: random.Random) -> float:
+        """Interval jobs start right away (in market hours), cron ones wait."""
+        if self.cron is not None:
+            return self.schedule_after(now, rand)
+        moment = datetime.datetime.fromtimestamp(now, self.timezone)
+        if self.market_hours is not None:
+            moment = self.market_hours.next_open(moment)
+        self.next_run = moment.timestamp() + rand.uniform(0, self.jitter)
+        return self.next_run
+
+
+def parse_job(
+    entry: dict, default_timezone: Optional[str] = None
+) -> ScheduledJob:
+    """Build a ScheduledJob from one [[jobs]] table of the config."""
+    unknown = set(entry) - JOB_KEYS
+    if unknown:
+        raise ValueError(f'Unknown job keys: {", ".join(sorted(unknown))}')
+    region = entry.get('region')
+    if not region:
+        raise ValueError('Every job needs a "region".')
+    if ('interval' in entry) == ('cron' in entry):
+        raise ValueError(
+            f'Job {region!r} needs exactly one of "interval" or "cron".'
+        )
+    timezone = entry.get('timezone', default_timezone)
+    job = ScheduledJob(
+        region=region,
+        timezone=ZoneInfo(timezone) if timezone else None,
+        jitter=parse_duration(entry.get('jitter', 0)),
+        options=dict(entry.get('options', {})),
+    )
+    if 'cron' in entry:
+        job.cron = CronSchedule(entry['cron'])
+    else:
+        job.interval = parse_duration(entry['interval'])
+        if job.interval <= 0:
+            raise ValueError(f'Job {region!r} needs a positive interval.')
+    if 'market_hours' in entry:
+        job.market_hours = MarketHours.parse(
+            entry['market_hours'], entry.get('weekdays')
+        )
+    return job
+
+
+def load_schedule(file_path: str) -> Tuple[List[ScheduledJob], int]:
+    """Read a TOML schedule and return (jobs, max_concurrency).
+
+    max_concurrency = 2
+    timezone = "America/Sao_Paulo"
+
+    [[jobs]]
+    region = "Brazil"
+    interval = "15m"
+    market_hours = "10:00-17:00"
+    jitter = "30s"
+    options = { output = "csv", delta = true }
+    """
+    with open(file_path, 'rb') as f:
+        config = tomllib.load(f)
+    jobs = [
+        parse_job(entry, config.get('timezone'))
+        for entry in config.get('jobs', [])
+    ]
+    if not jobs:
+        raise ValueError(f'No [[jobs]] in the schedule {file_path}.')
+    return jobs, int(config.get('max_concurrency', 1))
+
+
+class Scheduler:
+    """Runs scheduled crawl jobs in this process, forever.
+
+    At most `max_concurrency` jobs run at the same time; due jobs beyond
+    that wait for a free slot. A job whose region still has a run in
+    progress (or waiting for a slot) is skipped until its next time, so a
+    slow region can not pile up runs that starve the others. `run_job`
+    receives the region and its options and returns a RegionResult.
+    """
+
+    def __init__(
+        self,
+        jobs: List[ScheduledJob],
+        run_job: Callable[[str, dict], RegionResult],
+        *,
+        max_concurrency: int = 1,
+        clock: Callable[[], float] = time.time,
+        seed: Optional[int] = None,
+    ):
+        self.jobs = jobs
+        self.run_job = run_job
+        self.max_concurrency = max(1, max_concurrency)
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.running: Set[str] = set()
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix='scheduled-crawl',
+        )
+        now = self.clock()
+        for job in self.jobs:
+            job.schedule_first(now, self.random)
+
+    def tick(self) -> List[Future]:
+        """Start every job that is due and schedule its next run."""
+        now = self.clock()
+        started = []
+        for job in self.jobs:
+            if job.next_run > now:
+                continue
+            job.schedule_after(now, self.random)
+            with self._lock:
+                if job.region in self.running:
+                    self.skipped += 1
+                    logger.warning(
+                        f'Skipping {job.region}: the previous run is still '
+                        'in progress.'
+                    )
+                    continue
+                self.running.add(job.region)
+            future = self._executor.submit(self._run, job)
+            started.append(future)
+        return started
+
+    def _run(self, job: ScheduledJob) -> RegionResult:
+        try:
+            result = self.run_job(job.region, dict(job.options))
+        except Exception as error:
+            result = RegionResult(
+                region=job.region, error=f'{type(error).__name__}: {error}'
+            )
+        finally:
+            with self._lock:
+                self.running.discard(job.region)
+        next_run = datetime.datetime.fromtimestamp(job.next_run, job.timezone)
+        if result.ok:
+            logger.info(
+                f'{job.region}: {result.rows} rows in {result.seconds:.1f}s. '
+                f'Next run at {next_run:%Y-%m-%d %H:%M:%S}.'
+            )
+        else:
+            logger.error(
+                f'{job.region} failed: {result.error}. '
+                f'Next run at {next_run:%Y-%m-%d %H:%M:%S}.'
+            )
+        return result
+
+    def run_forever(self) -> None:
+        """Run due jobs until `stop()` is called or the process ends."""
+        logger.info(
+            f'Scheduler started with {len(self.jobs)} jobs and up to '
+            f'{self.max_concurrency} at a time.'
+        )
+        try:
+            while not self._stop.is_set():
+                self.tick()
+                wait = min(job.next_run for job in self.jobs) - self.clock()
+                self._stop.wait(max(0.0, wait))
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,239 @@
+import logging
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A Quote or, for rows read back from disk, a plain dict.
+Row = Mapping[str, object]
+
+MISSING_VALUES = frozenset({'', '-', '--', 'n/a', 'N/A'})
+# Parsed as an exponent ('2.3e9'), which rounds once instead of twice
+# like 2.3 * 1e9 would.
+SUFFIXES = {
+    'K': 'e3',
+    'M': 'e6',
+    'B': 'e9',
+    'T': 'e12',
+}
+RANGE_SEPARATOR = re.compile(r'\s+-\s+')
+
+
+def parse_number(text) -> Optional[float]:
+    """Convert a screener cell such as '1,234.5', '12.3M' or '-0.5%'.
+
+    K/M/B/T suffixes are expanded, a trailing '%' is dropped (the value
+    stays in percentage points) and '--' or 'N/A' become None.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    text = text.strip()
+    if text in MISSING_VALUES:
+        return None
+    text = text.replace(',', '').removesuffix('%')
+    exponent = SUFFIXES.get(text[-1:].upper())
+    if exponent is not None:
+        text = text[:-1] + exponent
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_text(text) -> str:
+    return text.strip() if isinstance(text, str) else text
+
+
+def parse_range(text) -> Tuple[Optional[float], Optional[float]]:
+    """Split a '52 Wk Range' cell like '10.50 - 24.80' into (low, high)."""
+    if not isinstance(text, str):
+        return None, None
+    parts = RANGE_SEPARATOR.split(text.strip())
+    if len(parts) != 2:  # noqa: PLR2004
+        return None, None
+    return parse_number(parts[0]), parse_number(parts[1])
+
+
+# Output fields in order, with the kind of value they hold.
+FIELDS = (
+    ('symbol', 'text'),
+    ('name', 'text'),
+    ('price', 'number'),
+    ('change', 'number'),
+    ('change_percent', 'number'),
+    ('volume', 'number'),
+    ('avg_volume', 'number'),
+    ('market_cap', 'number'),
+    ('pe_ratio', 'number'),
+    ('week_52_change_percent', 'number'),
+    ('week_52_low', 'number'),
+    ('week_52_high', 'number'),
+)
+FIELD_NAMES = [name for name, _ in FIELDS]
+NUMBER_FIELDS = frozenset(name for name, kind in FIELDS if kind == 'number')
+_FIELD_SET = frozenset(FIELD_NAMES)
+
+
+@dataclass(slots=True, eq=False)
+class Quote(Mapping):
+    """A typed screener row, one slot per field of FIELDS.
+
+    A fraction of the size of a dict per row, which adds up when tens of
+    thousands of rows are kept in one process. It reads like a read-only
+    dict (`row['price']`, `row.get()`, `{**row}`, `==` with a dict), so
+    the store, sinks and delta code take a Quote or a dict alike.
+    """
+
+    symbol: Optional[str] = None
+    name: Optional[str] = None
+    price: Optional[float] = None
+    change: Optional[float] = None
+    change_percent: Optional[float] = None
+    volume: Optional[float] = None
+    avg_volume: Optional[float] = None
+    market_cap: Optional[float] = None
+    pe_ratio: Optional[float] = None
+    week_52_change_percent: Optional[float] = None
+    week_52_low: Optional[float] = None
+    week_52_high: Optional[float] = None
+
+    def __getitem__(self, key: str):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(FIELD_NAMES)
+
+    def __len__(self) -> int:
+        return len(FIELD_NAMES)
+
+    def astuple(self) -> tuple:
+        """The values in FIELD_NAMES order."""
+        return _quote_values(self)
+
+
+_quote_values = attrgetter(*FIELD_NAMES)
+
+
+def row_values(row: Row) -> tuple:
+    """The values of a Quote or dict in FIELD_NAMES order."""
+    if isinstance(row, Quote):
+        return row.astuple()
+    return tuple(row.get(name) for name in FIELD_NAMES)
+
+
+# Lowercased header patterns, tried in order: the more specific ones come
+# first, since '52 wk change %' also contains 'change %' and 'avg vol (3m)'
+# also contains 'vol'.
+COLUMN_PATTERNS = (
+    ('symbol', re.compile(r'symbol')),
+    ('name', re.compile(r'name')),
+    ('price', re.compile(r'price')),
+    ('week_52_range', re.compile(r'52[\s-]*w(ee)?k\S*\s+range')),
+    ('week_52_change_percent', re.compile(r'52[\s-]*w(ee)?k\S*\s+change')),
+    ('change_percent', re.compile(r'%\s*change|change\s*%|chg\s*%')),
+    ('change', re.compile(r'change')),
+    ('avg_volume', re.compile(r'avg\.?\s*vol')),
+    ('volume', re.compile(r'volume')),
+    ('market_cap', re.compile(r'market\s*cap')),
+    ('pe_ratio', re.compile(r'\bp/?e\b')),
+)
+# Positions assumed when the table has no recognizable headers.
+DEFAULT_POSITIONS = {'symbol': 0, 'name': 1, 'price': 2}
+
+
+def _match_column(header: str, taken: set) -> Optional[str]:
+    for column, pattern in COLUMN_PATTERNS:
+        if column not in taken and pattern.search(header):
+            return column
+    return None
+
+
+class ColumnMap:
+    """Header to field mapping of a screener table, compiled once.
+
+    `compile()` resolves every header against COLUMN_PATTERNS and keeps,
+    per column found, its cell index and converter, so converting a page
+    is a single pass over the rows with no header lookups. Unknown
+    headers are ignored; fields whose column is missing are None.
+    """
+
+    def __init__(self, headers: Sequence[str]):
+        self.headers = tuple(headers)
+        self.columns: Dict[str, int] = {}
+        for index, header in enumerate(self.headers):
+            column = _match_column(header, set(self.columns))
+            if column is not None:
+                self.columns[column] = index
+        for column, index in DEFAULT_POSITIONS.items():
+            self.columns.setdefault(column, index)
+
+        self.unmapped = [
+            header
+            for index, header in enumerate(self.headers)
+            if index not in self.columns.values()
+        ]
+        self.min_cells = max(self.columns.values()) + 1
+        self._symbol = self.columns['symbol']
+        self._range = self.columns.get('week_52_range')
+        self._converters: List[Tuple[str, int, Callable]] = [
+            (
+                column,
+                index,
+                parse_number if column in NUMBER_FIELDS else parse_text,
+            )
+            for column, index in self.columns.items()
+            if column != 'week_52_range'
+        ]
+
+    @classmethod
+    def compile(cls, headers: Sequence[str]) -> 'ColumnMap':
+        column_map = cls(headers)
+        if column_map.unmapped:
+            logger.debug(
+                f'Ignoring unknown columns: {", ".join(column_map.unmapped)}'
+            )
+        return column_map
+
+    def matches(self, headers: Sequence[str]) -> bool:
+        return self.headers == tuple(headers)
+
+    def convert(self, rows: List[List[str]]) -> List[Quote]:
+        """Typed rows with every field of FIELDS, skipping unusable ones.
+
+        Header rows repeated in the body, short rows and rows without a
+        symbol are dropped.
+        """
+        symbol_index = self._symbol
+        range_index = self._range
+        converters = self._converters
+        min_cells = self.min_cells
+        page_rows = []
+        for cells in rows:
+            if len(cells) < min_cells or not cells[symbol_index]:
+                continue
+            if cells[0].lower() == 'symbol':
+                continue
+            row = Quote()
+            for column, index, convert in converters:
+                setattr(row, column, convert(cells[index]))
+            if range_index is not None:
+                row.week_52_low, row.week_52_high = parse_range(
+                    cells[range_index]
+                )
+            page_rows.append(row)
+        return page_rows
+
+
+def typed_row(row: Dict[str, str]) -> Row:
+    """Convert the number fields of a row read back from a CSV file."""
+    return {
+        key: parse_number(value) if key in NUMBER_FIELDS else value
+        for key, value in row.items()
+    }
@@ -0,0 +1,415 @@
+import abc
+import csv
+import datetime
+import json
+import logging
+import time
+from os import makedirs, path, replace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .schema import (
+    FIELD_NAMES,
+    NUMBER_FIELDS,
+    Row,
+    parse_number,
+    row_values,
+    typed_row,
+)
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_DIR = 'cdn'
+FIELDNAMES = FIELD_NAMES
+SQLITE_FILENAME = 'yahoo_finance_crawler.sqlite'
+NUMBER_COLUMNS = [name for name in FIELD_NAMES if name in NUMBER_FIELDS]
+INSERT_COLUMNS = ['region', 'symbol', 'name', *NUMBER_COLUMNS, 'crawled_at']
+
+
+def _typed(row: Row) -> Row:
+    """Every schema field of a row, numbers parsed to floats."""
+    return typed_row({name: row.get(name) for name in FIELD_NAMES})
+
+
+def snapshot_path(
+    region: str,
+    extension: str,
+    output_dir: str = OUTPUT_DIR,
+    timestamp: Optional[int] = None,
+) -> str:
+    """Return the cdn/ path of a snapshot file for `region`."""
+    if timestamp is None:
+        timestamp = int(datetime.datetime.now().timestamp())
+    filename = (
+        f'{timestamp}_yahoo_finance_crawler_'
+        f'{region.replace(" ", "_")}.{extension}'
+    )
+    return path.join(output_dir, filename)
+
+
+class Sink(abc.ABC):
+    """Destination for scraped rows, written incrementally.
+
+    Rows are buffered and written every `buffer_size` rows or every
+    `flush_interval` seconds, whichever comes first, to a temporary
+    '.part' file next to the final one. `close()` flushes what is left
+    and atomically renames the file to its final path; `abort()` keeps
+    the '.part' file with everything flushed so far.
+
+    Subclasses implement `_open_file`, `_write_rows` and `_close_file`.
+    """
+
+    extension = ''
+
+    def __init__(
+        self,
+        region: str,
+        output_dir: str = OUTPUT_DIR,
+        buffer_size: int = 500,
+        flush_interval: float = 5.0,
+    ):
+        self.region = region
+        self.output_dir = output_dir
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.crawled_at: Optional[int] = None
+        self.final_path: Optional[str] = None
+        self.temp_path: Optional[str] = None
+        self.rows_written = 0
+        self._buffer: List[Row] = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self.temp_path is not None
+
+    def open(self) -> None:
+        """Create the temporary file. Called on the first write."""
+        if not path.exists(self.output_dir):
+            makedirs(self.output_dir)
+        self.crawled_at = int(datetime.datetime.now().timestamp())
+        self.final_path = snapshot_path(
+            self.region, self.extension, self.output_dir, self.crawled_at
+        )
+        self.temp_path = f'{self.final_path}.part'
+        self._open_file(self.temp_path)
+        self._last_flush = time.monotonic()
+
+    def write(self, rows: Iterable[Row]) -> None:
+        """Buffer rows, flushing when the buffer is full or old enough."""
+        self._buffer.extend(rows)
+        if not self._buffer:
+            return
+        if not self.is_open:
+            self.open()
+        too_old = time.monotonic() - self._last_flush >= self.flush_interval
+        if len(self._buffer) >= self.buffer_size or too_old:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows to disk."""
+        if self._buffer and self.is_open:
+            self._write_rows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> Optional[str]:
+        """Finish the file and move it to its final path.
+
+        Returns the final path, or None when no row was ever written.
+        """
+        if not self.is_open:
+            return None
+        self.flush()
+        self._close_file()
+        replace(self.temp_path, self.final_path)
+        self.temp_path = None
+        return self.final_path
+
+    def abort(self) -> None:
+        """Flush and close, keeping the partial '.part' file."""
+        if not self.is_open:
+            return
+        self.flush()
+        self._close_file()
+        logger.warning(
+            f'Run aborted. {self.rows_written} rows kept in {self.temp_path}'
+        )
+        self.temp_path = None
+
+    @abc.abstractmethod
+    def _open_file(self, file_path: str) -> None:
+        """Open `file_path` for writing."""
+
+    @abc.abstractmethod
+    def _write_rows(self, rows: List[Row]) -> None:
+        """Write a batch of rows to the open file."""
+
+    @abc.abstractmethod
+    def _close_file(self) -> None:
+        """Close the file, leaving everything written on disk."""
+
+
+class CsvSink(Sink):
+    """Quoted CSV with every column of the schema.
+
+    Rows are written straight from their values, with no dict per row.
+    """
+
+    extension = 'csv'
+
+    def _open_file(self, file_path: str) -> None:
+        self._file = open(file_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file, quoting=csv.QUOTE_ALL)
+        self._writer.writerow(FIELDNAMES)
+
+    def _write_rows(self, rows: List[Row]) -> None:
+        self._writer.writerows(map(row_values, rows))
+        self._file.flush()
+
+    def _close_file(self) -> None:
+        self._file.close()
+
+
+class NdjsonSink(Sink):
+    """One JSON object per line, with numbers as numbers."""
+
+    extension = 'ndjson'
+
+    def _open_file(self, file_path: str) -> None:
+        self._file = open(file_path, 'w', encoding='utf-8')
+
+    def _write_rows(self, rows: List[Row]) -> None:
+        self._file.writelines(
+            json.dumps(
+                {
+                    'region': self.region,
+                    **_typed(row),
+                    'crawled_at': self.crawled_at,
+                },
+                ensure_ascii=False,
+            )
+            + '\n'
+            for row in rows
+        )
+        self._file.flush()
+
+    def _close_file(self) -> None:
+        self._file.close()
+
+
+class ParquetSink(Sink):
+    """Columnar file with typed columns, one row group per flush.
+
+    Symbol and region are dictionary-encoded strings, the number columns
+    are float64 and crawled_at a timestamp. Requires the optional pyarrow
+    package.
+    """
+
+    extension = 'parquet'
+
+    def _open_file(self, file_path: str) -> None:
+        try:
+            import pyarrow as pa  # noqa: PLC0415
+            import pyarrow.parquet as pq  # noqa: PLC0415
+        except ImportError as error:
+            raise ImportError(
+                'The parquet output requires the "pyarrow" package. '
+                'Install it with `poetry install --extras parquet`.'
+            ) from error
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ('region', pa.dictionary(pa.int32(), pa.string())),
+            ('symbol', pa.dictionary(pa.int32(), pa.string())),
+            ('name', pa.string()),
+            *((name, pa.float64()) for name in NUMBER_COLUMNS),
+            ('crawled_at', pa.timestamp('s', tz='UTC')),
+        ])
+        self._writer = pq.ParquetWriter(file_path, self._schema)
+
+    def _write_rows(self, rows: List[Row]) -> None:
+        crawled_at = datetime.datetime.fromtimestamp(
+            self.crawled_at, datetime.UTC
+        )
+        table = self._pa.table(
+            {
+                'region': [self.region] * len(rows),
+                'symbol': [row['symbol'] for row in rows],
+                'name': [row['name'] for row in rows],
+                **{
+                    name: [parse_number(row.get(name)) for row in rows]
+                    for name in NUMBER_COLUMNS
+                },
+                'crawled_at': [crawled_at] * len(rows),
+            },
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+
+    def _close_file(self) -> None:
+        self._writer.close()
+
+
+class SqliteSink(Sink):
+    """Appends snapshots to a single SQLite database in the output dir.
+
+    Every flush is one transaction with a batched insert, so rows are
+    durable as soon as they are flushed. Snapshots are listed in the
+    `snapshots` table and only marked complete when the run finishes;
+    an aborted run leaves its rows with complete = 0.
+    """
+
+    extension = 'sqlite'
+
+    def open(self) -> None:
+        if not path.exists(self.output_dir):
+            makedirs(self.output_dir)
+        self.crawled_at = int(datetime.datetime.now().timestamp())
+        self.final_path = path.join(self.output_dir, SQLITE_FILENAME)
+        self.temp_path = self.final_path
+        self._open_file(self.final_path)
+        self._last_flush = time.monotonic()
+
+    def close(self) -> Optional[str]:
+        if not self.is_open:
+            return None
+        self.flush()
+        with self._connection:
+            self._connection.execute(
+                'UPDATE snapshots SET complete = 1, rows = ? '
+                'WHERE region = ? AND crawled_at = ?',
+                (self.rows_written, self.region, self.crawled_at),
+            )
+        self._close_file()
+        self.temp_path = None
+        return self.final_path
+
+    def _open_file(self, file_path: str) -> None:
+        import sqlite3  # noqa: PLC0415
+
+        self._connection = sqlite3.connect(file_path)
+        with self._connection:
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS quotes (
+                    region TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    name TEXT,
+                    price REAL,
+                    crawled_at INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS quotes_region_symbol_crawled_at
+                    ON quotes (region, symbol, crawled_at);
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    region TEXT NOT NULL,
+                    crawled_at INTEGER NOT NULL,
+                    rows INTEGER NOT NULL DEFAULT 0,
+                    complete INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (region, crawled_at)
+                );
+                """
+            )
+            # Databases created before the full schema only have the price
+            existing = {
+                column[1]
+                for column in self._connection.execute(
+                    'PRAGMA table_info(quotes)'
+                )
+            }
+            for name in NUMBER_COLUMNS:
+                if name not in existing:
+                    self._connection.execute(
+                        f'ALTER TABLE quotes ADD COLUMN {name} REAL'
+                    )
+            self._connection.execute(
+                'INSERT OR REPLACE INTO snapshots (region, crawled_at) '
+                'VALUES (?, ?)',
+                (self.region, self.crawled_at),
+            )
+
+    def _write_rows(self, rows: List[Row]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                f'INSERT INTO quotes ({", ".join(INSERT_COLUMNS)}) '
+                f'VALUES ({", ".join("?" * len(INSERT_COLUMNS))})',
+                [
+                    (
+                        self.region,
+                        row['symbol'],
+                        row['name'],
+                        *(
+                            parse_number(row.get(name))
+                            for name in NUMBER_COLUMNS
+                        ),
+                        self.crawled_at,
+                    )
+                    for row in rows
+                ],
+            )
+
+    def _close_file(self) -> None:
+        self._connection.close()
+
+
+SINKS = {
+    'csv': CsvSink,
+    'ndjson': NdjsonSink,
+    'parquet': ParquetSink,
+    'sqlite': SqliteSink,
+}
+
+
+def _read_csv(file_path: str) -> Iterator[Row]:
+    with open(file_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield typed_row(row)
+
+
+def _read_ndjson(file_path: str) -> Iterator[Row]:
+    with open(file_path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                yield {name: row.get(name) for name in FIELD_NAMES}
+
+
+def _read_parquet(file_path: str) -> Iterator[Row]:
+    try:
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as error:
+        raise ImportError(
+            'Reading parquet snapshots requires the "pyarrow" package. '
+            'Install it with `poetry install --extras parquet`.'
+        ) from error
+    return iter(pq.read_table(file_path, columns=FIELD_NAMES).to_pylist())
+
+
+# Outputs written as one file per snapshot, which can be read back
+SNAPSHOT_READERS: Dict[str, Callable[[str], Iterator[Row]]] = {
+    'csv': _read_csv,
+    'ndjson': _read_ndjson,
+    'parquet': _read_parquet,
+}
+
+
+def read_snapshot(file_path: str) -> Iterator[Row]:
+    """The rows of a csv, ndjson or parquet snapshot, with typed numbers.
+
+    Only the schema fields are kept, whatever else the format stores.
+    """
+    extension = file_path.rsplit('.', 1)[1]
+    return SNAPSHOT_READERS[extension](file_path)
+
+
+def create_sink(
+    output: str, region: str, output_dir: str = OUTPUT_DIR
+) -> Sink:
+    """Build the sink registered under `output`."""
+    try:
+        sink_class = SINKS[output]
+    except KeyError:
+        raise ValueError(
+            f'Unknown output: {output!r}. Expected one of {", ".join(SINKS)}.'
+        ) from None
+    return sink_class(region, output_dir)
@@ -0,0 +1,137 @@
+import logging
+from typing import Dict, Iterator, List, Optional
+
+from .schema import Row
+
+logger = logging.getLogger(__name__)
+
+KEEP_FIRST = 'first'
+KEEP_LAST = 'last'
+FLAG_CHANGED = 'flag'
+CONFLICT_POLICIES = (KEEP_FIRST, KEEP_LAST, FLAG_CHANGED)
+
+
+class RowStore:
+    """Ordered collection of rows indexed by symbol.
+
+    Rows keep the order in which their symbol was first seen. Lookups and
+    inserts are O(1) thanks to a symbol -> position index.
+
+    Conflict policies for a symbol that is already stored:
+        - 'first': keep the row seen first and drop the new one.
+        - 'last': replace the stored row with the new one.
+        - 'flag': replace the stored row and, when the price changed,
+          record the change in `self.conflicts`.
+
+    With `keep_rows=False` only the symbol index (and the last price, for
+    the 'flag' policy) is kept: rows are meant to be streamed to a sink
+    as soon as `add()` reports them as new, so memory does not grow with
+    the size of every row.
+    """
+
+    def __init__(
+        self, conflict_policy: str = KEEP_FIRST, keep_rows: bool = True
+    ):
+        if conflict_policy not in CONFLICT_POLICIES:
+            raise ValueError(
+                f'Unknown conflict policy: {conflict_policy!r}. '
+                f'Expected one of {", ".join(CONFLICT_POLICIES)}.'
+            )
+        self.conflict_policy = conflict_policy
+        self.keep_rows = keep_rows
+        self.conflicts: List[Row] = []
+        self._rows: List[Row] = []
+        self._index: Dict[str, int] = {}
+        self._prices: Dict[str, Optional[float]] = {}
+
+    def __len__(self) -> int:
+        if not self.keep_rows:
+            return len(self._prices)
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Row]:
+        return iter(self._rows)
+
+    def __getitem__(self, position: int) -> Row:
+        return self._rows[position]
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._index or symbol in self._prices
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RowStore):
+            return self._rows == other._rows
+        return NotImplemented
+
+    __hash__ = None
+
+    def get(self, symbol: str) -> Optional[Row]:
+        """Return the row stored for `symbol`, or None."""
+        position = self._index.get(symbol)
+        if position is None:
+            return None
+        return self._rows[position]
+
+    def add(self, row: Row) -> bool:
+        """Insert a row, applying the conflict policy on duplicates.
+
+        Returns True only when the symbol was not stored before.
+        """
+        if not self.keep_rows:
+            return self._add_to_index(row)
+
+        symbol = row['symbol']
+        position = self._index.get(symbol)
+        if position is None:
+            self._index[symbol] = len(self._rows)
+            self._rows.append(row)
+            return True
+
+        if self.conflict_policy == KEEP_FIRST:
+            return False
+
+        previous = self._rows[position]
+        if self.conflict_policy == FLAG_CHANGED:
+            self._flag_price_change(
+                symbol, previous.get('price'), row.get('price')
+            )
+        self._rows[position] = row
+        return False
+
+    def _add_to_index(self, row: Row) -> bool:
+        symbol = row['symbol']
+        if symbol not in self._prices:
+            self._prices[symbol] = row.get('price')
+            return True
+
+        if self.conflict_policy == FLAG_CHANGED:
+            self._flag_price_change(
+                symbol, self._prices[symbol], row.get('price')
+            )
+        if self.conflict_policy != KEEP_FIRST:
+            self._prices[symbol] = row.get('price')
+        return False
+
+    def _flag_price_change(
+        self,
+        symbol: str,
+        old_price: Optional[float],
+        new_price: Optional[float],
+    ) -> None:
+        if old_price == new_price:
+            return
+        self.conflicts.append({
+            'symbol': symbol,
+            'old_price': old_price,
+            'new_price': new_price,
+        })
+        logger.warning(
+            f'Price changed for {symbol}: {old_price} -> {new_price}'
+        )
+
+    def clear(self) -> None:
+        """Remove every row and conflict."""
+        self._rows.clear()
+        self._index.clear()
+        self._prices.clear()
+        self.conflicts.clear()
@@ -0,0 +1,285 @@
+import random
+import string
+import time
+from html import escape
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from selenium.common.exceptions import NoSuchElementException
+
+from .core import (
+    PAGINATION_LABEL_SCRIPT,
+    REGION_BUTTON_XPATH,
+    TABLE_CELLS_SCRIPT,
+    TABLE_HTML_SCRIPT,
+)
+from .waits import STATE_SCRIPT
+
+NEXT_BUTTON_SELECTOR = '[data-testid="next-page-button"]'
+# Columns the real screener shows after the price, in its order.
+SCREENER_COLUMNS = (
+    'Change',
+    'Change %',
+    'Volume',
+    'Avg Vol (3M)',
+    'Market Cap',
+    'P/E Ratio (TTM)',
+    '52 Wk Change %',
+    '52 Wk Range',
+)
+CLICK_SCRIPT = 'arguments[0].click();'
+
+
+class SyntheticScreener:
+    """Deterministic screener pages for offline benchmarks.
+
+    Generates `pages` pages of `rows_per_page` quotes each, with
+    `extra_columns` columns besides symbol/name/price (the real screener
+    columns first, then generic ones) and about `noise_kb`
+    kilobytes of unrelated markup (scripts, ads, navigation) around the
+    table, like the real page. With `duplicate_ratio` the first rows of a
+    page repeat the last symbols of the previous one, as happens when the
+    screener reorders between page loads.
+    """
+
+    url = 'https://synthetic.invalid/screener'
+    region = 'Benchmark'
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rows_per_page: int = 100,
+        pages: int = 10,
+        *,
+        extra_columns: int = 0,
+        noise_kb: int = 0,
+        duplicate_ratio: float = 0.0,
+        seed: int = 0,
+    ):
+        self.rows_per_page = rows_per_page
+        self.pages = pages
+        self.extra_columns = extra_columns
+        self.noise_kb = noise_kb
+        self.duplicate_ratio = duplicate_ratio
+        self._random = random.Random(seed)
+        self.headers = [
+            'Symbol',
+            'Name',
+            'Price (Intraday)',
+            *SCREENER_COLUMNS[:extra_columns],
+            *(
+                f'Column {index}'
+                for index in range(
+                    len(SCREENER_COLUMNS) + 1, extra_columns + 1
+                )
+            ),
+        ]
+        self._rows = self._generate_rows()
+        self._noise = self._generate_noise()
+        self._html: Dict[int, str] = {}
+        self._tables: Dict[int, str] = {}
+
+    @property
+    def total_rows(self) -> int:
+        return self.rows_per_page * self.pages
+
+    def _generate_rows(self) -> List[List[List[str]]]:
+        pages = []
+        duplicates = int(self.rows_per_page * self.duplicate_ratio)
+        counter = 0
+        for page in range(self.pages):
+            rows = []
+            if page and duplicates:
+                rows.extend(pages[-1][-duplicates:])
+            while len(rows) < self.rows_per_page:
+                counter += 1
+                rows.append(self._generate_row(counter))
+            pages.append(rows)
+        return pages
+
+    def _generate_row(self, counter: int) -> List[str]:
+        rand = self._random
+        symbol = ''.join(rand.choices(string.ascii_uppercase, k=4))
+        low = rand.uniform(1, 2500)
+        screener_cells = [
+            f'{rand.uniform(-50, 50):+.2f}',
+            f'{rand.uniform(-10, 10):+.2f}%',
+            f'{rand.uniform(0, 999):.3f}M',
+            f'{rand.uniform(0, 999):.3f}K',
+            f'{rand.uniform(0, 99):.3f}B',
+            rand.choice(('--', f'{rand.uniform(1, 80):.2f}')),
+            f'{rand.uniform(-60, 60):+.2f}%',
+            f'{low:,.2f} - {low * rand.uniform(1, 3):,.2f}',
+        ]
+        return [
+            f'{symbol}{counter}.SA',
+            f'{symbol.title()} Holding S.A.',
+            f'{rand.uniform(1, 5000):,.2f}',
+            *screener_cells[: self.extra_columns],
+            *(
+                f'{rand.uniform(0, 1000):.2f}{rand.choice("KMB%")}'
+                for _ in range(self.extra_columns - len(screener_cells))
+            ),
+        ]
+
+    def _generate_noise(self) -> str:
+        chunks = []
+        size = 0
+        while size < self.noise_kb * 1024:
+            words = ' '.join(
+                ''.join(self._random.choices(string.ascii_lowercase, k=7))
+                for _ in range(12)
+            )
+            chunk = (
+                f'<div class="ad-slot"><script>window.__ads = "{words}";'
+                f'</script><a href="#">{words}</a></div>'
+            )
+            chunks.append(chunk)
+            size += len(chunk)
+        return ''.join(chunks)
+
+    def rows(self, page: int) -> List[List[str]]:
+        """Cell texts of a 1-based page."""
+        return self._rows[page - 1]
+
+    def label(self, page: int) -> str:
+        first = (page - 1) * self.rows_per_page + 1
+        last = first + len(self.rows(page)) - 1
+        return f'{first}-{last} of {self.total_rows:,}'
+
+    def table_html(self, page: int) -> str:
+        if page not in self._tables:
+            head = ''.join(f'<th>{escape(text)}</th>' for text in self.headers)
+            body = ''.join(
+                '<tr>'
+                + ''.join(f'<td>{escape(cell)}</td>' for cell in row)
+                + '</tr>'
+                for row in self.rows(page)
+            )
+            self._tables[page] = (
+                '<table data-testid="data-table">'
+                f'<thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+            )
+        return self._tables[page]
+
+    def page_html(self, page: int) -> str:
+        if page not in self._html:
+            disabled = ' disabled' if page == self.pages else ''
+            self._html[page] = (
+                '<html><head><title>Screener</title></head><body>'
+                f'<nav>{self._noise[: len(self._noise) // 2]}</nav>'
+                f'<main>{self.table_html(page)}'
+                f'<div class="pagination"><span>{self.label(page)}</span>'
+                f'<button data-testid="next-page-button"{disabled}>Next'
+                '</button></div></main>'
+                f'<footer>{self._noise[len(self._noise) // 2 :]}</footer>'
+                '</body></html>'
+            )
+        return self._html[page]
+
+
+class FakeElement:
+    """The few WebElement methods the crawler calls."""
+
+    def __init__(self, driver: 'FakeDriver', role: str):
+        self.driver = driver
+        self.role = role
+
+    def is_enabled(self) -> bool:  # noqa: PLR6301
+        return True
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        if name == 'disabled' and self.role == 'next':
+            return 'true' if self.driver.is_last_page else None
+        return None
+
+    @property
+    def text(self) -> str:
+        if self.role == 'region':
+            return f'Region: {self.driver.screener.region}'
+        return ''
+
+    def click(self) -> None:
+        self.driver.click(self)
+
+
+class FakeDriver:
+    """In-process stand-in for webdriver.Chrome over a SyntheticScreener.
+
+    Answers the scripts the crawler, the table waiter and the page weight
+    meter run, and moves to the next page when the Next button is clicked,
+    so `_scrape_all_pages()` runs unchanged without a browser. Table
+    changes are instant, so waits end on their first check; clicking Next
+    blocks for `load_seconds`, like the browser loading the next page.
+    """
+
+    def __init__(self, screener: SyntheticScreener, load_seconds: float = 0):
+        self.screener = screener
+        self.load_seconds = load_seconds
+        self.page = 1
+        self.current_url = screener.url
+        self.quit_called = False
+
+    @property
+    def is_last_page(self) -> bool:
+        return self.page >= self.screener.pages
+
+    @property
+    def page_source(self) -> str:
+        return self.screener.page_html(self.page)
+
+    def get(self, url: str) -> None:
+        """Open the page at the start/count offset of `url`, if any."""
+        self.current_url = url
+        query = dict(parse_qsl(urlsplit(url).query))
+        count = int(query.get('count', self.screener.rows_per_page))
+        self.page = int(query.get('start', 0)) // count + 1
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+    def click(self, element: FakeElement) -> None:
+        if element.role == 'next' and not self.is_last_page:
+            if self.load_seconds:
+                time.sleep(self.load_seconds)
+            self.page += 1
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        if value == NEXT_BUTTON_SELECTOR:
+            return FakeElement(self, 'next')
+        if 'table' in value:
+            return FakeElement(self, 'table')
+        if value == REGION_BUTTON_XPATH:
+            return FakeElement(self, 'region')
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by: str, value: str) -> List[FakeElement]:
+        try:
+            return [self.find_element(by, value)]
+        except NoSuchElementException:
+            return []
+
+    def execute_script(self, script: str, *args):  # noqa: PLR0911
+        screener = self.screener
+        if script == CLICK_SCRIPT:
+            self.click(args[0])
+            return None
+        if script == TABLE_HTML_SCRIPT:
+            return screener.table_html(self.page)
+        if script == TABLE_CELLS_SCRIPT:
+            return {
+                'headers': list(screener.headers),
+                'rows': [list(row) for row in screener.rows(self.page)],
+            }
+        if script == PAGINATION_LABEL_SCRIPT:
+            return f'{screener.label(self.page)} Next'
+        if script == STATE_SCRIPT:
+            rows = screener.rows(self.page)
+            return {
+                'symbol': rows[0][0] if rows else None,
+                'rows': len(rows),
+                'label': screener.label(self.page),
+                'mutations': 0,
+                'first': None,
+            }
+        # SNAPSHOT_SCRIPT, PAGE_WEIGHT_SCRIPT and anything else: no value
+        return None
@@ -0,0 +1,154 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .parsing import TABLE_SELECTOR
+
+logger = logging.getLogger(__name__)
+
+# Reads the first row symbol, the row count and the pagination label, and
+# (re)arms a MutationObserver that counts changes made to the table body.
+SNAPSHOT_SCRIPT = f"""
+const table = document.querySelector('{TABLE_SELECTOR}');
+const body = table ? (table.querySelector('tbody') || table) : null;
+if (window.__crawlerObserver) window.__crawlerObserver.disconnect();
+window.__crawlerMutations = 0;
+if (body) {{
+    window.__crawlerObserver = new MutationObserver((records) => {{
+        window.__crawlerMutations += records.length;
+    }});
+    window.__crawlerObserver.observe(
+        body, {{childList: true, subtree: true, characterData: true}}
+    );
+}}
+"""
+
+STATE_SCRIPT = f"""
+const table = document.querySelector('{TABLE_SELECTOR}');
+const body = table ? (table.querySelector('tbody') || table) : null;
+const rows = body ? body.querySelectorAll('tr') : [];
+const firstCell = rows.length ? rows[0].querySelector('td, th') : null;
+const next = document.querySelector('[data-testid="next-page-button"]');
+const pagination = next && next.parentElement;
+return {{
+    symbol: firstCell ? firstCell.textContent.trim() : null,
+    rows: rows.length,
+    label: pagination ? pagination.textContent.trim() : null,
+    mutations: window.__crawlerMutations || 0,
+    first: rows.length ? rows[0] : null,
+}};
+"""
+
+
+@dataclass
+class TableState:
+    """What the table looked like before an action that should change it."""
+
+    symbol: Optional[str] = None
+    rows: int = 0
+    label: Optional[str] = None
+    first_row: Optional[WebElement] = None
+
+
+@dataclass
+class WaitTiming:
+    """How long a wait took and why it ended."""
+
+    label: str
+    seconds: float
+    reason: str
+
+
+class TableWaiter:
+    """Waits until the data table really changed instead of sleeping.
+
+    A change is detected when, compared to the snapshot taken before the
+    action, the first row symbol, the row count or the pagination label
+    differ, when the old first row went stale, or when the MutationObserver
+    saw the table body change and it has been quiet since the last poll.
+    Every wait is bounded by `timeout` and recorded in `self.timings`.
+    """
+
+    def __init__(
+        self, driver, timeout: float = 10.0, poll_frequency: float = 0.1
+    ):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings: List[WaitTiming] = []
+
+    def snapshot(self) -> TableState:
+        """Record the current table state and arm the mutation observer."""
+        self.driver.execute_script(SNAPSHOT_SCRIPT)
+        state = self.driver.execute_script(STATE_SCRIPT) or {}
+        return TableState(
+            symbol=state.get('symbol'),
+            rows=state.get('rows', 0),
+            label=state.get('label'),
+            first_row=state.get('first'),
+        )
+
+    def wait_for_change(self, previous: TableState, label: str) -> WaitTiming:
+        """Block until the table differs from `previous` or time runs out."""
+        last_mutations = [0]
+        reason = ['timeout']
+
+        def changed(driver) -> bool:
+            state = driver.execute_script(STATE_SCRIPT) or {}
+            has_rows = state.get('rows', 0) > 0
+            if not has_rows:
+                return False
+            if state.get('symbol') and state['symbol'] != previous.symbol:
+                reason[0] = 'symbol'
+            elif state.get('label') and state['label'] != previous.label:
+                reason[0] = 'label'
+            elif state['rows'] != previous.rows:
+                reason[0] = 'rows'
+            elif self._is_stale(previous.first_row):
+                reason[0] = 'stale'
+            elif state.get('mutations', 0) and (
+                state['mutations'] == last_mutations[0]
+            ):
+                reason[0] = 'mutation'
+            else:
+                last_mutations[0] = state.get('mutations', 0)
+                return False
+            return True
+
+        start = time.perf_counter()
+        try:
+            WebDriverWait(
+                self.driver, self.timeout, poll_frequency=self.poll_frequency
+            ).until(changed)
+        except TimeoutException:
+            logger.warning(
+                f'Table did not change within {self.timeout}s ({label}).'
+            )
+        timing = WaitTiming(
+            label=label,
+            seconds=time.perf_counter() - start,
+            reason=reason[0],
+        )
+        self.timings.append(timing)
+        logger.info(
+            f'Waited {timing.seconds:.2f}s for {label} ({timing.reason}).'
+        )
+        return timing
+
+    @staticmethod
+    def _is_stale(element: Optional[WebElement]) -> bool:
+        if element is None:
+            return False
+        try:
+            element.is_enabled()
+        except StaleElementReferenceException:
+            return True
+        return False
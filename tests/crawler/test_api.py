@@ -0,0 +1,221 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.crawler.api import YahooFinanceApiCrawler, region_code
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+class RecordedScreenerHandler(BaseHTTPRequestHandler):
+    """Serves recorded screener responses, checking cookie and crumb."""
+
+    requests = []
+    crumb = b'test-crumb'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/screener':
+            self.send_response(200)
+            self.send_header('Set-Cookie', 'A3=session; Path=/; Secure')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/v1/test/getcrumb':
+            self._send(200, self.crumb, 'text/plain')
+        else:
+            self._send(404, b'{}')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.requests.append({
+            'query': parse_qs(url.query),
+            'cookie': self.headers.get('Cookie'),
+            'body': body,
+        })
+        fixture = FIXTURES / f'screener_offset_{body["offset"]}.json'
+        self._send(200, fixture.read_bytes())
+
+
+@pytest.fixture
+def server():
+    RecordedScreenerHandler.requests = []
+    RecordedScreenerHandler.crumb = b'test-crumb'
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RecordedScreenerHandler)
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True
+    )
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def crawler(server):
+    return YahooFinanceApiCrawler(
+        region='Brazil',
+        base_url=f'{server}/screener',
+        api_url=server,
+        fetch_size=2,
+    )
+
+
+def test_region_code():
+    assert region_code('Brazil') == 'br'
+    assert region_code('united kingdom') == 'gb'
+    assert region_code('us') == 'us'
+
+    with pytest.raises(ValueError, match='Unknown region'):
+        region_code('Atlantis')
+
+
+def test_does_not_start_a_browser(crawler):
+    assert crawler.driver is None
+
+
+def test_run_pages_through_recorded_responses(crawler, monkeypatch):
+    EXPECTED_REQUESTS = 2
+    monkeypatch.setattr(crawler, '_save_output', lambda: None)
+
+    crawler.run()
+
+    assert [
+        (row['symbol'], row['name'], row['price']) for row in crawler.data
+    ] == [
+        ('PETR4.SA', 'PETROBRAS   PN', 1234.56),
+        ('VALE3.SA', 'VALE        ON', 61.2),
+        ('ITUB4.SA', 'Itaú Unibanco Holding S.A.', 35.1),
+    ]
+    # Raw values are used when present, the formatted text otherwise
+    EXPECTED_CHANGE_PERCENT = -0.53
+    EXPECTED_MARKET_CAP = 501.7e9
+    assert crawler.data[0]['change_percent'] == EXPECTED_CHANGE_PERCENT
+    assert crawler.data[0]['market_cap'] == EXPECTED_MARKET_CAP
+    assert crawler.data[1]['volume'] is None
+
+    requests = RecordedScreenerHandler.requests
+    assert len(requests) == EXPECTED_REQUESTS
+    assert [request['body']['offset'] for request in requests] == [0, 2]
+    assert requests[0]['body']['size'] == EXPECTED_REQUESTS
+    assert requests[0]['body']['query']['operands'][0]['operands'] == [
+        'region',
+        'br',
+    ]
+    assert requests[0]['query']['crumb'] == ['test-crumb']
+    assert requests[0]['cookie'] == 'A3=session'
+
+
+def test_queued_range_fetches_in_its_own_page_size(server, monkeypatch):
+    EXPECTED_SIZE = 2
+    crawler = YahooFinanceApiCrawler(
+        region='Brazil',
+        base_url=f'{server}/screener',
+        api_url=server,
+        first_page=2,
+        last_page=2,
+        page_size=EXPECTED_SIZE,
+    )
+    monkeypatch.setattr(crawler, '_save_output', lambda: None)
+
+    crawler.run()
+
+    [request] = RecordedScreenerHandler.requests
+    assert request['body']['offset'] == EXPECTED_SIZE
+    assert request['body']['size'] == EXPECTED_SIZE
+
+
+def test_delta_stops_after_unchanged_pages(crawler, monkeypatch):
+    monkeypatch.setattr(crawler, '_save_output', lambda: None)
+    crawler.delta = MagicMock(unchanged_pages=1)
+    crawler.delta.should_stop.return_value = True
+
+    crawler.run()
+
+    assert len(RecordedScreenerHandler.requests) == 1
+
+
+def test_crumb_is_escaped_in_the_query(crawler, monkeypatch):
+    RecordedScreenerHandler.crumb = b'a/b+c=d&e'
+    monkeypatch.setattr(crawler, '_save_output', lambda: None)
+
+    crawler.run()
+
+    query = RecordedScreenerHandler.requests[0]['query']
+    assert query['crumb'] == ['a/b+c=d&e']
+    assert query['lang'] == ['en-US']
+
+
+def test_run_saves_rows(crawler, monkeypatch):
+    EXPECTED_ROWS = 3
+    saved = []
+    monkeypatch.setattr(
+        crawler, '_save_output', lambda: saved.append(len(crawler.data))
+    )
+
+    crawler.run()
+
+    assert saved == [EXPECTED_ROWS]
+
+
+def test_run_failure(crawler):
+    crawler.api_url = crawler.base_url
+
+    with pytest.raises(RuntimeError, match='Could not get a crumb'):
+        crawler.run()
+
+
+def test_run_resumes_from_checkpoint(server, tmp_path, monkeypatch):
+    crawler = YahooFinanceApiCrawler(
+        region='Brazil',
+        base_url=f'{server}/screener',
+        api_url=server,
+        output_dir=str(tmp_path),
+        resume=True,
+    )
+    crawler.checkpoints.append_rows([
+        {'symbol': 'PETR4.SA', 'name': 'PETROBRAS   PN', 'price': '1234.56'},
+        {'symbol': 'VALE3.SA', 'name': 'VALE        ON', 'price': '61.20'},
+    ])
+    crawler.checkpoints.mark_page(1, 2)
+    monkeypatch.setattr(crawler, '_save_output', lambda: None)
+
+    crawler.run()
+
+    requests = RecordedScreenerHandler.requests
+    assert [request['body']['offset'] for request in requests] == [2]
+    assert [row['symbol'] for row in crawler.data] == [
+        'PETR4.SA',
+        'VALE3.SA',
+        'ITUB4.SA',
+    ]
+
+
+def test_run_records_page_metrics(crawler, monkeypatch):
+    EXPECTED_PAGES = 2
+    EXPECTED_ROWS = 3
+    monkeypatch.setattr(crawler, '_save_output', lambda: None)
+
+    crawler.run()
+
+    report = crawler.metrics.report()
+    assert report['backend'] == 'http'
+    assert report['status'] == 'ok'
+    assert report['pages'] == EXPECTED_PAGES
+    assert report['rows'] == EXPECTED_ROWS
+    assert report['page_totals']['html_bytes'] > 0
+    assert {'session', 'scrape', 'save'} <= set(report['phases'])
@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+import src.crawler
+from src.crawler.api import YahooFinanceApiCrawler
+from src.crawler.backends import BACKENDS, load_backend, register_backend
+from src.crawler.base import BaseCrawler
+from src.crawler.core import YahooFinanceCrawler
+from src.crawler.replay import YahooFinanceReplayCrawler
+
+
+def test_load_backend():
+    assert load_backend('selenium') is YahooFinanceCrawler
+    assert load_backend('http') is YahooFinanceApiCrawler
+    assert load_backend('replay') is YahooFinanceReplayCrawler
+
+
+def test_every_backend_shares_the_base_crawler():
+    for name in BACKENDS:
+        assert issubclass(load_backend(name), BaseCrawler)
+
+
+def test_backend_without_scrape_cannot_be_built():
+    class Incomplete(BaseCrawler):
+        backend = 'incomplete'
+
+    with pytest.raises(TypeError, match='abstract'):
+        Incomplete(region='Brazil', base_url='http://test.url')
+
+
+def test_run_aborts_the_sink_and_closes_a_failed_backend():
+    class Broken(BaseCrawler):
+        backend = 'broken'
+        close = MagicMock()
+
+        def _scrape(self):  # noqa: PLR6301
+            raise RuntimeError('Simulated scrape error')
+
+    crawler = Broken(region='Brazil', base_url='http://test.url')
+    crawler.sink = MagicMock()
+
+    with pytest.raises(RuntimeError, match='Simulated scrape error'):
+        crawler.run()
+
+    crawler.sink.abort.assert_called_once()
+    crawler.close.assert_called_once()
+    assert crawler.metrics.status == 'error'
+
+
+def test_load_unknown_backend():
+    with pytest.raises(ValueError, match='Unknown backend'):
+        load_backend('carrier-pigeon')
+
+
+def test_register_backend(monkeypatch):
+    # Undone after the test, so the registry stays as shipped
+    monkeypatch.delitem(BACKENDS, 'custom', raising=False)
+
+    register_backend('custom', 'src.crawler.replay:YahooFinanceReplayCrawler')
+
+    assert load_backend('custom') is YahooFinanceReplayCrawler
+
+
+def test_register_backend_requires_a_class():
+    with pytest.raises(ValueError, match='Invalid backend target'):
+        register_backend('custom', 'src.crawler.replay')
+
+
+def test_package_exports_the_crawler_lazily():
+    assert src.crawler.YahooFinanceCrawler is YahooFinanceCrawler
+    with pytest.raises(AttributeError):
+        src.crawler.Nope
@@ -0,0 +1,176 @@
+import json
+
+from src.crawler.bench import (
+    SCENARIOS,
+    STARTUP_COMMANDS,
+    Scenario,
+    compare,
+    main,
+    measure_startup,
+    run_scenario,
+    unexpected_imports,
+)
+
+EXPECTED_ROWS = 20
+
+
+def test_run_scenario_reports_stages():
+    result = run_scenario(
+        Scenario('tiny', rows_per_page=5, pages=4),
+        repeat=1,
+        extract_mode='fragment',
+    )
+
+    assert result['rows'] == EXPECTED_ROWS
+    assert set(result['seconds']) == {
+        'scrape',
+        'save',
+        'dedup',
+        'wait',
+        'fetch',
+        'parse',
+    }
+    assert set(result['peak_kb']) == {'scrape', 'rows', 'save', 'dedup'}
+    assert result['options'] == {'extract_mode': 'fragment'}
+
+
+def test_run_scenario_without_memory():
+    result = run_scenario(SCENARIOS['small'], repeat=1, memory=False)
+
+    assert result['peak_kb'] == {}
+
+
+def test_compare_flags_slower_stages():
+    baseline = {
+        'default': {
+            'options': {},
+            'seconds': {'scrape': 1.0, 'save': 0.001},
+            'peak_kb': {'scrape': 100.0},
+        }
+    }
+    results = {
+        'default': {
+            'options': {},
+            # save is below the comparable threshold, so it is ignored
+            'seconds': {'scrape': 1.5, 'save': 0.1},
+            'peak_kb': {'scrape': 110.0},
+        },
+        'new': {'options': {}, 'seconds': {'scrape': 9.0}, 'peak_kb': {}},
+    }
+
+    regressions = compare(results, baseline, tolerance=0.25)
+
+    assert regressions == ['default/scrape: seconds 1 -> 1.5 (+50%)']
+
+
+def test_compare_skips_results_with_other_options():
+    baseline = {'default': {'options': {'parser': 'lxml'}, 'seconds': {}}}
+    results = {
+        'default': {
+            'options': {'parser': 'html.parser'},
+            'seconds': {'scrape': 9.0},
+            'peak_kb': {},
+        }
+    }
+
+    assert compare(results, baseline) == []
+
+
+def test_main_saves_and_compares_baseline(tmp_path):
+    baseline_path = tmp_path / 'baseline.json'
+    args = [
+        '--scenario',
+        'small',
+        '--repeat',
+        '1',
+        '--no-memory',
+        '--baseline',
+        str(baseline_path),
+    ]
+
+    assert main([*args, '--save-baseline']) == 0
+    saved = json.loads(baseline_path.read_text())
+    assert saved['small']['rows'] == SCENARIOS['small'].pages * 25
+
+    # A generous tolerance keeps the comparison stable on slow machines
+    assert main([*args, '--tolerance', '100']) == 0
+
+
+def test_main_fails_on_regression(tmp_path, monkeypatch):
+    options = {
+        'extract_mode': 'fragment',
+        'parser': 'html.parser',
+        'output': 'csv',
+        'parse_workers': 0,
+    }
+    baseline_path = tmp_path / 'baseline.json'
+    baseline_path.write_text(
+        json.dumps({
+            'small': {
+                'options': options,
+                'seconds': {'scrape': 0.1},
+                'peak_kb': {},
+            }
+        })
+    )
+    monkeypatch.setattr(
+        'src.crawler.bench.run_scenario',
+        lambda scenario, repeat, memory, **kwargs: {
+            'options': kwargs,
+            'rows': 100,
+            'html_bytes': 0,
+            'seconds': {'scrape': 0.2},
+            'peak_kb': {},
+        },
+    )
+
+    exit_code = main([
+        '--scenario',
+        'small',
+        '--baseline',
+        str(baseline_path),
+    ])
+
+    assert exit_code == 1
+
+
+def test_measure_startup_loads_no_browser():
+    result = measure_startup(repeat=1)
+
+    assert set(result['seconds']) == set(STARTUP_COMMANDS)
+    assert result['modules']['import_app'] == []
+    assert result['modules']['import_replay'] == []
+    assert unexpected_imports(result) == []
+
+
+def test_unexpected_imports():
+    result = {
+        'modules': {
+            'import_app': ['selenium'],
+            'import_http': ['urllib3'],
+        }
+    }
+
+    assert unexpected_imports(result) == [
+        'startup/import_app: imports selenium'
+    ]
+
+
+def test_main_startup_fails_on_unexpected_imports(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        'src.crawler.bench.measure_startup',
+        lambda repeat: {
+            'options': {},
+            'seconds': {'help': 0.1},
+            'peak_kb': {},
+            'modules': {'help': ['bs4']},
+        },
+    )
+
+    exit_code = main([
+        '--startup',
+        '--baseline',
+        str(tmp_path / 'baseline.json'),
+    ])
+
+    assert exit_code == 1
@@ -0,0 +1,148 @@
+from fnmatch import fnmatch
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.crawler.blocking import (
+    BLOCKING_PROFILES,
+    PAGE_WEIGHT_SCRIPT,
+    RESOURCE_TYPE_PATTERNS,
+    BlockingProfile,
+    PageWeightMeter,
+    apply_profile,
+    compare_profiles,
+    configure_options,
+    get_profile,
+)
+from src.crawler.core import create_driver
+
+EXPECTED_SAVED_REQUESTS = 30
+
+
+def test_off_profile_blocks_nothing():
+    driver = MagicMock()
+
+    apply_profile(driver, BLOCKING_PROFILES['off'])
+
+    assert BLOCKING_PROFILES['off'].blocked_urls() == []
+    driver.execute_cdp_cmd.assert_not_called()
+
+
+def test_default_profile_blocks_images_fonts_and_trackers():
+    patterns = BLOCKING_PROFILES['default'].blocked_urls()
+
+    assert '*doubleclick.net*' in patterns
+    assert set(RESOURCE_TYPE_PATTERNS['image']) <= set(patterns)
+    assert set(RESOURCE_TYPE_PATTERNS['font']) <= set(patterns)
+    assert len(patterns) == len(set(patterns))
+
+
+@pytest.mark.parametrize(
+    'url',
+    [
+        'https://consent.cmp.oath.com/cmp.js',
+        'https://s.yimg.com/cv/apiv2/default/finance/screener.js',
+        'https://finance.yahoo.com/research-hub/screener/beacon-stocks/',
+        'https://finance.yahoo.com/quote/PIXEL/',
+    ],
+)
+def test_strict_profile_lets_the_page_and_its_consent_manager_load(url):
+    patterns = BLOCKING_PROFILES['strict'].url_patterns
+
+    assert not [pattern for pattern in patterns if fnmatch(url, pattern)]
+
+
+def test_apply_profile_sends_blocked_urls_over_devtools():
+    driver = MagicMock()
+    profile = BlockingProfile(
+        'custom', url_patterns=['*ads*'], disable_javascript=True
+    )
+
+    apply_profile(driver, profile)
+
+    driver.execute_cdp_cmd.assert_any_call('Network.enable', {})
+    driver.execute_cdp_cmd.assert_any_call(
+        'Network.setBlockedURLs', {'urls': ['*ads*']}
+    )
+    driver.execute_cdp_cmd.assert_any_call(
+        'Emulation.setScriptExecutionDisabled', {'value': True}
+    )
+
+
+def test_configure_options_disables_images():
+    options = MagicMock()
+
+    configure_options(options, BLOCKING_PROFILES['default'])
+
+    options.add_argument.assert_called_once_with(
+        '--blink-settings=imagesEnabled=false'
+    )
+
+
+def test_create_driver_applies_profile():
+    with patch('src.crawler.core.webdriver.Chrome') as mock_chrome:
+        create_driver(block_profile='strict')
+
+    mock_chrome.return_value.execute_cdp_cmd.assert_any_call(
+        'Network.setBlockedURLs',
+        {'urls': BLOCKING_PROFILES['strict'].blocked_urls()},
+    )
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match='Unknown blocking profile'):
+        get_profile('nope')
+
+
+def test_page_weight_meter_counts_per_page_and_per_document():
+    driver = MagicMock()
+    driver.execute_script.side_effect = [
+        {'origin': 1.0, 'requests': 40, 'bytes': 400_000},
+        {'origin': 1.0, 'requests': 45, 'bytes': 450_000},
+        # New document (a tab or a full page load): counters restart
+        {'origin': 2.0, 'requests': 10, 'bytes': 90_000},
+    ]
+    meter = PageWeightMeter()
+
+    weights = [meter.measure(driver, page) for page in (1, 2, 3)]
+
+    assert [(w.requests, w.bytes) for w in weights] == [
+        (40, 400_000),
+        (5, 50_000),
+        (10, 90_000),
+    ]
+    assert meter.total_requests == sum([40, 5, 10])
+    driver.execute_script.assert_called_with(PAGE_WEIGHT_SCRIPT)
+
+
+def test_page_weight_meter_ignores_unexpected_results():
+    driver = MagicMock()
+    driver.execute_script.return_value = None
+    meter = PageWeightMeter()
+
+    assert meter.measure(driver, 1) is None
+    assert meter.pages == []
+
+
+def test_compare_profiles_uses_a_fresh_browser_per_profile():
+    counters = {
+        'off': {'origin': 1.0, 'requests': 50, 'bytes': 900_000},
+        'default': {'origin': 1.0, 'requests': 20, 'bytes': 200_000},
+    }
+    drivers = {}
+
+    def driver_factory(profile):
+        driver = MagicMock()
+        driver.execute_script.return_value = counters[profile]
+        drivers[profile] = driver
+        return driver
+
+    weights = compare_profiles(
+        'http://test.url', ['off', 'default'], driver_factory
+    )
+
+    saved = weights['off'].requests - weights['default'].requests
+    assert saved == EXPECTED_SAVED_REQUESTS
+    for driver in drivers.values():
+        driver.get.assert_called_once_with('http://test.url')
+        driver.quit.assert_called_once()
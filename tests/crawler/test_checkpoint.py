@@ -0,0 +1,63 @@
+import pytest
+
+from src.crawler.checkpoint import Checkpoint, CheckpointStore
+
+ROWS = [
+    {'symbol': 'A', 'name': 'Alpha', 'price': '1.00'},
+    {'symbol': 'B', 'name': 'Beta', 'price': '2.00'},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore('United States', str(tmp_path))
+
+
+def test_paths(store, tmp_path):
+    assert store.meta_path == str(
+        tmp_path / '.checkpoints' / 'United_States.json'
+    )
+    assert store.rows_path == str(
+        tmp_path / '.checkpoints' / 'United_States.rows.ndjson'
+    )
+
+
+def test_load_without_checkpoint(store):
+    assert store.load() is None
+
+
+def test_round_trip(store):
+    store.append_rows(ROWS[:1])
+    store.mark_page(1, 100, 'http://test.url/screener')
+    store.append_rows(ROWS[1:])
+    store.mark_page(2, 100, 'http://test.url/screener')
+
+    assert store.load() == Checkpoint(
+        region='United States',
+        page=2,
+        page_size=100,
+        rows_count=2,
+        url='http://test.url/screener',
+        rows=ROWS,
+    )
+
+
+def test_rows_of_an_unfinished_page_are_ignored(store):
+    store.append_rows(ROWS[:1])
+    store.mark_page(1, 25)
+    store.append_rows(ROWS[1:])
+
+    checkpoint = store.load()
+
+    assert checkpoint.page == 1
+    assert checkpoint.rows == ROWS[:1]
+
+
+def test_clear(store, tmp_path):
+    store.append_rows(ROWS)
+    store.mark_page(1, 25)
+
+    store.clear()
+
+    assert store.load() is None
+    assert list((tmp_path / '.checkpoints').iterdir()) == []
@@ -1,9 +1,27 @@
+import csv
+from collections import deque
+from concurrent.futures import Future
 from unittest.mock import MagicMock, patch
 
 import pytest
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 
-from src.crawler.core import YahooFinanceCrawler
+from src.crawler.base import DEFAULT_PAGE_SIZE
+from src.crawler.blocking import BLOCKING_PROFILES, DEFAULT_PROFILE
+from src.crawler.checkpoint import CheckpointStore
+from src.crawler.core import (
+    NAVIGATE_SCRIPT,
+    PAGINATION_LABEL_SCRIPT,
+    CapturedPage,
+    YahooFinanceCrawler,
+)
+from src.crawler.filter_cache import FilterCache
+from src.crawler.retry import CircuitOpenError
+from src.crawler.store import FLAG_CHANGED, KEEP_LAST
+
+EXPECTED_PENDING_PAGES = 2
+HEADERS = ['symbol', 'name', 'price (intraday)']
 
 
 @pytest.fixture
@@ -16,13 +34,16 @@ def mock_driver():
 
 @pytest.fixture
 def crawler(mock_driver):
-    return YahooFinanceCrawler(region='Brazil', base_url='http://test.url')
+    crawler = YahooFinanceCrawler(region='Brazil', base_url='http://test.url')
+    crawler.waiter = MagicMock()
+    crawler.retrier.sleep = lambda seconds: None
+    return crawler
 
 
 def test_initialization(crawler):
     assert crawler.region == 'Brazil'
     assert crawler.base_url == 'http://test.url'
-    assert crawler.data == []
+    assert not list(crawler.data)
     assert crawler.driver is not None
 
 
@@ -41,7 +62,7 @@ def test_run_flow(crawler):
         patch.object(crawler, '_apply_region_filter') as mock_apply,
         patch.object(crawler, '_set_rows_per_page_to_100') as mock_rows,
         patch.object(crawler, '_scrape_all_pages') as mock_scrape,
-        patch.object(crawler, '_save_to_csv') as mock_save,
+        patch.object(crawler, '_save_output') as mock_save,
     ):
         crawler.run()
 
@@ -56,7 +77,7 @@ def test_run_flow(crawler):
 def test_run_failure(crawler):
     crawler.driver.get.side_effect = Exception('Simulated connection error')
 
-    with patch('src.crawler.core.logger') as mock_logger:
+    with patch('src.crawler.base.logger') as mock_logger:
         with pytest.raises(Exception) as excinfo:
             crawler.run()
 
@@ -65,29 +86,69 @@ def test_run_failure(crawler):
         crawler.driver.quit.assert_called_once()
 
 
-def test_save_to_csv(crawler):
-    crawler.data = [{'symbol': 'A', 'name': 'B', 'price': '10'}]
+def test_save_output(crawler, tmp_path):
+    crawler.output_dir = str(tmp_path / 'cdn')
+    crawler.data.add({'symbol': 'A', 'name': 'B', 'price': 10.0})
 
-    with patch('builtins.open', new_callable=MagicMock) as mock_open:
-        with patch('src.crawler.core.makedirs') as mock_makedirs:
-            with patch('src.crawler.core.path.exists', return_value=False):
-                with patch('src.crawler.core.csv.DictWriter') as mock_writer:
-                    crawler._save_to_csv()
+    with patch('src.crawler.base.logger') as mock_logger:
+        crawler._save_output()
+
+    [csv_file] = (tmp_path / 'cdn').iterdir()
+    assert csv_file.name.endswith('_yahoo_finance_crawler_Brazil.csv')
+    header, row = csv_file.read_text(encoding='utf-8').splitlines()
+    assert header.startswith('"symbol","name","price","change",')
+    assert row.startswith('"A","B","10.0","",')
+    mock_logger.info.assert_called_with(f'Saved to {csv_file}')
+
+
+def test_save_output_ndjson(crawler, tmp_path):
+    crawler.output = 'ndjson'
+    crawler.output_dir = str(tmp_path)
+    crawler.data.add({'symbol': 'A', 'name': 'B', 'price': '1,000.50'})
+
+    crawler._save_output()
+
+    [ndjson_file] = tmp_path.iterdir()
+    assert ndjson_file.suffix == '.ndjson'
+    assert '"price": 1000.5' in ndjson_file.read_text()
 
-                    mock_makedirs.assert_called_with('cdn')
-                    assert mock_open.called
-                    mock_writer.return_value.writeheader.assert_called_once()
-                    mock_writer.return_value.writerows.assert_called_with(
-                        crawler.data
-                    )
 
+def test_unknown_output(mock_driver):
+    with pytest.raises(ValueError, match='Unknown output'):
+        YahooFinanceCrawler(
+            region='Brazil', base_url='http://test.url', output='xml'
+        )
+
+
+def test_delta_needs_a_snapshot_file_output(mock_driver):
+    with pytest.raises(ValueError, match='Delta mode compares'):
+        YahooFinanceCrawler(
+            region='Brazil',
+            base_url='http://test.url',
+            output='sqlite',
+            delta=True,
+        )
+
+
+def test_retries_are_attempts_after_the_first(mock_driver):
+    crawler = YahooFinanceCrawler(
+        region='Brazil', base_url='http://test.url', retries=2
+    )
+    crawler.retrier.sleep = lambda seconds: None
+    navigate = MagicMock(side_effect=TimeoutException('slow'))
+
+    with pytest.raises(TimeoutException):
+        crawler.retrier.call('navigate', navigate)
 
-def test_save_to_csv_no_data(crawler):
+    assert navigate.call_count == 1 + 2
+
+
+def test_save_output_no_data(crawler):
     crawler.data = []
 
     with patch('builtins.open', new_callable=MagicMock) as mock_open:
-        with patch('src.crawler.core.logger') as mock_logger:
-            crawler._save_to_csv()
+        with patch('src.crawler.base.logger') as mock_logger:
+            crawler._save_output()
 
             mock_logger.warning.assert_called_with('No data to save.')
             mock_open.assert_not_called()
@@ -210,6 +271,9 @@ def test_set_rows_per_page_to_100(crawler):
                 'Selected 100 rows per page via JS.'
             )
             mock_logger.info.assert_any_call('Table updated to 100 rows.')
+            crawler.waiter.wait_for_change.assert_called_once_with(
+                crawler.waiter.snapshot.return_value, 'rows per page'
+            )
 
 
 def test_set_rows_per_page_to_100_exception(crawler):
@@ -241,20 +305,26 @@ def test_scrape_all_pages(crawler):
         crawler.driver.execute_script.assert_called_once_with(
             'arguments[0].click();', mock_next_btn
         )
+        crawler.waiter.wait_for_change.assert_called_once_with(
+            crawler.waiter.snapshot.return_value, 'page 2'
+        )
 
 
 def test_scrape_all_pages_pagination_exception(crawler):
+    EXPECTED_RETRIES = 2
     crawler.driver.find_elements.side_effect = Exception(
         'Simulated pagination error'
     )
 
     with patch.object(crawler, '_extract_current_page'):
         with patch('src.crawler.core.logger') as mock_logger:
-            crawler._scrape_all_pages()
+            with pytest.raises(Exception, match='Simulated pagination'):
+                crawler._scrape_all_pages()
 
             mock_logger.error.assert_called_with(
                 'Pagination stopped: Simulated pagination error'
             )
+    assert crawler.retrier.outcomes['next_page'].retries == EXPECTED_RETRIES
 
 
 def test_scrape_all_pages_no_next_button(crawler):
@@ -273,6 +343,8 @@ def test_scrape_all_pages_no_next_button(crawler):
 
 def test_extract_current_page(crawler):
     EXPECTED_DATA = 2
+    EXPECTED_PRICE = 1234.56
+    EXPECTED_OTHER_PRICE = 50.0
 
     html_content = """
     <html>
@@ -303,7 +375,7 @@ def test_extract_current_page(crawler):
     """
 
     crawler.driver.page_source = html_content
-    crawler.data = []
+    crawler.data.clear()
 
     with patch('src.crawler.core.WebDriverWait'):
         with patch('src.crawler.core.logger') as mock_logger:
@@ -312,10 +384,10 @@ def test_extract_current_page(crawler):
             assert len(crawler.data) == EXPECTED_DATA
             assert crawler.data[0]['symbol'] == 'TEST.SA'
             assert crawler.data[0]['name'] == 'Test Company'
-            assert crawler.data[0]['price'] == '1234.56'
+            assert crawler.data[0]['price'] == EXPECTED_PRICE
 
             assert crawler.data[1]['symbol'] == 'NEW.SA'
-            assert crawler.data[1]['price'] == '50.00'
+            assert crawler.data[1]['price'] == EXPECTED_OTHER_PRICE
 
             mock_logger.info.assert_called_with('Extracted 2 new rows.')
 
@@ -350,3 +422,690 @@ def test_extract_current_page_no_thead(crawler):
 
     assert len(crawler.data) == 1
     assert crawler.data[0]['symbol'] == 'TEST3'
+
+
+def test_extract_current_page_skips_duplicates(crawler):
+    html = """
+    <table>
+        <thead>
+            <tr><th>Symbol</th><th>Name</th><th>Price</th></tr>
+        </thead>
+        <tbody>
+            <tr><td>DUP3</td><td>Dup Corp</td><td>10.00</td></tr>
+            <tr><td>DUP3</td><td>Dup Corp</td><td>11.00</td></tr>
+        </tbody>
+    </table>
+    """
+    crawler.driver.page_source = html
+
+    with patch('src.crawler.core.WebDriverWait'):
+        with patch('src.crawler.core.logger') as mock_logger:
+            crawler._extract_current_page()
+
+            mock_logger.info.assert_called_with('Extracted 1 new rows.')
+
+    EXPECTED_PRICE = 10.0
+    assert len(crawler.data) == 1
+    assert crawler.data[0]['price'] == EXPECTED_PRICE
+
+
+def test_extract_current_page_fragment_mode(crawler):
+    crawler.extract_mode = 'fragment'
+    crawler.driver.execute_script.return_value = """
+    <table>
+        <thead>
+            <tr><th>Symbol</th><th>Name</th><th>Price</th></tr>
+        </thead>
+        <tbody>
+            <tr><td>FRAG3</td><td>Fragment Corp</td><td>2,000.00</td></tr>
+        </tbody>
+    </table>
+    """
+
+    with patch('src.crawler.core.WebDriverWait'):
+        crawler._extract_current_page()
+
+    assert [
+        (row['symbol'], row['name'], row['price']) for row in crawler.data
+    ] == [('FRAG3', 'Fragment Corp', 2000.0)]
+
+
+def test_extract_current_page_cells_mode(crawler):
+    crawler.extract_mode = 'cells'
+    crawler.driver.execute_script.return_value = {
+        'headers': ['Name', 'Symbol', 'Price (Intraday)'],
+        'rows': [['Cells Corp', 'CELL3', '12.50']],
+    }
+
+    with patch('src.crawler.core.WebDriverWait'):
+        crawler._extract_current_page()
+
+    assert [
+        (row['symbol'], row['name'], row['price']) for row in crawler.data
+    ] == [('CELL3', 'Cells Corp', 12.5)]
+
+
+def test_extract_current_page_fragment_falls_back_to_page_source(crawler):
+    crawler.extract_mode = 'fragment'
+    crawler.driver.execute_script.return_value = None
+    crawler.driver.page_source = """
+    <table>
+        <tr><th>Symbol</th><th>Name</th><th>Price</th></tr>
+        <tr><td>PAGE3</td><td>Page Corp</td><td>1.00</td></tr>
+    </table>
+    """
+
+    with patch('src.crawler.core.WebDriverWait'):
+        crawler._extract_current_page()
+
+    assert crawler.data[0]['symbol'] == 'PAGE3'
+
+
+def test_unknown_extract_mode(mock_driver):
+    with pytest.raises(ValueError, match='Unknown extract mode'):
+        YahooFinanceCrawler(
+            region='Brazil', base_url='http://test.url', extract_mode='dom'
+        )
+
+
+def test_count_pages(crawler):
+    EXPECTED_PAGES = 24
+    crawler.page_size = 100
+    crawler.driver.execute_script.return_value = '1-100 of 2,345 results'
+
+    assert crawler._count_pages() == EXPECTED_PAGES
+
+
+def test_count_pages_without_label(crawler):
+    crawler.driver.execute_script.return_value = None
+
+    assert crawler._count_pages() is None
+
+
+def test_page_url(crawler):
+    crawler.page_size = 100
+
+    url = crawler._page_url(3, 'http://test.url/screener/abc?lang=en-US')
+
+    assert url == 'http://test.url/screener/abc?lang=en-US&start=200&count=100'
+
+
+def test_scrape_all_pages_in_tabs(crawler):
+    EXPECTED_EXTRACTIONS = 5
+    crawler.tabs = 3
+    crawler.driver.current_url = 'http://test.url/screener'
+    crawler.driver.current_window_handle = 'tab-1'
+    crawler.driver.execute_script.side_effect = lambda script, *args: (
+        '1-25 of 110' if script == PAGINATION_LABEL_SCRIPT else True
+    )
+    new_handles = iter(['tab-2', 'tab-3'])
+
+    def new_window(kind):
+        crawler.driver.current_window_handle = next(new_handles)
+
+    crawler.driver.switch_to.new_window.side_effect = new_window
+    visited = []
+    crawler.driver.switch_to.window.side_effect = visited.append
+    crawler.driver.execute_cdp_cmd.reset_mock()
+
+    with (
+        patch.object(crawler, '_extract_current_page') as mock_extract,
+        patch.object(crawler, '_region_selected', return_value=True),
+        patch('src.crawler.core.WebDriverWait'),
+    ):
+        crawler._scrape_all_pages()
+
+    assert mock_extract.call_count == EXPECTED_EXTRACTIONS
+    navigations = [
+        call.args[1]
+        for call in crawler.driver.execute_script.call_args_list
+        if call.args[0] == NAVIGATE_SCRIPT
+    ]
+    assert [url.split('start=')[1] for url in navigations] == [
+        '25&count=25',
+        '50&count=25',
+        '75&count=25',
+        '100&count=25',
+    ]
+    # Both new tabs block the same URLs as the first one
+    blocked = [
+        command.args[1]['urls']
+        for command in crawler.driver.execute_cdp_cmd.call_args_list
+        if command.args[0] == 'Network.setBlockedURLs'
+    ]
+    assert blocked == [BLOCKING_PROFILES[DEFAULT_PROFILE].blocked_urls()] * 2
+    # Pages 2-4 start loading in the three tabs, page 5 reuses the first
+    # tab as soon as page 2 was read, then the extra tabs are closed.
+    assert visited == [
+        *['tab-1', 'tab-2', 'tab-3'],
+        *['tab-1', 'tab-1'],
+        *['tab-2', 'tab-3', 'tab-1'],
+        *['tab-2', 'tab-3', 'tab-1'],
+    ]
+    assert crawler.driver.close.call_count == len(['tab-2', 'tab-3'])
+
+
+def test_tab_that_lost_the_filter_is_filtered_again(crawler):
+    EXPECTED_PAGE = 3
+    crawler.driver.current_window_handle = 'tab-1'
+
+    with (
+        patch.object(crawler, '_region_selected', return_value=False),
+        patch.object(crawler, '_restore_filter') as mock_restore,
+        patch.object(crawler, '_extract_current_page') as mock_extract,
+        patch('src.crawler.core.WebDriverWait'),
+    ):
+        crawler._extract_tab(EXPECTED_PAGE)
+
+    # The rows are read only once the tab shows the region again
+    mock_restore.assert_called_once_with(EXPECTED_PAGE)
+    mock_extract.assert_called_once()
+
+
+def test_start_page_that_lost_the_filter_is_filtered_again(crawler):
+    EXPECTED_PAGE = 3
+    crawler.start_page = EXPECTED_PAGE
+    crawler.driver.current_url = 'http://test.url/screener'
+
+    with (
+        patch.object(crawler, '_region_selected', return_value=False),
+        patch.object(crawler, '_restore_filter') as mock_restore,
+    ):
+        crawler._open_start_page()
+
+    mock_restore.assert_called_once_with(EXPECTED_PAGE)
+
+
+def test_scrape_all_pages_in_tabs_falls_back_without_page_count(crawler):
+    crawler.tabs = 3
+    crawler.driver.execute_script.return_value = None
+    crawler.driver.find_elements.return_value = []
+
+    with patch.object(crawler, '_extract_current_page') as mock_extract:
+        with patch('src.crawler.core.logger') as mock_logger:
+            crawler._scrape_all_pages()
+
+            mock_logger.warning.assert_called_with(
+                'Could not read the number of pages. Scraping sequentially.'
+            )
+    assert mock_extract.call_count == 1
+    crawler.driver.switch_to.new_window.assert_not_called()
+
+
+def test_store_parsed_keeps_the_page_order(crawler):
+    first, second = Future(), Future()
+    second.set_result(((HEADERS, [['PETR4', 'Petrobras', '38.5']]), 0.1))
+    pending = deque([
+        CapturedPage(1, None, crawler.metrics.end_page(1), first),
+        CapturedPage(2, None, crawler.metrics.end_page(2), second),
+    ])
+
+    crawler._store_parsed(pending)
+
+    # page 2 is parsed, but page 1 is not: nothing is stored yet
+    assert len(pending) == EXPECTED_PENDING_PAGES
+    assert not list(crawler.data)
+
+    first.set_result(((HEADERS, [['VALE3', 'Vale', '61.2']]), 0.1))
+    crawler._store_parsed(pending)
+
+    assert not pending
+    assert [row['symbol'] for row in crawler.data] == ['VALE3', 'PETR4']
+    assert [page.rows for page in crawler.metrics.pages] == [1, 1]
+
+
+def test_drain_parsed_logs_parse_failures(crawler):
+    stored, failed, dropped = Future(), Future(), Future()
+    stored.set_result(((HEADERS, [['VALE3', 'Vale', '61.2']]), 0.1))
+    failed.set_exception(ValueError('bad table'))
+    dropped.set_result(((HEADERS, [['PETR4', 'Petrobras', '38.5']]), 0.1))
+    pending = deque(
+        CapturedPage(page_num, None, crawler.metrics.end_page(page_num), page)
+        for page_num, page in enumerate([stored, failed, dropped], start=1)
+    )
+
+    with patch('src.crawler.core.logger') as mock_logger:
+        crawler._drain_parsed(pending)
+
+    assert not pending
+    assert [row['symbol'] for row in crawler.data] == ['VALE3']
+    mock_logger.error.assert_called_once_with(
+        'Could not parse a captured page (bad table); dropping it and the '
+        '1 pages after it.'
+    )
+
+
+def test_pipelined_failure_raises_the_error_that_stopped_it(crawler):
+    crawler.parse_workers = 2
+    parsed = Future()
+    executor = MagicMock()
+    executor.__enter__.return_value.submit.return_value = parsed
+
+    def stop_paginating(*args):
+        # The page is still being parsed when pagination fails, and the
+        # parse fails as well
+        parsed.set_exception(ValueError('bad table'))
+        raise RuntimeError('pagination')
+
+    with (
+        patch('src.crawler.core.ProcessPoolExecutor', return_value=executor),
+        patch.object(crawler, '_capture_html', return_value='<table/>'),
+        patch.object(crawler, '_restart_worn_out_driver', return_value=False),
+        patch.object(crawler, '_go_to_next_page', side_effect=stop_paginating),
+        patch.object(crawler.retrier, 'call', lambda name, f, **kw: f()),
+        pytest.raises(RuntimeError, match='pagination'),
+    ):
+        crawler._scrape_pipelined()
+
+
+def test_pipelined_scraping_skips_cells_mode(crawler):
+    crawler.parse_workers = 2
+    crawler.extract_mode = 'cells'
+    crawler.driver.find_elements.return_value = []
+
+    with (
+        patch.object(crawler, '_scrape_pipelined') as mock_pipelined,
+        patch.object(crawler, '_extract_current_page') as mock_extract,
+    ):
+        crawler._scrape_all_pages()
+
+    mock_pipelined.assert_not_called()
+    assert mock_extract.call_count == 1
+
+
+def test_streaming_writes_pages_as_they_are_extracted(mock_driver, tmp_path):
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        stream=True,
+        output_dir=str(tmp_path),
+    )
+    crawler.sink.buffer_size = 1
+    crawler.driver.execute_script.return_value = {
+        'headers': ['symbol', 'name', 'price'],
+        'rows': [['A', 'Alpha', '1.00'], ['B', 'Beta', '2.00']],
+    }
+    crawler.extract_mode = 'cells'
+
+    with patch('src.crawler.core.WebDriverWait'):
+        crawler._extract_current_page()
+
+    [part_file] = tmp_path.iterdir()
+    assert part_file.name.endswith('.csv.part')
+    assert len(part_file.read_text().splitlines()) == len(['header', 'A', 'B'])
+    # Only the symbol index is kept in memory
+    assert len(crawler.data) == len(['A', 'B'])
+    assert list(crawler.data) == []
+
+    crawler._save_output()
+
+    [csv_file] = tmp_path.iterdir()
+    assert csv_file.name.endswith('_yahoo_finance_crawler_Brazil.csv')
+
+
+@pytest.mark.parametrize('conflict_policy', [KEEP_LAST, FLAG_CHANGED])
+def test_streaming_rejects_replacing_rows(mock_driver, conflict_policy):
+    with pytest.raises(ValueError, match='Streaming keeps the first row'):
+        YahooFinanceCrawler(
+            region='Brazil',
+            base_url='http://test.url',
+            stream=True,
+            conflict_policy=conflict_policy,
+        )
+
+
+def test_streaming_run_failure_keeps_partial_file(mock_driver, tmp_path):
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        stream=True,
+        output_dir=str(tmp_path),
+    )
+    crawler.sink.write([{'symbol': 'A', 'name': 'Alpha', 'price': '1.00'}])
+
+    with (
+        patch.object(crawler, '_apply_region_filter'),
+        patch.object(crawler, '_set_rows_per_page_to_100'),
+        patch.object(
+            crawler, '_scrape_all_pages', side_effect=RuntimeError('boom')
+        ),
+        pytest.raises(RuntimeError, match='boom'),
+    ):
+        crawler.run()
+
+    [part_file] = tmp_path.iterdir()
+    assert part_file.name.endswith('.csv.part')
+    assert '"A","Alpha","1.00"' in part_file.read_text()
+
+
+def test_delta_mode_writes_only_changes(mock_driver, tmp_path):
+    (tmp_path / '100_yahoo_finance_crawler_Brazil.csv').write_text(
+        'symbol,name,price\nA,Alpha,1.00\nB,Beta,2.00\n'
+    )
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        output_dir=str(tmp_path),
+        delta=True,
+    )
+
+    crawler._store_rows([
+        {'symbol': 'A', 'name': 'Alpha', 'price': 1.0},
+        {'symbol': 'C', 'name': 'Gamma', 'price': 3.0},
+    ])
+    crawler._save_output()
+
+    [delta_file] = tmp_path.glob('*.delta.csv')
+    with delta_file.open(newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [(row['symbol'], row['price'], row['delta']) for row in rows] == [
+        ('C', '3.0', 'added'),
+        ('B', '2.0', 'removed'),
+    ]
+    assert len(list(tmp_path.glob('*_Brazil.csv'))) == 1
+
+
+def test_delta_mode_without_previous_snapshot(mock_driver, tmp_path):
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        output_dir=str(tmp_path),
+        delta=True,
+    )
+
+    assert crawler.delta is None
+
+
+def test_delta_mode_stops_early(crawler):
+    crawler.delta = MagicMock()
+    crawler.delta.should_stop.return_value = True
+
+    with patch.object(crawler, '_extract_current_page') as mock_extract:
+        crawler._scrape_all_pages()
+
+    mock_extract.assert_called_once()
+    crawler.driver.find_elements.assert_not_called()
+
+
+def test_checkpoint_written_after_each_page(mock_driver, tmp_path):
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        output_dir=str(tmp_path),
+        checkpoint=True,
+    )
+    crawler.waiter = MagicMock()
+    crawler.driver.current_url = 'http://test.url/screener'
+    crawler.driver.find_elements.return_value = []
+
+    def extract():
+        crawler._store_rows([{'symbol': 'A', 'name': 'Alpha', 'price': '1'}])
+
+    with patch.object(crawler, '_extract_current_page', side_effect=extract):
+        crawler._scrape_all_pages()
+
+    checkpoint = crawler.checkpoints.load()
+    assert checkpoint.page == 1
+    assert checkpoint.page_size == DEFAULT_PAGE_SIZE
+    assert checkpoint.url == 'http://test.url/screener'
+    assert checkpoint.rows == [{'symbol': 'A', 'name': 'Alpha', 'price': '1'}]
+
+
+def test_new_run_starts_a_new_checkpoint(mock_driver, tmp_path):
+    mock_driver.current_url = 'http://test.url/screener'
+
+    def interrupted_run(symbol):
+        crawler = YahooFinanceCrawler(
+            region='Brazil',
+            base_url='http://test.url',
+            output_dir=str(tmp_path),
+            checkpoint=True,
+        )
+        crawler._store_rows([{'symbol': symbol, 'name': symbol}])
+        crawler._page_done(1)
+
+    interrupted_run('OLD')
+    interrupted_run('NEW')
+
+    checkpoint = CheckpointStore('Brazil', str(tmp_path)).load()
+    assert checkpoint.rows == [{'symbol': 'NEW', 'name': 'NEW'}]
+
+
+def test_resume_jumps_to_the_next_page(mock_driver, tmp_path):
+    EXPECTED_START_PAGE = 4
+    store = CheckpointStore('Brazil', str(tmp_path))
+    store.append_rows([{'symbol': 'A', 'name': 'Alpha', 'price': '1'}])
+    store.mark_page(3, 100, 'http://test.url/screener?lang=en')
+
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        output_dir=str(tmp_path),
+        resume=True,
+    )
+    crawler.waiter = MagicMock()
+
+    with (
+        patch.object(crawler, '_apply_region_filter'),
+        patch.object(crawler, '_region_selected', return_value=True),
+        patch.object(crawler, '_set_rows_per_page_to_100'),
+        patch.object(crawler, '_scrape_all_pages') as mock_scrape,
+        patch.object(crawler, '_save_output'),
+    ):
+        crawler.run()
+
+    crawler.driver.get.assert_called_with(
+        'http://test.url/screener?lang=en&start=300&count=100'
+    )
+    mock_scrape.assert_called_once()
+    assert crawler.start_page == EXPECTED_START_PAGE
+    assert list(crawler.data) == [
+        {'symbol': 'A', 'name': 'Alpha', 'price': '1'}
+    ]
+    # A successful run removes the checkpoint
+    assert store.load() is None
+
+
+def test_resume_without_checkpoint(mock_driver, tmp_path):
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        output_dir=str(tmp_path),
+        resume=True,
+    )
+
+    assert crawler._restore_checkpoint() is None
+    assert crawler.start_page == 1
+
+
+def test_page_weight_measured_after_each_page(mock_driver):
+    EXPECTED_BYTES = 2048
+    crawler = YahooFinanceCrawler(
+        region='Brazil', base_url='http://test.url', measure_weight=True
+    )
+    crawler.driver.execute_script.return_value = {
+        'origin': 1.0,
+        'requests': 12,
+        'bytes': EXPECTED_BYTES,
+    }
+
+    crawler._page_done(1)
+
+    [weight] = crawler.page_weights.pages
+    assert weight.page == 1
+    assert weight.bytes == EXPECTED_BYTES
+
+
+def test_run_exports_metrics(mock_driver, tmp_path):
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        metrics=True,
+        output_dir=str(tmp_path),
+    )
+    crawler.waiter = MagicMock()
+
+    with (
+        patch.object(crawler, '_apply_region_filter'),
+        patch.object(crawler, '_set_rows_per_page_to_100'),
+        patch.object(crawler, '_scrape_all_pages'),
+        patch.object(crawler, '_save_output'),
+    ):
+        crawler.run()
+
+    assert crawler.metrics.status == 'ok'
+    assert set(crawler.metrics.phases) >= {
+        'driver_startup',
+        'region_filter',
+        'scrape',
+        'save',
+    }
+    assert (tmp_path / 'metrics' / 'Brazil.prom').exists()
+
+
+def test_run_retries_region_filter_after_reloading(crawler):
+    EXPECTED_LOADS = 2
+    with (
+        patch.object(
+            crawler,
+            '_apply_region_filter',
+            side_effect=[Exception('Filter menu closed'), None],
+        ) as mock_apply,
+        patch.object(crawler, '_set_rows_per_page_to_100'),
+        patch.object(crawler, '_scrape_all_pages'),
+        patch.object(crawler, '_save_output'),
+        patch('src.crawler.core.dismiss_initial_popup'),
+    ):
+        crawler.run()
+
+    assert mock_apply.call_count == EXPECTED_LOADS
+    assert crawler.driver.get.call_count == EXPECTED_LOADS
+    report = crawler.metrics.report()
+    assert report['retries'] == 1
+    assert report['page_size'] == DEFAULT_PAGE_SIZE
+
+
+def test_run_aborts_region_when_circuit_opens(mock_driver):
+    crawler = YahooFinanceCrawler(
+        region='Brazil', base_url='http://test.url', failure_threshold=2
+    )
+    crawler.retrier.sleep = lambda seconds: None
+    mock_driver.get.side_effect = Exception('Site down')
+
+    with pytest.raises(CircuitOpenError):
+        crawler.run()
+
+    assert mock_driver.get.call_count == 2  # noqa: PLR2004
+    assert crawler.metrics.report()['circuit_open'] is True
+    mock_driver.quit.assert_called_once()
+
+
+def test_rows_per_page_fallback_is_reported(crawler):
+    with patch.object(
+        crawler,
+        '_change_rows_per_page',
+        side_effect=Exception('Dropdown not found'),
+    ):
+        crawler._set_rows_per_page_to_100()
+
+    assert crawler.page_size == DEFAULT_PAGE_SIZE
+    assert crawler.retrier.report()['fallbacks'] == 1
+
+
+def test_next_page_retry_does_not_click_twice(crawler):
+    mock_next_btn = MagicMock()
+    mock_next_btn.is_enabled.return_value = True
+    mock_next_btn.get_attribute.return_value = None
+    crawler.driver.find_elements.return_value = [mock_next_btn]
+    crawler.waiter.wait_for_change.return_value = MagicMock(reason='timeout')
+    # the click went through, but only after the wait gave up
+    crawler.waiter.snapshot.side_effect = [
+        MagicMock(label='1-25 of 100'),
+        MagicMock(label='26-50 of 100'),
+    ]
+    first_state = []
+
+    moved = crawler.retrier.call(
+        'next_page', lambda: crawler._go_to_next_page(2, first_state)
+    )
+
+    assert moved is True
+    crawler.driver.execute_script.assert_called_once_with(
+        'arguments[0].click();', mock_next_btn
+    )
+    assert crawler.retrier.outcomes['next_page'].retries == 1
+
+
+def test_run_uses_cached_filter_url(mock_driver, tmp_path):
+    cached_url = 'http://test.url/screener/brazil'
+    FilterCache(str(tmp_path)).put('Brazil', cached_url)
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        output_dir=str(tmp_path),
+        filter_cache=True,
+    )
+    crawler.waiter = MagicMock()
+
+    with (
+        patch.object(crawler, '_region_selected', return_value=True),
+        patch.object(crawler, '_apply_region_filter') as mock_apply,
+        patch.object(crawler, '_set_rows_per_page_to_100'),
+        patch.object(crawler, '_scrape_all_pages'),
+        patch.object(crawler, '_save_output'),
+        patch('src.crawler.core.dismiss_initial_popup'),
+    ):
+        crawler.run()
+
+    mock_driver.get.assert_called_once_with(cached_url)
+    mock_apply.assert_not_called()
+    assert 'region_filter' not in crawler.metrics.phases
+
+
+def test_run_falls_back_when_cached_filter_is_wrong(mock_driver, tmp_path):
+    cache = FilterCache(str(tmp_path))
+    cache.put('Brazil', 'http://test.url/screener/stale')
+    mock_driver.current_url = 'http://test.url/screener/brazil'
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url='http://test.url',
+        output_dir=str(tmp_path),
+        filter_cache=True,
+    )
+    crawler.waiter = MagicMock()
+
+    with (
+        patch.object(crawler, '_region_selected', return_value=False),
+        patch.object(crawler, '_apply_region_filter') as mock_apply,
+        patch.object(crawler, '_set_rows_per_page_to_100'),
+        patch.object(crawler, '_scrape_all_pages'),
+        patch.object(crawler, '_save_output'),
+        patch('src.crawler.core.dismiss_initial_popup'),
+    ):
+        crawler.run()
+
+    mock_driver.get.assert_called_with('http://test.url')
+    mock_apply.assert_called_once()
+    # The URL seen after the menu flow replaces the stale one
+    assert cache.get('Brazil') == 'http://test.url/screener/brazil'
+
+
+def test_filter_url_not_cached_when_it_is_the_base_url(crawler, tmp_path):
+    crawler.filter_cache = FilterCache(str(tmp_path))
+    crawler.driver.current_url = 'http://test.url/'
+
+    crawler._learn_filter_url()
+
+    assert crawler.filter_cache.get('Brazil') is None
+
+
+def test_region_selected(crawler):
+    with patch('src.crawler.core.WebDriverWait') as mock_wait:
+        mock_wait.return_value.until.return_value.text = 'Region: Brazil'
+        assert crawler._region_selected()
+
+        mock_wait.return_value.until.return_value.text = 'Region: Chile'
+        assert not crawler._region_selected()
+
+        mock_wait.return_value.until.side_effect = TimeoutException()
+        assert not crawler._region_selected()
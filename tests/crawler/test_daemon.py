@@ -0,0 +1,137 @@
+import socketserver
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.crawler.client import submit
+from src.crawler.daemon import CrawlerDaemon
+
+EXPECTED_ROWS = 3
+EXPECTED_TABS = 2
+
+
+@pytest.fixture
+def mock_create_driver():
+    with (
+        patch('src.crawler.daemon.create_driver') as mock_create,
+        patch('src.crawler.daemon.dismiss_initial_popup'),
+    ):
+        mock_create.side_effect = lambda headless, block_profile: MagicMock()
+        yield mock_create
+
+
+@pytest.fixture
+def mock_crawler_class():
+    with patch('src.crawler.daemon.YahooFinanceCrawler') as mock_class:
+        mock_class.return_value.data = ['row'] * EXPECTED_ROWS
+        yield mock_class
+
+
+def test_run_job_reuses_warm_session(mock_create_driver, mock_crawler_class):
+    daemon = CrawlerDaemon('http://mock.url', sessions=1, recycle_after=10)
+    daemon.warm_up()
+
+    first = daemon.run_job({'region': 'Brazil', 'options': {'tabs': 2}})
+    second = daemon.run_job({'region': 'Chile'})
+
+    assert first['ok']
+    assert first['rows'] == EXPECTED_ROWS
+    assert second['ok']
+    mock_create_driver.assert_called_once_with(True, 'default')
+    drivers = {
+        call.kwargs['driver'] for call in mock_crawler_class.call_args_list
+    }
+    assert len(drivers) == 1
+    assert mock_crawler_class.call_args_list[0].kwargs['tabs'] == EXPECTED_TABS
+
+
+def test_run_job_ignores_browser_options(
+    mock_create_driver, mock_crawler_class
+):
+    daemon = CrawlerDaemon('http://mock.url', block_profile='strict')
+    daemon.warm_up()
+
+    daemon.run_job({
+        'region': 'Brazil',
+        'options': {'headless': False, 'block_profile': 'off'},
+    })
+
+    assert 'headless' not in mock_crawler_class.call_args.kwargs
+    assert 'block_profile' not in mock_crawler_class.call_args.kwargs
+    mock_create_driver.assert_called_once_with(True, 'strict')
+
+
+def test_session_recycled_after_max_jobs(
+    mock_create_driver, mock_crawler_class
+):
+    daemon = CrawlerDaemon('http://mock.url', sessions=1, recycle_after=2)
+    daemon.warm_up()
+
+    for _ in range(2):
+        daemon.run_job({'region': 'Brazil'})
+
+    expected_drivers = 2
+    assert mock_create_driver.call_count == expected_drivers
+    first_driver = mock_crawler_class.call_args_list[0].kwargs['driver']
+    first_driver.quit.assert_called_once()
+
+
+def test_session_recycled_after_failure(
+    mock_create_driver, mock_crawler_class
+):
+    mock_crawler_class.return_value.run.side_effect = RuntimeError('boom')
+    daemon = CrawlerDaemon('http://mock.url', sessions=1, recycle_after=10)
+    daemon.warm_up()
+
+    result = daemon.run_job({'region': 'Brazil'})
+
+    assert not result['ok']
+    assert result['error'] == 'RuntimeError: boom'
+    expected_drivers = 2
+    assert mock_create_driver.call_count == expected_drivers
+
+
+def test_run_job_without_available_session(mock_crawler_class):
+    with patch(
+        'src.crawler.daemon.create_driver', side_effect=RuntimeError('no')
+    ):
+        daemon = CrawlerDaemon('http://mock.url')
+        daemon.warm_up()
+        result = daemon.run_job({'region': 'Brazil'})
+
+    assert not result['ok']
+    assert result['error'] == 'No browser session available.'
+    mock_crawler_class.assert_not_called()
+
+
+def test_run_job_requires_region(mock_create_driver, mock_crawler_class):
+    daemon = CrawlerDaemon('http://mock.url')
+
+    assert not daemon.run_job({'options': {}})['ok']
+    mock_create_driver.assert_not_called()
+
+
+def test_serve_and_submit(mock_create_driver, mock_crawler_class):
+    daemon = CrawlerDaemon('http://mock.url', port=0)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    try:
+        while not daemon.port:
+            threading.Event().wait(0.01)
+
+        result = submit({'region': 'Brazil'}, port=daemon.port, timeout=5)
+        status = submit({'command': 'status'}, port=daemon.port, timeout=5)
+        unknown = submit({'command': 'nope'}, port=daemon.port, timeout=5)
+    finally:
+        daemon.shutdown()
+        thread.join(timeout=5)
+
+    assert result['ok']
+    assert result['rows'] == EXPECTED_ROWS
+    assert status['jobs_done'] == 1
+    assert not unknown['ok']
+    mock_crawler_class.return_value.run.assert_called_once()
+    # Only the daemon's own server reuses the address
+    assert daemon.server.allow_reuse_address
+    assert not socketserver.ThreadingTCPServer.allow_reuse_address
@@ -0,0 +1,172 @@
+import csv
+import json
+from os import rename
+
+import pytest
+
+from src.crawler.delta import DeltaTracker, load_previous_state, write_delta
+from src.crawler.schema import FIELD_NAMES, Quote
+from src.crawler.sinks import create_sink
+
+
+def write_csv(file_path, rows, fieldnames=('symbol', 'name', 'price')):
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def row(symbol, price, name='Company'):
+    return {'symbol': symbol, 'name': name, 'price': price}
+
+
+@pytest.fixture
+def previous():
+    return {
+        'A': row('A', '1.00'),
+        'B': row('B', '2.00'),
+        'C': row('C', '3.00'),
+    }
+
+
+def test_load_previous_state_replays_deltas(tmp_path):
+    write_csv(
+        tmp_path / '100_yahoo_finance_crawler_United_States.csv',
+        [row('OLD', '9.00')],
+    )
+    write_csv(
+        tmp_path / '200_yahoo_finance_crawler_United_States.csv',
+        [row('A', '1.00'), row('B', '2.00')],
+    )
+    write_csv(
+        tmp_path / '150_yahoo_finance_crawler_United_States.delta.csv',
+        [{**row('X', '1.00'), 'delta': 'added'}],
+        ('symbol', 'name', 'price', 'delta'),
+    )
+    write_csv(
+        tmp_path / '300_yahoo_finance_crawler_United_States.delta.csv',
+        [
+            {**row('A', '1.50'), 'delta': 'changed'},
+            {**row('B', '2.00'), 'delta': 'removed'},
+            {**row('D', '4.00'), 'delta': 'added'},
+        ],
+        ('symbol', 'name', 'price', 'delta'),
+    )
+    write_csv(tmp_path / '400_yahoo_finance_crawler_Brazil.csv', [])
+
+    state = load_previous_state('United States', str(tmp_path))
+
+    # Numbers come back as floats, like freshly extracted rows
+    assert state == {'A': row('A', 1.5), 'D': row('D', 4.0)}
+
+
+def test_load_previous_state_without_snapshot(tmp_path):
+    assert load_previous_state('Brazil', str(tmp_path)) is None
+    assert load_previous_state('Brazil', str(tmp_path / 'missing')) is None
+
+
+def test_tracker_reports_added_changed_removed(previous):
+    tracker = DeltaTracker(previous)
+
+    tracker.observe([row('A', '1.00'), row('B', '2.50')])
+    tracker.observe([row('D', '4.00')])
+
+    assert tracker.delta_rows() == [
+        {**row('B', '2.50'), 'delta': 'changed'},
+        {**row('D', '4.00'), 'delta': 'added'},
+        {**row('C', '3.00'), 'delta': 'removed'},
+    ]
+
+
+def test_tracker_stops_after_unchanged_pages(previous):
+    tracker = DeltaTracker(previous, stop_after_unchanged_pages=2)
+
+    tracker.observe([row('A', '1.10')])
+    assert not tracker.should_stop()
+    tracker.observe([row('B', '2.00')])
+    assert not tracker.should_stop()
+    tracker.observe([])
+    assert tracker.should_stop()
+
+    # Symbols never reached are not reported as removed
+    assert tracker.delta_rows() == [{**row('A', '1.10'), 'delta': 'changed'}]
+
+
+def test_write_delta(previous, tmp_path):
+    tracker = DeltaTracker(previous)
+    tracker.observe([row('A', '1.10'), row('B', '2.00'), row('D', '4.00')])
+
+    delta_path = write_delta(tracker, 'Brazil', str(tmp_path))
+
+    assert delta_path.endswith('_yahoo_finance_crawler_Brazil.delta.csv')
+    with open(delta_path, newline='', encoding='utf-8') as f:
+        changes = [(r['symbol'], r['delta']) for r in csv.DictReader(f)]
+    assert changes == [('A', 'changed'), ('D', 'added'), ('C', 'removed')]
+
+    changelog_path = delta_path.replace('.delta.csv', '.changelog.json')
+    with open(changelog_path, encoding='utf-8') as f:
+        assert json.load(f) == {
+            'region': 'Brazil',
+            'added': ['D'],
+            'removed': ['C'],
+            'changed': [
+                {'symbol': 'A', 'old_price': '1.00', 'new_price': '1.10'}
+            ],
+            'stopped_early': False,
+        }
+    assert not list(tmp_path.glob('*.part'))
+
+
+def test_write_delta_without_changes(previous, tmp_path):
+    tracker = DeltaTracker(previous)
+    tracker.observe(previous.values())
+
+    assert write_delta(tracker, 'Brazil', str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize('output', ['csv', 'ndjson', 'parquet'])
+def test_delta_round_trip_keeps_the_price_change(tmp_path, output):
+    if output == 'parquet':
+        pytest.importorskip('pyarrow')
+    before = [
+        Quote(symbol='A', name='Alpha', price=1.0, change=0.1),
+        Quote(symbol='B', name='Beta', price=2.0, change=-0.2),
+    ]
+    sink = create_sink(output, 'Brazil', str(tmp_path))
+    sink.write(before)
+    # an older snapshot, as deltas written in the same second are skipped
+    rename(
+        sink.close(), tmp_path / f'100_yahoo_finance_crawler_Brazil.{output}'
+    )
+    tracker = DeltaTracker(
+        load_previous_state('Brazil', str(tmp_path), output)
+    )
+    tracker.observe([
+        Quote(symbol='A', name='Alpha', price=1.5, change=0.5),
+        Quote(symbol='C', name='Gamma', price=3.0, change=-0.3),
+    ])
+
+    delta_path = write_delta(tracker, 'Brazil', str(tmp_path))
+
+    with open(delta_path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f))
+    assert header == [*FIELD_NAMES, 'delta']
+    state = load_previous_state('Brazil', str(tmp_path), output)
+    assert sorted(state) == ['A', 'C']
+    assert state['A']['change'] == 0.5  # noqa: PLR2004
+    assert state['C']['change'] == -0.3  # noqa: PLR2004
+
+
+def test_load_previous_state_reads_old_delta_markers(tmp_path):
+    write_csv(
+        tmp_path / '100_yahoo_finance_crawler_Brazil.csv',
+        [row('A', '1.00'), row('B', '2.00')],
+    )
+    write_csv(
+        tmp_path / '200_yahoo_finance_crawler_Brazil.delta.csv',
+        [{**row('B', '2.00'), 'change': 'removed'}],
+        ('symbol', 'name', 'price', 'change'),
+    )
+
+    assert load_previous_state('Brazil', str(tmp_path)) == {'A': row('A', 1.0)}
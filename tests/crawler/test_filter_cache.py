@@ -0,0 +1,46 @@
+from src.crawler.filter_cache import FilterCache
+
+URL = 'https://finance.yahoo.com/research-hub/screener/abc123/'
+HOUR = 3600
+
+
+def test_put_and_get(tmp_path):
+    cache = FilterCache(str(tmp_path), clock=lambda: 1000.0)
+
+    cache.put('United States', URL)
+
+    assert cache.get('United States') == URL
+    assert (tmp_path / '.filters' / 'United_States.json').exists()
+
+
+def test_get_missing_region(tmp_path):
+    assert FilterCache(str(tmp_path)).get('Brazil') is None
+
+
+def test_entries_expire(tmp_path):
+    now = [0.0]
+    cache = FilterCache(str(tmp_path), ttl_hours=2, clock=lambda: now[0])
+    cache.put('Brazil', URL)
+
+    now[0] = 2 * HOUR - 1
+    assert cache.get('Brazil') == URL
+    now[0] = 2 * HOUR + 1
+    assert cache.get('Brazil') is None
+
+
+def test_invalidate(tmp_path):
+    cache = FilterCache(str(tmp_path))
+    cache.put('Brazil', URL)
+
+    cache.invalidate('Brazil')
+    cache.invalidate('Brazil')
+
+    assert cache.get('Brazil') is None
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = FilterCache(str(tmp_path))
+    cache.put('Brazil', URL)
+    (tmp_path / '.filters' / 'Brazil.json').write_text('{not json')
+
+    assert cache.get('Brazil') is None
@@ -0,0 +1,117 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.crawler import health
+from src.crawler.health import (
+    DriverHealth,
+    HealthLimits,
+    browser_rss,
+    process_tree_rss,
+)
+from src.crawler.metrics import PageMetrics
+
+PAGE_SIZE = 4096
+
+
+def page(load_seconds=1.0):
+    return PageMetrics(page=1, wait_seconds=load_seconds)
+
+
+def write_stat(proc, pid, ppid, rss_pages, name='chrome'):
+    (proc / str(pid)).mkdir()
+    # 21 fields between ppid and rss, as in /proc/<pid>/stat
+    fields = ['S', str(ppid), *['0'] * 19, str(rss_pages)]
+    (proc / str(pid) / 'stat').write_text(f'{pid} ({name}) {" ".join(fields)}')
+
+
+@pytest.fixture
+def proc(tmp_path):
+    write_stat(tmp_path, 1, 0, 1000, 'init')
+    write_stat(tmp_path, 10, 1, 100, 'chrome driver')
+    write_stat(tmp_path, 11, 10, 200)
+    write_stat(tmp_path, 12, 11, 300, 'chrome (renderer)')
+    write_stat(tmp_path, 20, 1, 5000, 'other')
+    (tmp_path / 'self').mkdir()
+    with (
+        patch.object(health, 'PROC_DIR', str(tmp_path)),
+        patch.object(
+            health.os, 'sysconf', return_value=PAGE_SIZE, create=True
+        ),
+    ):
+        yield tmp_path
+
+
+def test_process_tree_rss_sums_the_descendants(proc):
+    assert process_tree_rss(10) == (100 + 200 + 300) * PAGE_SIZE
+    assert process_tree_rss(12) == 300 * PAGE_SIZE
+    assert process_tree_rss(99) is None
+
+
+def test_process_tree_rss_without_sysconf(proc, monkeypatch):
+    # As on Windows, where os has no sysconf
+    monkeypatch.delattr(health.os, 'sysconf')
+
+    assert process_tree_rss(10) is None
+
+
+def test_browser_rss_reads_the_driver_service(proc):
+    driver = MagicMock()
+    driver.service.process.pid = 11
+
+    assert browser_rss(driver) == (200 + 300) * PAGE_SIZE
+    assert browser_rss(object()) is None
+
+
+def test_limits_are_off_by_default():
+    assert not HealthLimits().enabled
+    assert HealthLimits(max_error_rate=0.5).enabled
+
+
+def test_restart_after_pages():
+    monitor = DriverHealth(HealthLimits(restart_after_pages=3))
+
+    for _ in range(2):
+        monitor.record_page(page())
+    assert monitor.restart_reason() is None
+    monitor.record_page(page())
+    assert monitor.restart_reason() == '3 pages on the same browser'
+
+    monitor.reset()
+    assert monitor.restart_reason() is None
+
+
+def test_restart_on_browser_memory(proc):
+    driver = MagicMock()
+    driver.service.process.pid = 10
+    monitor = DriverHealth(HealthLimits(max_browser_mb=2))
+
+    assert monitor.restart_reason(driver) == 'browser using 2 MB'
+    monitor.limits = HealthLimits(max_browser_mb=3)
+    assert monitor.restart_reason(driver) is None
+
+
+def test_restart_when_pages_load_slower():
+    monitor = DriverHealth(HealthLimits(max_slowdown=3.0, window=2))
+
+    for load_seconds in (1.0, 1.0, 2.0):
+        monitor.record_page(page(load_seconds))
+    # a full window of recent pages is needed after the baseline
+    assert monitor.slowdown() is None
+    monitor.record_page(page(5.0))
+
+    assert monitor.slowdown() == pytest.approx(3.5)
+    assert monitor.restart_reason() == 'pages loading 3.5x slower'
+
+
+def test_restart_on_error_rate():
+    monitor = DriverHealth(HealthLimits(max_error_rate=0.5, window=4))
+
+    for failures in (0, 1, 0):
+        monitor.record_page(page(), failures)
+    assert monitor.error_rate() is None
+    monitor.record_page(page(), 2)
+    assert monitor.restart_reason() is None
+
+    monitor.record_page(page(), 1)
+    assert monitor.restart_reason() == '75% of the last pages needed retries'
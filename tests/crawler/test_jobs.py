@@ -0,0 +1,233 @@
+import csv
+from types import SimpleNamespace
+
+import pytest
+
+from src.crawler.jobs import (
+    DONE,
+    FAILED,
+    PENDING,
+    RUNNING,
+    JobQueue,
+    JobWorker,
+    merge_jobs,
+)
+from src.crawler.schema import Quote
+
+TOTAL_PAGES = 5
+PAGE_SIZE = 25
+LEASE_SECONDS = 60.0
+EXPECTED_ATTEMPTS = 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCrawler:
+    """Two rows per page; the last row of a page repeats on the next."""
+
+    def __init__(self, region, base_url, first_page=1, last_page=None, **kw):
+        self.options = kw
+        self.page_size = kw.get('page_size', PAGE_SIZE)
+        # `count_pages=False` plays a page without a pagination label
+        self.total_pages = TOTAL_PAGES if kw.get('count_pages', True) else None
+        last_page = min(last_page or TOTAL_PAGES, TOTAL_PAGES)
+        pages = range(first_page, last_page + 1)
+        self.metrics = SimpleNamespace(pages=list(pages))
+        self.data = [
+            Quote(symbol=symbol, price=float(page))
+            for page in pages
+            for symbol in (f'S{page}', f'S{page + 1}')
+        ]
+
+    def run(self):
+        if self.options.get('fail'):
+            raise RuntimeError('boom')
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(
+        str(tmp_path / 'jobs.sqlite'),
+        LEASE_SECONDS,
+        max_attempts=2,
+        clock=clock,
+    )
+
+
+def make_worker(queue, name='w1'):
+    return JobWorker(
+        queue,
+        'http://test.url',
+        worker=name,
+        crawler_class=FakeCrawler,
+        poll_interval=0,
+    )
+
+
+def test_claim_leases_the_oldest_job(queue):
+    queue.enqueue(['Brazil', 'Chile', 'Brazil'], options={'output': 'csv'})
+
+    first = queue.claim('w1')
+    second = queue.claim('w2')
+
+    assert (first.region, second.region) == ('Brazil', 'Chile')
+    assert first.status == RUNNING
+    assert first.attempts == 1
+    assert first.options == {'output': 'csv'}
+    assert queue.claim('w3') is None
+
+
+def test_expired_lease_goes_to_another_worker(queue, clock):
+    queue.enqueue(['Brazil'])
+    job = queue.claim('w1')
+
+    clock.now += LEASE_SECONDS + 1
+    retry = queue.claim('w2')
+
+    assert retry.id == job.id
+    assert retry.attempts == EXPECTED_ATTEMPTS
+    assert not queue.heartbeat(job, 'w1')
+    assert not queue.complete(job, 'w1', [Quote(symbol='A')])
+    assert queue.complete(retry, 'w2', [Quote(symbol='A')])
+
+
+def test_heartbeat_keeps_the_lease(queue, clock):
+    queue.enqueue(['Brazil'])
+    job = queue.claim('w1')
+
+    clock.now += LEASE_SECONDS - 1
+    assert queue.heartbeat(job, 'w1')
+    clock.now += LEASE_SECONDS - 1
+
+    assert queue.claim('w2') is None
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(queue, clock):
+    queue.enqueue(['Brazil'])
+    queue.claim('w1')
+    clock.now += LEASE_SECONDS + 1
+    queue.claim('w2')
+    clock.now += LEASE_SECONDS + 1
+
+    assert queue.claim('w3') is None
+    assert queue.counts() == {FAILED: 1}
+
+
+def test_failed_job_is_retried_then_given_up(queue):
+    queue.enqueue(['Brazil'])
+
+    queue.fail(queue.claim('w1'), 'w1', 'boom')
+    assert queue.counts() == {PENDING: 1}
+    queue.fail(queue.claim('w1'), 'w1', 'boom')
+
+    assert queue.counts() == {FAILED: 1}
+    assert not queue.has_work()
+
+
+def test_first_range_queues_the_rest_of_the_region(queue):
+    queue.enqueue(['Brazil'], pages_per_job=2)
+
+    job = queue.claim('w1')
+    queue.complete(job, 'w1', [], total_pages=TOTAL_PAGES)
+
+    ranges = []
+    while (job := queue.claim('w1')) is not None:
+        ranges.append((job.first_page, job.last_page))
+    assert ranges == [(3, 4), (5, None)]
+
+
+def test_first_range_of_unknown_length_queues_the_rest_as_one_job(queue):
+    queue.enqueue(['Brazil'], pages_per_job=2)
+
+    job = queue.claim('w1')
+    queue.complete(job, 'w1', [], total_pages=None)
+
+    rest = queue.claim('w1')
+    assert (rest.first_page, rest.last_page) == (3, None)
+    assert queue.claim('w1') is None
+
+
+def test_ranges_keep_the_page_size_of_the_first_one(queue):
+    queue.enqueue(['Brazil'], options={'output': 'csv'}, pages_per_job=2)
+
+    job = queue.claim('w1')
+    queue.complete(job, 'w1', [], total_pages=TOTAL_PAGES, page_size=PAGE_SIZE)
+
+    while (job := queue.claim('w1')) is not None:
+        assert job.options == {'output': 'csv', 'page_size': PAGE_SIZE}
+
+
+def test_short_first_range_without_page_count_is_the_whole_region(queue):
+    queue.enqueue(
+        ['Brazil'],
+        options={'count_pages': False},
+        pages_per_job=TOTAL_PAGES * 2,
+    )
+
+    make_worker(queue).run()
+
+    assert queue.counts() == {DONE: 1}
+
+
+def test_worker_without_page_count_still_crawls_every_page(queue, tmp_path):
+    queue.enqueue(['Brazil'], options={'count_pages': False}, pages_per_job=2)
+
+    make_worker(queue).run()
+    [result] = merge_jobs(queue, str(tmp_path))
+
+    # pages 1-2, then 3 to the end in one job
+    assert queue.counts() == {DONE: 2}
+    assert result.rows == TOTAL_PAGES + 1
+
+
+def test_worker_runs_every_job_and_merge_writes_snapshots(queue, tmp_path):
+    queue.enqueue(
+        ['Brazil', 'Chile'], options={'output': 'csv'}, pages_per_job=2
+    )
+
+    jobs_run = make_worker(queue).run()
+    results = merge_jobs(queue, str(tmp_path))
+
+    # Brazil and Chile are split in 3 jobs each: pages 1-2, 3-4 and 5
+    assert jobs_run == 6  # noqa: PLR2004
+    assert queue.counts() == {DONE: 6}
+    assert [(result.region, result.rows) for result in results] == [
+        ('Brazil', TOTAL_PAGES + 1),
+        ('Chile', TOTAL_PAGES + 1),
+    ]
+    [brazil] = tmp_path.glob('*_Brazil.csv')
+    with open(brazil, encoding='utf-8') as f:
+        symbols = [row['symbol'] for row in csv.DictReader(f)]
+    assert symbols == [f'S{page}' for page in range(1, TOTAL_PAGES + 2)]
+    # merged regions are not merged again
+    assert merge_jobs(queue, str(tmp_path)) == []
+
+
+def test_merge_waits_for_unfinished_jobs(queue, tmp_path):
+    queue.enqueue(['Brazil'])
+    queue.claim('w1')
+
+    assert merge_jobs(queue, str(tmp_path)) == []
+    assert list(tmp_path.glob('*.csv')) == []
+
+
+def test_merge_reports_failed_regions(queue, tmp_path):
+    queue.enqueue(['Brazil'], options={'fail': True})
+
+    make_worker(queue).run()
+    [result] = merge_jobs(queue, str(tmp_path))
+
+    assert not result.ok
+    assert 'RuntimeError: boom' in result.error
+    assert list(tmp_path.glob('*.csv')) == []
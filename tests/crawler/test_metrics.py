@@ -0,0 +1,158 @@
+import json
+from unittest.mock import patch
+
+from src.crawler.metrics import (
+    RunMetrics,
+    to_prometheus,
+    write_report,
+    write_run_report,
+)
+
+EXPECTED_ROWS = 150
+EXPECTED_BYTES = 3000
+EXPECTED_ROWS_PER_SECOND = 50.0
+
+
+def fake_clock(*values):
+    return patch('src.crawler.metrics.time.perf_counter', side_effect=values)
+
+
+def test_phase_accumulates_time():
+    metrics = RunMetrics('Brazil')
+
+    with fake_clock(10.0, 12.5, 20.0, 21.0):
+        with metrics.phase('scrape'):
+            pass
+        with metrics.phase('scrape'):
+            pass
+
+    assert metrics.phases == {'scrape': 3.5}
+
+
+def test_pages_split_into_steps():
+    metrics = RunMetrics('Brazil')
+
+    # page clock, wait start/end, fetch start/end, parse start/end, page end
+    with fake_clock(0.0, 0.0, 1.0, 1.0, 1.5, 1.5, 1.75, 2.0):
+        with metrics.page_step('wait'):
+            pass
+        with metrics.page_step('fetch'):
+            pass
+        metrics.add_page_bytes(EXPECTED_BYTES)
+        with metrics.page_step('parse'):
+            pass
+        metrics.add_page_rows(100)
+        page = metrics.end_page(1)
+
+    assert (
+        page.wait_seconds,
+        page.fetch_seconds,
+        page.parse_seconds,
+        page.seconds,
+    ) == (1.0, 0.5, 0.25, 2.0)
+    assert page.html_bytes == EXPECTED_BYTES
+    assert page.rows_per_second == EXPECTED_ROWS_PER_SECOND
+
+
+def test_add_parsed_page_after_end_page():
+    metrics = RunMetrics('Brazil')
+    page = metrics.end_page(1)
+
+    metrics.add_parsed_page(page, 100, 0.25)
+
+    assert metrics.pages[0].rows == 100  # noqa: PLR2004
+    assert metrics.pages[0].parse_seconds == 0.25  # noqa: PLR2004
+    assert metrics.rows == 100  # noqa: PLR2004
+
+
+def test_report_totals():
+    metrics = RunMetrics('Brazil', backend='http')
+    metrics.add_page_rows(100)
+    metrics.add_page_bytes(EXPECTED_BYTES)
+    metrics.end_page(1)
+    metrics.add_page_rows(50)
+    metrics.end_page(2)
+    metrics.phases['save'] = 0.5
+    metrics.finish('ok')
+
+    report = metrics.report()
+
+    assert report['region'] == 'Brazil'
+    assert report['backend'] == 'http'
+    assert report['status'] == 'ok'
+    assert report['rows'] == EXPECTED_ROWS
+    assert [page['page'] for page in report['per_page']] == [1, 2]
+    assert report['page_totals']['html_bytes'] == EXPECTED_BYTES
+    assert report['phases'] == {'save': 0.5}
+    json.dumps(report)
+
+
+def test_to_prometheus():
+    metrics = RunMetrics('United States')
+    metrics.phases['region_filter'] = 1.25
+    metrics.finish('ok')
+
+    text = to_prometheus([metrics.report()])
+
+    labels = 'region="United States",backend="selenium"'
+    assert '# TYPE crawler_run_seconds gauge' in text
+    assert f'crawler_run_success{{{labels}}} 1' in text
+    assert (
+        f'crawler_phase_seconds{{{labels},phase="region_filter"}} 1.25' in text
+    )
+    assert f'crawler_page_step_seconds{{{labels},step="parse"}} 0' in text
+    assert text.endswith('\n')
+
+
+def test_write_report(tmp_path):
+    metrics = RunMetrics('United States')
+    metrics.finish('error')
+
+    json_path = write_report(metrics, str(tmp_path))
+
+    report = json.loads(open(json_path, encoding='utf-8').read())
+    assert report['status'] == 'error'
+    prom = (tmp_path / 'metrics' / 'United_States.prom').read_text()
+    assert 'crawler_run_success{region="United States"' in prom
+    assert not list((tmp_path / 'metrics').glob('*.part'))
+
+
+def test_write_run_report(tmp_path):
+    reports = []
+    for region, rows in (('Brazil', 100), ('Chile', 50)):
+        metrics = RunMetrics(region)
+        metrics.add_page_rows(rows)
+        metrics.end_page(1)
+        metrics.phases['scrape'] = 1.0
+        metrics.finish('ok')
+        reports.append(metrics.report())
+
+    run_path = write_run_report(reports, str(tmp_path))
+
+    summary = json.loads(open(run_path, encoding='utf-8').read())
+    assert summary['regions'] == len(reports)
+    assert summary['rows'] == EXPECTED_ROWS
+    assert summary['phases'] == {'scrape': 2.0}
+    assert write_run_report([], str(tmp_path)) is None
+
+
+def test_report_includes_outcomes():
+    EXPECTED_PAGE_SIZE = 100
+    metrics = RunMetrics('Brazil')
+    metrics.set_outcomes(
+        EXPECTED_PAGE_SIZE,
+        {'retries': 2, 'fallbacks': 1, 'circuit_open': False},
+    )
+    metrics.finish('ok')
+
+    report = metrics.report()
+    prom = to_prometheus([report])
+
+    assert report['page_size'] == EXPECTED_PAGE_SIZE
+    assert report['retries'] == 2  # noqa: PLR2004
+    assert (
+        'crawler_run_fallbacks{region="Brazil",backend="selenium"} 1' in prom
+    )
+    assert 'crawler_run_page_size{region="Brazil",backend="selenium"} 100' in (
+        prom
+    )
@@ -0,0 +1,88 @@
+import pytest
+
+from src.crawler.parsing import parse_table
+from src.crawler.synthetic import SyntheticScreener
+
+TABLE_HTML = """
+<html>
+    <head><script>var noise = '<table>';</script></head>
+    <body>
+        <div data-testid="data-table">
+            <table>
+                <thead>
+                    <tr>
+                        <th><span>Symbol</span></th>
+                        <th>Name</th>
+                        <th>Price (Intraday)</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    <tr>
+                        <td><a href="#"> TEST.SA </a></td>
+                        <td>Test Company</td>
+                        <td>1,234.56</td>
+                    </tr>
+                </tbody>
+            </table>
+        </div>
+    </body>
+</html>
+"""
+
+NO_THEAD_HTML = """
+<table>
+    <tr><th>Symbol</th><th>Name</th></tr>
+    <tr><td>TEST3</td><td>Test Corp</td></tr>
+</table>
+"""
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml', 'selectolax'])
+def test_parse_table(parser):
+    if parser != 'html.parser':
+        pytest.importorskip(parser)
+
+    headers, rows = parse_table(TABLE_HTML, parser)
+
+    assert headers == ['symbol', 'name', 'price (intraday)']
+    assert rows == [['TEST.SA', 'Test Company', '1,234.56']]
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml', 'selectolax'])
+def test_parse_table_without_thead(parser):
+    if parser != 'html.parser':
+        pytest.importorskip(parser)
+
+    headers, rows = parse_table(NO_THEAD_HTML, parser)
+
+    assert headers == ['symbol', 'name']
+    assert rows == [['Symbol', 'Name'], ['TEST3', 'Test Corp']]
+
+
+def test_parse_table_without_table():
+    assert parse_table('<div>nothing here</div>') == ([], [])
+
+
+def test_parse_table_unknown_parser():
+    with pytest.raises(ValueError, match='Unknown parser'):
+        parse_table(TABLE_HTML, 'regex')
+
+
+@pytest.mark.parametrize('extra_columns', [0, 5])
+def test_lxml_matches_html_parser_on_screener_pages(extra_columns):
+    pytest.importorskip('lxml')
+    screener = SyntheticScreener(
+        rows_per_page=10, pages=1, extra_columns=extra_columns, noise_kb=5
+    )
+
+    for html in (screener.page_html(1), screener.table_html(1)):
+        assert parse_table(html, 'lxml') == parse_table(html, 'html.parser')
+
+
+def test_lxml_finds_role_table_fragment():
+    pytest.importorskip('lxml')
+    html = (
+        '<div role="table"><div><span role="row"><td>A</td></span></div></div>'
+    )
+
+    assert parse_table(html, 'lxml') == parse_table(html, 'html.parser')
@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.crawler.pool import (
+    RegionResult,
+    crawl_region,
+    crawl_regions,
+    exit_status,
+    log_summary,
+    read_regions_file,
+)
+
+
+@pytest.fixture
+def mock_crawler_class():
+    with patch('src.crawler.pool.load_backend') as mock_load_backend:
+        yield mock_load_backend.return_value
+
+
+def test_read_regions_file(tmp_path):
+    regions_file = tmp_path / 'regions.txt'
+    regions_file.write_text('Brazil\n# skipped\n\n  Chile  \n')
+
+    assert read_regions_file(str(regions_file)) == ['Brazil', 'Chile']
+
+
+def test_crawl_region(mock_crawler_class):
+    EXPECTED_ROWS = 3
+    mock_crawler_class.return_value.data = [{}] * EXPECTED_ROWS
+
+    result = crawl_region('Brazil', 'http://test.url', headless=False)
+
+    mock_crawler_class.assert_called_once_with(
+        region='Brazil', base_url='http://test.url', headless=False
+    )
+    mock_crawler_class.return_value.run.assert_called_once()
+    assert result.ok
+    assert result.rows == EXPECTED_ROWS
+    assert result.metrics == (
+        mock_crawler_class.return_value.metrics.report.return_value
+    )
+
+
+def test_crawl_region_with_custom_class():
+    crawler_class = MagicMock()
+    crawler_class.return_value.data = []
+
+    result = crawl_region('Brazil', 'http://test.url', crawler_class)
+
+    crawler_class.assert_called_once_with(
+        region='Brazil', base_url='http://test.url'
+    )
+    assert result.ok
+
+
+def test_crawl_region_failure(mock_crawler_class):
+    mock_crawler_class.return_value.run.side_effect = RuntimeError('boom')
+
+    result = crawl_region('Brazil', 'http://test.url')
+
+    assert not result.ok
+    assert result.error == 'RuntimeError: boom'
+
+
+def test_crawl_regions_isolates_failures(mock_crawler_class):
+    def build(region, base_url, **options):
+        crawler = MagicMock()
+        crawler.data = [{}]
+        if region == 'Chile':
+            crawler.run.side_effect = RuntimeError('boom')
+        return crawler
+
+    mock_crawler_class.side_effect = build
+
+    with patch('src.crawler.pool.ProcessPoolExecutor', ThreadPoolExecutor):
+        results = crawl_regions(
+            ['Brazil', 'Chile', 'Peru', 'Brazil'], 'http://test.url', 2
+        )
+
+    assert [result.region for result in results] == [
+        'Brazil',
+        'Chile',
+        'Peru',
+    ]
+    assert [result.ok for result in results] == [True, False, True]
+
+
+def test_log_summary():
+    results = [
+        RegionResult(region='Brazil', rows=10, seconds=1.0),
+        RegionResult(region='Chile', error='RuntimeError: boom'),
+    ]
+
+    with patch('src.crawler.pool.logger') as mock_logger:
+        log_summary(results)
+
+        mock_logger.info.assert_any_call(
+            '  Chile: 0 rows, 0.0s, FAILED (RuntimeError: boom)'
+        )
+        mock_logger.info.assert_called_with(
+            '1/2 regions succeeded, 10 rows in total.'
+        )
+
+
+def test_exit_status_fails_when_any_region_failed():
+    ok = RegionResult(region='Brazil', rows=10)
+    failed = RegionResult(region='Chile', error='RuntimeError: boom')
+
+    assert exit_status([ok, ok]) == 0
+    assert exit_status([ok, failed]) == 1
+    assert exit_status([]) == 0
@@ -0,0 +1,167 @@
+import csv
+import json
+import threading
+import urllib.request
+from os import utime
+
+import pytest
+
+from src.crawler.delta import DeltaTracker, load_previous_state, write_delta
+from src.crawler.query import QueryServer, SnapshotIndex, find_snapshots
+from src.crawler.schema import Quote
+from src.crawler.sinks import FIELDNAMES, snapshot_path
+
+EXPECTED_VOLUME = 20_000_000
+
+BRAZIL = [
+    {
+        'symbol': 'PETR4.SA',
+        'name': 'Petrobras',
+        'price': '38.5',
+        'volume': '50M',
+    },
+    {
+        'symbol': 'PETR3.SA',
+        'name': 'Petrobras ON',
+        'price': '41.0',
+        'volume': '9M',
+    },
+    {'symbol': 'VALE3.SA', 'name': 'Vale', 'price': '60.1', 'volume': '20M'},
+    {
+        'symbol': 'ITUB4.SA',
+        'name': 'Itau Unibanco',
+        'price': '',
+        'volume': '30M',
+    },
+]
+CHILE = [
+    {'symbol': 'SQM-B.SN', 'name': 'Sociedad Quimica', 'price': '45.0'},
+]
+
+
+def write_csv(output_dir, region, rows, timestamp, extension='csv'):
+    file_path = snapshot_path(region, extension, str(output_dir), timestamp)
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+    return file_path
+
+
+@pytest.fixture
+def index(tmp_path):
+    write_csv(tmp_path, 'Brazil', BRAZIL[:1], 100)
+    write_csv(tmp_path, 'Brazil', BRAZIL, 200)
+    with open(
+        snapshot_path('Chile', 'ndjson', str(tmp_path), 150),
+        'w',
+        encoding='utf-8',
+    ) as f:
+        f.writelines(
+            json.dumps({'region': 'Chile', **row, 'price': 45.0}) + '\n'
+            for row in CHILE
+        )
+    (tmp_path / 'notes.txt').write_text('not a snapshot')
+    index = SnapshotIndex(str(tmp_path))
+    index.refresh()
+    return index
+
+
+def symbols(rows):
+    return [row['symbol'] for row in rows]
+
+
+def test_find_snapshots_keeps_the_latest_and_later_deltas(tmp_path):
+    write_csv(tmp_path, 'United States', [], 100)
+    old_delta = write_csv(tmp_path, 'United States', [], 90, 'delta.csv')
+    latest = write_csv(tmp_path, 'United States', [], 200)
+    delta = write_csv(tmp_path, 'United States', [], 300, 'delta.csv')
+
+    files = find_snapshots(str(tmp_path))
+
+    assert list(files) == ['United_States']
+    assert files['United_States'].snapshot == latest
+    assert files['United_States'].deltas == [delta]
+    assert old_delta not in files['United_States'].deltas
+
+
+def test_lookup_by_symbol(index):
+    [row] = index.lookup(['VALE3.SA'])
+
+    assert row['region'] == 'Brazil'
+    assert row['price'] == pytest.approx(60.1)
+    assert row['volume'] == EXPECTED_VOLUME
+    assert symbols(index.lookup(['SQM-B.SN', 'NOPE'])) == ['SQM-B.SN']
+    assert index.lookup(['SQM-B.SN'], region='Brazil') == []
+    with pytest.raises(KeyError):
+        index.lookup(['VALE3.SA'], region='Peru')
+
+
+def test_search_by_name_or_symbol_prefix(index):
+    assert symbols(index.search('petro')) == ['PETR4.SA', 'PETR3.SA']
+    assert symbols(index.search('PETR')) == ['PETR3.SA', 'PETR4.SA']
+    assert symbols(index.search('petro', limit=1)) == ['PETR4.SA']
+    assert symbols(index.search('quim')) == []
+
+
+def test_range_and_top(index):
+    assert symbols(index.range('price', 40, 50)) == ['PETR3.SA', 'SQM-B.SN']
+    assert symbols(index.range('price', high=40)) == ['PETR4.SA']
+    assert symbols(index.top('volume', 2)) == ['PETR4.SA', 'ITUB4.SA']
+    assert symbols(index.top('price', 1, largest=False)) == ['PETR4.SA']
+    with pytest.raises(ValueError, match='Unknown number field'):
+        index.top('name')
+
+
+def test_refresh_loads_new_snapshots_and_deltas(index, tmp_path):
+    assert index.refresh() == []
+
+    previous = load_previous_state('Brazil', str(tmp_path))
+    tracker = DeltaTracker(previous)
+    tracker.observe([
+        previous['PETR4.SA'],
+        Quote(symbol='VALE3.SA', name='Vale', price=61.0, change=0.9),
+        previous['PETR3.SA'],
+    ])
+    write_delta(tracker, 'Brazil', str(tmp_path))
+    # the directory mtime has a coarse resolution on some filesystems
+    utime(tmp_path, ns=(1, 1))
+
+    assert index.refresh() == ['Brazil']
+    [vale] = index.lookup(['VALE3.SA'])
+    assert vale['price'] == pytest.approx(61.0)
+    assert vale['change'] == pytest.approx(0.9)
+    assert index.lookup(['ITUB4.SA']) == []
+    assert {row['region'] for row in index.describe()} == {'Brazil', 'Chile'}
+
+
+def test_handle_answers_with_status_and_json(index, tmp_path):
+    server = QueryServer(str(tmp_path))
+    server.index = index
+
+    status, body = server.handle('/quote?symbol=VALE3.SA&symbol=SQM-B.SN')
+    assert status == 200  # noqa: PLR2004
+    assert symbols(body) == ['VALE3.SA', 'SQM-B.SN']
+    status, body = server.handle('/range?field=price&min=abc')
+    assert status == 400  # noqa: PLR2004
+    assert 'min must be a number' in body['error']
+    assert server.handle('/top')[0] == 400  # noqa: PLR2004
+    assert server.handle('/search?prefix=va&region=Peru')[0] == 404  # noqa: PLR2004
+    assert server.handle('/nope')[0] == 404  # noqa: PLR2004
+
+
+def test_serve_over_http(index, tmp_path):
+    server = QueryServer(str(tmp_path), port=0, reload_interval=0.01)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        while not server.port:
+            threading.Event().wait(0.01)
+        url = f'http://127.0.0.1:{server.port}/top?field=volume&n=1'
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = json.load(response)
+    finally:
+        server.shutdown()
+        thread.join(timeout=5)
+
+    assert symbols(body) == ['PETR4.SA']
@@ -0,0 +1,59 @@
+import gzip
+import json
+
+from src.crawler.recording import (
+    Recorder,
+    latest_manifest,
+    load_manifest,
+    object_path,
+    read_page,
+)
+
+EXPECTED_PAGES = 2
+
+
+def test_record_is_content_addressed(tmp_path):
+    recorder = Recorder('Brazil', str(tmp_path), 'http://test.url')
+
+    first = recorder.record('<table>same</table>')
+    recorder.mark_page(1, 'http://test.url?start=0')
+    second = recorder.record('<table>same</table>')
+    recorder.mark_page(2, 'http://test.url?start=25')
+
+    assert first == second
+    assert recorder.new_objects == 1
+    with gzip.open(object_path(str(tmp_path), first), 'rb') as f:
+        assert f.read() == b'<table>same</table>'
+    assert read_page(str(tmp_path), first) == '<table>same</table>'
+
+
+def test_close_writes_manifest(tmp_path):
+    recorder = Recorder('United States', str(tmp_path))
+    recorder.record('<table>1</table>')
+    recorder.mark_page(1)
+    recorder.record('<table>2</table>')
+    recorder.mark_page(2)
+    # Recorded but never marked done: not part of the manifest
+    recorder.record('<table>3</table>')
+
+    manifest_path = recorder.close(complete=False)
+
+    data = json.loads(open(manifest_path, encoding='utf-8').read())
+    assert data['region'] == 'United States'
+    assert data['complete'] is False
+    assert [page['page'] for page in data['pages']] == [1, 2]
+    assert latest_manifest('United States', str(tmp_path)) == manifest_path
+    assert len(load_manifest(manifest_path).pages) == EXPECTED_PAGES
+
+
+def test_close_without_pages(tmp_path):
+    assert Recorder('Brazil', str(tmp_path)).close(complete=True) is None
+    assert latest_manifest('Brazil', str(tmp_path)) is None
+
+
+def test_mark_page_without_record_is_ignored(tmp_path):
+    recorder = Recorder('Brazil', str(tmp_path))
+
+    recorder.mark_page(1)
+
+    assert recorder.manifest.pages == []
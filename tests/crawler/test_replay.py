@@ -0,0 +1,80 @@
+import pytest
+
+from src.crawler.core import YahooFinanceCrawler
+from src.crawler.replay import YahooFinanceReplayCrawler
+from src.crawler.synthetic import FakeDriver, SyntheticScreener
+
+EXPECTED_ROWS = 40
+
+
+def record_run(output_dir, extract_mode='fragment'):
+    screener = SyntheticScreener(rows_per_page=10, pages=4)
+    crawler = YahooFinanceCrawler(
+        region='Brazil',
+        base_url=screener.url,
+        driver=FakeDriver(screener),
+        extract_mode=extract_mode,
+        output_dir=output_dir,
+        record=True,
+    )
+    crawler._scrape_all_pages()
+    crawler._finish_run('ok')
+    return crawler
+
+
+@pytest.mark.parametrize('extract_mode', ['page', 'fragment', 'cells'])
+def test_replay_matches_the_recorded_run(tmp_path, extract_mode):
+    recorded = record_run(str(tmp_path), extract_mode)
+
+    replay = YahooFinanceReplayCrawler(
+        region='Brazil', output_dir=str(tmp_path)
+    )
+    replay.run()
+
+    assert replay.driver is None
+    assert len(replay.data) == EXPECTED_ROWS
+    assert replay.data == recorded.data
+    assert [page.page for page in replay.metrics.pages] == [1, 2, 3, 4]
+    assert len(list(tmp_path.glob('*_Brazil.csv'))) == 1
+
+
+def test_replay_with_parse_workers(tmp_path):
+    recorded = record_run(str(tmp_path))
+
+    replay = YahooFinanceReplayCrawler(
+        region='Brazil', output_dir=str(tmp_path), parse_workers=2
+    )
+    replay.run()
+
+    assert replay.data == recorded.data
+
+
+def test_replay_clears_its_checkpoint(tmp_path):
+    record_run(str(tmp_path))
+
+    replay = YahooFinanceReplayCrawler(
+        region='Brazil', output_dir=str(tmp_path), checkpoint=True
+    )
+    replay.run()
+
+    assert replay.checkpoints.load() is None
+    assert list(tmp_path.glob('.checkpoints/*')) == []
+
+
+def test_replay_without_recording(tmp_path):
+    replay = YahooFinanceReplayCrawler(
+        region='Brazil', output_dir=str(tmp_path)
+    )
+
+    with pytest.raises(FileNotFoundError, match='No recording found'):
+        replay.run()
+
+
+def test_rerecording_reuses_objects(tmp_path):
+    record_run(str(tmp_path))
+    again = record_run(str(tmp_path))
+
+    assert again.recorder.new_objects == 0
+    assert len(list(tmp_path.glob('recordings/objects/*/*.html.gz'))) == len(
+        again.recorder.manifest.pages
+    )
@@ -0,0 +1,146 @@
+from random import Random
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.crawler.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Retrier,
+    RetryPolicy,
+)
+
+EXPECTED_ATTEMPTS = 3
+EXPECTED_RETRIES = 2
+
+
+def make_retrier(policies=None, threshold=10):
+    sleeps = []
+    retrier = Retrier(
+        policies, CircuitBreaker(threshold), sleep=sleeps.append, seed=0
+    )
+    return retrier, sleeps
+
+
+def test_policy_delay_grows_and_is_capped():
+    policy = RetryPolicy(base_delay=1.0, multiplier=2.0, max_delay=3.0)
+    rand = MagicMock()
+    rand.uniform.return_value = 1.0
+
+    assert [policy.delay(retry, rand) for retry in (1, 2, 3, 4)] == [
+        1.0,
+        2.0,
+        3.0,
+        3.0,
+    ]
+
+
+def test_policy_delay_jitter():
+    policy = RetryPolicy(base_delay=2.0)
+
+    delay = policy.delay(1, Random(0))
+
+    assert 1.0 <= delay <= 2.0  # noqa: PLR2004
+
+
+def test_call_retries_until_success():
+    retrier, sleeps = make_retrier()
+    func = MagicMock(side_effect=[Exception('boom'), Exception('boom'), 42])
+    on_retry = MagicMock()
+
+    result = retrier.call('extract', func, on_retry=on_retry)
+
+    assert result == 42  # noqa: PLR2004
+    assert func.call_count == EXPECTED_ATTEMPTS
+    assert on_retry.call_count == EXPECTED_RETRIES
+    assert len(sleeps) == EXPECTED_RETRIES
+    outcome = retrier.outcomes['extract']
+    assert outcome.retries == EXPECTED_RETRIES
+    assert outcome.retry_seconds == pytest.approx(sum(sleeps))
+
+
+def test_call_raises_after_last_attempt():
+    retrier, _ = make_retrier({'navigate': RetryPolicy(attempts=3)})
+    func = MagicMock(side_effect=Exception('down'))
+
+    with pytest.raises(Exception, match='down'):
+        retrier.call('navigate', func)
+
+    assert func.call_count == EXPECTED_ATTEMPTS
+    assert retrier.outcomes['navigate'].failures == EXPECTED_ATTEMPTS
+
+
+def test_call_stops_when_budget_is_spent():
+    retrier, sleeps = make_retrier({
+        'extract': RetryPolicy(attempts=10, base_delay=1.0, budget=0.5)
+    })
+    func = MagicMock(side_effect=Exception('slow'))
+
+    with pytest.raises(Exception, match='slow'):
+        retrier.call('extract', func)
+
+    # the first delay (0.5s to 1s) is already over the budget
+    assert sleeps == []
+    assert func.call_count == 1
+
+
+def test_on_retry_errors_do_not_stop_the_retry():
+    retrier, _ = make_retrier()
+    func = MagicMock(side_effect=[Exception('boom'), 'ok'])
+
+    result = retrier.call(
+        'extract', func, on_retry=MagicMock(side_effect=Exception('reload'))
+    )
+
+    assert result == 'ok'
+
+
+def test_circuit_opens_after_consecutive_failures():
+    retrier, _ = make_retrier(threshold=2)
+    func = MagicMock(side_effect=Exception('down'))
+
+    with pytest.raises(CircuitOpenError):
+        retrier.call('navigate', func)
+
+    assert func.call_count == EXPECTED_RETRIES
+    with pytest.raises(CircuitOpenError):
+        retrier.call('extract', MagicMock(return_value='ok'))
+    assert retrier.report()['circuit_open'] is True
+
+
+def test_success_resets_the_breaker():
+    breaker = CircuitBreaker(threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert not breaker.is_open
+
+
+def test_zero_threshold_never_opens():
+    breaker = CircuitBreaker(threshold=0)
+
+    for _ in range(100):
+        breaker.record_failure()
+
+    assert not breaker.is_open
+
+
+def test_with_attempts_overrides_every_policy():
+    retrier = Retrier.with_attempts(1, failure_threshold=3)
+
+    assert {policy.attempts for policy in retrier.policies.values()} == {1}
+    assert retrier.breaker.threshold == EXPECTED_ATTEMPTS
+
+
+def test_report_totals():
+    retrier, _ = make_retrier()
+    retrier.call('extract', MagicMock(side_effect=[Exception('x'), 'ok']))
+    retrier.fallback('rows_per_page')
+
+    report = retrier.report()
+
+    assert report['retries'] == 1
+    assert report['fallbacks'] == 1
+    assert report['operations']['rows_per_page']['fallbacks'] == 1
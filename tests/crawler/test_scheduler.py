@@ -0,0 +1,267 @@
+import datetime
+import threading
+from pathlib import Path
+from random import Random
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.crawler.core import YahooFinanceCrawler
+from src.crawler.pool import RegionResult
+from src.crawler.scheduler import (
+    CronSchedule,
+    MarketHours,
+    ScheduledJob,
+    Scheduler,
+    load_schedule,
+    parse_duration,
+)
+
+EXAMPLE = Path(__file__).parents[2] / 'schedule.example.toml'
+SAO_PAULO = ZoneInfo('America/Sao_Paulo')
+# Saturday, 2026-10-17 12:03 in São Paulo
+SATURDAY_NOON = datetime.datetime(2026, 10, 17, 12, 3, tzinfo=SAO_PAULO)
+MONDAY_NOON = datetime.datetime(2026, 10, 19, 12, 3, tzinfo=SAO_PAULO)
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize(
+    ('value', 'expected'),
+    [(90, 90.0), ('90s', 90.0), ('15m', 900.0), ('2h', 7200.0), ('1d', 86400)],
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == expected
+
+
+def test_parse_duration_rejects_garbage():
+    with pytest.raises(ValueError, match='Invalid duration'):
+        parse_duration('soon')
+
+
+def test_cron_next_after():
+    cron = CronSchedule('*/15 10-17 * * 1-5')
+
+    assert cron.next_after(SATURDAY_NOON) == datetime.datetime(
+        2026, 10, 19, 10, 0, tzinfo=SAO_PAULO
+    )
+    assert cron.next_after(MONDAY_NOON) == datetime.datetime(
+        2026, 10, 19, 12, 15, tzinfo=SAO_PAULO
+    )
+
+
+def test_cron_matches_day_or_weekday_when_both_are_set():
+    cron = CronSchedule('0 9 1 * 1')
+
+    # Monday the 19th comes before the 1st of November
+    assert cron.next_after(SATURDAY_NOON).day == MONDAY_NOON.day
+
+
+@pytest.mark.parametrize(
+    'expression', ['* * * *', '60 * * * *', '* 5-2 * * *', 'a * * * *']
+)
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):  # noqa: PT011
+        CronSchedule(expression)
+
+
+def test_market_hours_next_open():
+    market_hours = MarketHours.parse('10:00-17:00')
+
+    assert market_hours.next_open(MONDAY_NOON) == MONDAY_NOON
+    assert market_hours.next_open(SATURDAY_NOON) == datetime.datetime(
+        2026, 10, 19, 10, 0, tzinfo=SAO_PAULO
+    )
+    friday_evening = datetime.datetime(2026, 10, 16, 18, tzinfo=SAO_PAULO)
+    assert market_hours.next_open(friday_evening) == datetime.datetime(
+        2026, 10, 19, 10, 0, tzinfo=SAO_PAULO
+    )
+
+
+def test_interval_job_waits_for_market_hours():
+    job = ScheduledJob(
+        region='Brazil',
+        interval=3600,
+        market_hours=MarketHours.parse('10:00-17:00'),
+        timezone=SAO_PAULO,
+    )
+    monday_afternoon = MONDAY_NOON.replace(hour=16, minute=30)
+
+    next_run = job.schedule_after(monday_afternoon.timestamp(), Random(0))
+
+    assert (
+        next_run
+        == datetime.datetime(2026, 10, 20, 10, 0, tzinfo=SAO_PAULO).timestamp()
+    )
+
+
+def test_jitter_delays_within_bounds():
+    EXPECTED_JITTER = 30
+    job = ScheduledJob(region='Brazil', interval=60, jitter=EXPECTED_JITTER)
+    clock = FakeClock(MONDAY_NOON.timestamp())
+
+    scheduler = Scheduler([job], lambda region, options: None, clock=clock)
+
+    assert clock.now <= job.next_run <= clock.now + EXPECTED_JITTER
+    scheduler.stop()
+
+
+def test_load_schedule(tmp_path):
+    EXPECTED_CONCURRENCY = 2
+    config = tmp_path / 'schedule.toml'
+    config.write_text(
+        'max_concurrency = 2\n'
+        'timezone = "America/Sao_Paulo"\n'
+        '[[jobs]]\n'
+        'region = "Brazil"\n'
+        'interval = "15m"\n'
+        'market_hours = "10:00-17:00"\n'
+        'jitter = "30s"\n'
+        'options = { output = "sqlite" }\n'
+        '[[jobs]]\n'
+        'region = "Chile"\n'
+        'cron = "0 * * * *"\n'
+        'timezone = "America/Santiago"\n'
+    )
+
+    jobs, max_concurrency = load_schedule(str(config))
+
+    assert max_concurrency == EXPECTED_CONCURRENCY
+    assert [job.region for job in jobs] == ['Brazil', 'Chile']
+    assert jobs[0].interval == parse_duration('15m')
+    assert jobs[0].timezone == SAO_PAULO
+    assert jobs[0].options == {'output': 'sqlite'}
+    assert jobs[1].cron.expression == '0 * * * *'
+    assert jobs[1].timezone == ZoneInfo('America/Santiago')
+
+
+@pytest.mark.parametrize(
+    ('job', 'message'),
+    [
+        ('region = "Brazil"', 'exactly one of'),
+        ('region = "Brazil"\ninterval = 60\ncron = "* * * * *"', 'exactly'),
+        ('interval = 60', 'needs a "region"'),
+        ('region = "Brazil"\ninterval = 60\nevery = 1', 'Unknown job keys'),
+    ],
+)
+def test_load_schedule_rejects_invalid_jobs(tmp_path, job, message):
+    config = tmp_path / 'schedule.toml'
+    config.write_text(f'[[jobs]]\n{job}\n')
+
+    with pytest.raises(ValueError, match=message):
+        load_schedule(str(config))
+
+
+def test_example_schedule_jobs_are_valid_crawls(tmp_path):
+    jobs, _ = load_schedule(str(EXAMPLE))
+
+    for job in jobs:
+        # Raises for options a crawler refuses, like delta with sqlite
+        YahooFinanceCrawler(
+            region=job.region,
+            base_url='http://test.url',
+            driver=MagicMock(),
+            output_dir=str(tmp_path),
+            **job.options,
+        )
+
+
+def test_tick_runs_due_jobs_and_reschedules():
+    EXPECTED_INTERVAL = 60
+    clock = FakeClock(MONDAY_NOON.timestamp())
+    calls = []
+    job = ScheduledJob(
+        region='Brazil', interval=EXPECTED_INTERVAL, options={'tabs': 2}
+    )
+    scheduler = Scheduler(
+        [job],
+        lambda region, options: (
+            calls.append((region, options)) or RegionResult(region=region)
+        ),
+        clock=clock,
+    )
+
+    [future] = scheduler.tick()
+    future.result()
+
+    assert calls == [('Brazil', {'tabs': 2})]
+    assert job.next_run == clock.now + EXPECTED_INTERVAL
+    assert scheduler.tick() == []
+    scheduler.stop()
+
+
+def test_tick_skips_region_still_running():
+    clock = FakeClock(MONDAY_NOON.timestamp())
+    release = threading.Event()
+
+    def run_job(region, options):
+        release.wait(5)
+        return RegionResult(region=region)
+
+    job = ScheduledJob(region='Brazil', interval=60)
+    scheduler = Scheduler([job], run_job, clock=clock)
+
+    [first] = scheduler.tick()
+    clock.now += 60
+    assert scheduler.tick() == []
+    assert scheduler.skipped == 1
+
+    release.set()
+    first.result()
+    clock.now += 60
+    assert len(scheduler.tick()) == 1
+    scheduler.stop()
+
+
+def test_concurrency_is_bounded():
+    clock = FakeClock(MONDAY_NOON.timestamp())
+    release = threading.Event()
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def run_job(region, options):
+        with lock:
+            active.append(region)
+            peak.append(len(active))
+        release.wait(5)
+        with lock:
+            active.remove(region)
+        return RegionResult(region=region)
+
+    jobs = [
+        ScheduledJob(region=region, interval=60)
+        for region in ('Brazil', 'Chile', 'Peru')
+    ]
+    scheduler = Scheduler(jobs, run_job, max_concurrency=2, clock=clock)
+
+    futures = scheduler.tick()
+    release.set()
+    for future in futures:
+        future.result()
+
+    assert len(futures) == len(jobs)
+    assert max(peak) <= scheduler.max_concurrency
+
+
+def test_failed_job_frees_its_region():
+    clock = FakeClock(MONDAY_NOON.timestamp())
+
+    def run_job(region, options):
+        raise RuntimeError('boom')
+
+    scheduler = Scheduler(
+        [ScheduledJob(region='Brazil', interval=60)], run_job, clock=clock
+    )
+
+    [future] = scheduler.tick()
+
+    assert future.result().error == 'RuntimeError: boom'
+    assert scheduler.running == set()
@@ -0,0 +1,176 @@
+import pickle
+import sys
+from dataclasses import fields
+
+import pytest
+
+from src.crawler.schema import (
+    FIELD_NAMES,
+    ColumnMap,
+    Quote,
+    parse_number,
+    parse_range,
+    row_values,
+    typed_row,
+)
+
+SCREENER_HEADERS = [
+    'symbol',
+    'name',
+    'price',
+    'change',
+    'change %',
+    'volume',
+    'avg vol (3m)',
+    'market cap',
+    'p/e ratio (ttm)',
+    '52 wk change %',
+    '52 wk range',
+]
+
+
+@pytest.mark.parametrize(
+    ('text', 'expected'),
+    [
+        ('1,234.56', 1234.56),
+        ('+1.20', 1.2),
+        ('-0.53%', -0.53),
+        ('12.3K', 12300.0),
+        ('4.5M', 4500000.0),
+        ('2.3B', 2300000000.0),
+        ('1.1T', 1100000000000.0),
+        ('--', None),
+        ('N/A', None),
+        ('', None),
+        ('abc', None),
+        (None, None),
+        (7, 7.0),
+    ],
+)
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+def test_parse_range():
+    EXPECTED_RANGE = (1010.5, 2480.0)
+
+    assert parse_range('1,010.50 - 2,480.00') == EXPECTED_RANGE
+    assert parse_range('--') == (None, None)
+
+
+def test_column_map_resolves_every_screener_column():
+    column_map = ColumnMap.compile([*SCREENER_HEADERS, 'unknown'])
+
+    assert list(column_map.columns) == [
+        'symbol',
+        'name',
+        'price',
+        'change',
+        'change_percent',
+        'volume',
+        'avg_volume',
+        'market_cap',
+        'pe_ratio',
+        'week_52_change_percent',
+        'week_52_range',
+    ]
+    assert column_map.unmapped == ['unknown']
+
+
+def test_column_map_converts_rows():
+    column_map = ColumnMap.compile(SCREENER_HEADERS)
+
+    [row] = column_map.convert([
+        [
+            'PETR4.SA',
+            'Petrobras',
+            '38.50',
+            '+0.40',
+            '+1.05%',
+            '35.2M',
+            '40.1M',
+            '501.7B',
+            '--',
+            '-3.20%',
+            '30.10 - 42.80',
+        ],
+    ])
+
+    assert isinstance(row, Quote)
+    assert list(row) == FIELD_NAMES
+    assert row == {
+        'symbol': 'PETR4.SA',
+        'name': 'Petrobras',
+        'price': 38.5,
+        'change': 0.4,
+        'change_percent': 1.05,
+        'volume': 35200000.0,
+        'avg_volume': 40100000.0,
+        'market_cap': 501700000000.0,
+        'pe_ratio': None,
+        'week_52_change_percent': -3.2,
+        'week_52_low': 30.1,
+        'week_52_high': 42.8,
+    }
+
+
+def test_column_map_skips_unusable_rows():
+    column_map = ColumnMap.compile(['symbol', 'name', 'price'])
+
+    rows = column_map.convert([
+        ['Symbol', 'Name', 'Price'],
+        ['', 'No symbol', '1.00'],
+        ['SHORT'],
+        ['OK3', 'Ok', '1.00'],
+    ])
+
+    assert [row['symbol'] for row in rows] == ['OK3']
+
+
+def test_column_map_defaults_to_first_columns():
+    column_map = ColumnMap.compile([])
+
+    [row] = column_map.convert([['A3', 'Alpha', '2.50']])
+
+    assert (row['symbol'], row['name'], row['price']) == ('A3', 'Alpha', 2.5)
+
+
+def test_typed_row():
+    assert typed_row({'symbol': 'A', 'price': '1.50', 'volume': ''}) == {
+        'symbol': 'A',
+        'price': 1.5,
+        'volume': None,
+    }
+
+
+def test_quote_fields_follow_the_schema():
+    assert [field.name for field in fields(Quote)] == FIELD_NAMES
+
+
+def test_quote_reads_like_a_dict():
+    quote = Quote(symbol='A3', name='Alpha', price=2.5)
+
+    assert quote['price'] == 2.5  # noqa: PLR2004
+    assert quote.get('volume') is None
+    assert quote.get('missing', 'default') == 'default'
+    assert 'symbol' in quote
+    assert {**quote, 'change': 'added'}['change'] == 'added'
+    with pytest.raises(KeyError):
+        quote['get']
+
+
+def test_quote_is_smaller_than_a_dict():
+    quote = Quote(symbol='A3', name='Alpha', price=2.5)
+
+    assert not hasattr(quote, '__dict__')
+    assert sys.getsizeof(quote) < sys.getsizeof(dict(quote)) / 2
+    assert pickle.loads(pickle.dumps(quote)) == quote
+
+
+def test_row_values():
+    assert row_values(Quote(symbol='A3', price=2.5))[:3] == ('A3', None, 2.5)
+    assert row_values({'symbol': 'A3', 'price': 2.5})[:3] == (
+        'A3',
+        None,
+        2.5,
+    )
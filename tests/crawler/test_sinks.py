@@ -0,0 +1,220 @@
+import json
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from src.crawler.schema import Quote
+from src.crawler.sinks import (
+    FIELDNAMES,
+    CsvSink,
+    NdjsonSink,
+    ParquetSink,
+    SqliteSink,
+    create_sink,
+    snapshot_path,
+)
+
+ROWS = [
+    {'symbol': 'A', 'name': 'Alpha', 'price': '1.00'},
+    {'symbol': 'B', 'name': 'Beta, Inc.', 'price': '2.00'},
+]
+
+
+@pytest.fixture
+def sink(tmp_path):
+    return CsvSink('United States', str(tmp_path), buffer_size=2)
+
+
+def test_snapshot_path():
+    assert snapshot_path('United States', 'csv', 'cdn', 1700000000) == (
+        'cdn/1700000000_yahoo_finance_crawler_United_States.csv'
+    )
+
+
+def test_write_buffers_until_buffer_size(sink):
+    sink.write(ROWS[:1])
+
+    assert sink.rows_written == 0
+    assert sink.temp_path.endswith('_United_States.csv.part')
+
+    sink.write(ROWS[1:])
+
+    assert sink.rows_written == len(ROWS)
+
+
+def test_csv_sink_writes_quotes_and_dicts(sink):
+    sink.write([Quote(symbol='A', name='Alpha', price=1.0), ROWS[1]])
+
+    with open(sink.close(), encoding='utf-8') as f:
+        _, quote, row = f.read().splitlines()
+    assert quote.startswith('"A","Alpha","1.0",""')
+    assert row.startswith('"B","Beta, Inc.","2.00",""')
+
+
+def test_write_flushes_after_interval(sink):
+    sink.flush_interval = 0
+
+    sink.write(ROWS[:1])
+
+    assert sink.rows_written == 1
+
+
+def test_close_renames_atomically(sink, tmp_path):
+    sink.write(ROWS[:1])
+
+    with patch('src.crawler.sinks.replace', wraps=os.replace) as mock_replace:
+        final_path = sink.close()
+
+    mock_replace.assert_called_once_with(f'{final_path}.part', final_path)
+    assert [path.name for path in tmp_path.iterdir()] == [
+        final_path.rsplit('/', 1)[1]
+    ]
+    with open(final_path, encoding='utf-8') as f:
+        header, row = f.read().splitlines()
+    assert header == ','.join(f'"{name}"' for name in FIELDNAMES)
+    assert row.startswith('"A","Alpha","1.00",""')
+
+
+def test_close_without_rows(sink, tmp_path):
+    sink.write([])
+
+    assert sink.close() is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_abort_keeps_partial_file(sink, tmp_path):
+    sink.write(ROWS)
+    sink.write([{'symbol': 'C', 'name': 'Gamma', 'price': '3.00'}])
+
+    sink.abort()
+
+    [part_file] = tmp_path.iterdir()
+    assert part_file.name.endswith('.csv.part')
+    assert (
+        len(part_file.read_text().splitlines()) == len(['header', *ROWS]) + 1
+    )
+
+
+def test_sinks_parse_numbers_like_the_schema(tmp_path):
+    EXPECTED = (1.5e6, -0.5)
+    row = {**ROWS[0], 'volume': '1.5M', 'change_percent': '-0.5%'}
+
+    ndjson = NdjsonSink('Brazil', str(tmp_path))
+    ndjson.write([row])
+    with open(ndjson.close(), encoding='utf-8') as f:
+        line = json.loads(f.readline())
+
+    sqlite = SqliteSink('Brazil', str(tmp_path))
+    sqlite.write([row])
+    with sqlite3.connect(sqlite.close()) as connection:
+        stored = connection.execute(
+            'SELECT volume, change_percent FROM quotes'
+        ).fetchone()
+    connection.close()
+
+    assert (line['volume'], line['change_percent']) == EXPECTED
+    assert stored == EXPECTED
+
+
+def test_create_sink(tmp_path):
+    assert isinstance(
+        create_sink('sqlite', 'Brazil', str(tmp_path)), SqliteSink
+    )
+
+    with pytest.raises(ValueError, match='Unknown output'):
+        create_sink('xml', 'Brazil', str(tmp_path))
+
+
+def test_ndjson_sink(tmp_path):
+    sink = NdjsonSink('Brazil', str(tmp_path))
+    sink.write(ROWS)
+
+    final_path = sink.close()
+
+    with open(final_path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    empty = dict.fromkeys(FIELDNAMES)
+    assert lines == [
+        {
+            'region': 'Brazil',
+            **empty,
+            'symbol': 'A',
+            'name': 'Alpha',
+            'price': 1.0,
+            'crawled_at': sink.crawled_at,
+        },
+        {
+            'region': 'Brazil',
+            **empty,
+            'symbol': 'B',
+            'name': 'Beta, Inc.',
+            'price': 2.0,
+            'crawled_at': sink.crawled_at,
+        },
+    ]
+
+
+def test_sqlite_sink_appends_snapshots(tmp_path):
+    sink = SqliteSink('Brazil', str(tmp_path), buffer_size=1)
+    sink.write(ROWS)
+    final_path = sink.close()
+
+    aborted = SqliteSink('Chile', str(tmp_path), buffer_size=1)
+    aborted.write(ROWS[:1])
+    aborted.abort()
+
+    with sqlite3.connect(final_path) as connection:
+        quotes = connection.execute(
+            'SELECT region, symbol, price FROM quotes ORDER BY region, symbol'
+        ).fetchall()
+        snapshots = connection.execute(
+            'SELECT region, rows, complete FROM snapshots ORDER BY region'
+        ).fetchall()
+        indexes = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        ).fetchall()
+
+    assert quotes == [
+        ('Brazil', 'A', 1.0),
+        ('Brazil', 'B', 2.0),
+        ('Chile', 'A', 1.0),
+    ]
+    assert snapshots == [('Brazil', 2, 1), ('Chile', 0, 0)]
+    assert ('quotes_region_symbol_crawled_at',) in indexes
+
+
+def test_sqlite_sink_adds_missing_columns(tmp_path):
+    EXPECTED_VOLUME = 1500.0
+    database = tmp_path / 'yahoo_finance_crawler.sqlite'
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            'CREATE TABLE quotes (region TEXT NOT NULL, symbol TEXT NOT NULL, '
+            'name TEXT, price REAL, crawled_at INTEGER NOT NULL)'
+        )
+    connection.close()
+
+    sink = SqliteSink('Brazil', str(tmp_path), buffer_size=1)
+    sink.write([{**ROWS[0], 'volume': 1500.0}])
+    sink.close()
+
+    with sqlite3.connect(database) as connection:
+        [(volume, market_cap)] = connection.execute(
+            'SELECT volume, market_cap FROM quotes'
+        ).fetchall()
+    connection.close()
+    assert (volume, market_cap) == (EXPECTED_VOLUME, None)
+
+
+def test_parquet_sink(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    sink = ParquetSink('Brazil', str(tmp_path), buffer_size=1)
+    sink.write(ROWS)
+
+    table = pq.read_table(sink.close())
+
+    assert table.column('price').to_pylist() == [1.0, 2.0]
+    assert str(table.schema.field('symbol').type) == (
+        'dictionary<values=string, indices=int32, ordered=0>'
+    )
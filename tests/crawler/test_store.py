@@ -0,0 +1,90 @@
+import pytest
+
+from src.crawler.store import RowStore
+
+
+def make_row(symbol, price='1.00', name='Company'):
+    return {'symbol': symbol, 'name': name, 'price': price}
+
+
+def test_add_new_rows_keeps_order():
+    EXPECTED_ROWS = 2
+    store = RowStore()
+
+    assert store.add(make_row('A')) is True
+    assert store.add(make_row('B')) is True
+
+    assert len(store) == EXPECTED_ROWS
+    assert [row['symbol'] for row in store] == ['A', 'B']
+    assert 'A' in store
+    assert store.get('B')['symbol'] == 'B'
+    assert store.get('C') is None
+
+
+def test_keep_first_policy_drops_duplicates():
+    store = RowStore('first')
+    store.add(make_row('A', '1.00'))
+
+    assert store.add(make_row('A', '2.00')) is False
+    assert store.get('A')['price'] == '1.00'
+    assert len(store) == 1
+
+
+def test_keep_last_policy_replaces_in_place():
+    store = RowStore('last')
+    store.add(make_row('A', '1.00'))
+    store.add(make_row('B', '3.00'))
+
+    assert store.add(make_row('A', '2.00')) is False
+    assert store[0]['price'] == '2.00'
+    assert store.conflicts == []
+
+
+def test_flag_policy_records_price_changes():
+    store = RowStore('flag')
+    store.add(make_row('A', '1.00'))
+    store.add(make_row('A', '1.00'))
+    store.add(make_row('A', '2.00'))
+
+    assert store.get('A')['price'] == '2.00'
+    assert store.conflicts == [
+        {'symbol': 'A', 'old_price': '1.00', 'new_price': '2.00'}
+    ]
+
+
+def test_clear():
+    store = RowStore()
+    store.add(make_row('A'))
+
+    assert list(store) == [make_row('A')]
+
+    store.clear()
+
+    assert not list(store)
+    assert 'A' not in store
+
+
+def test_store_is_not_equal_to_a_list():
+    store = RowStore()
+    store.add(make_row('A'))
+
+    assert store != [make_row('A')]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError, match='Unknown conflict policy'):
+        RowStore('newest')
+
+
+def test_index_only_store_keeps_no_rows():
+    store = RowStore('flag', keep_rows=False)
+
+    assert store.add(make_row('A', '1.00')) is True
+    assert store.add(make_row('A', '2.00')) is False
+
+    assert len(store) == 1
+    assert 'A' in store
+    assert list(store) == []
+    assert store.conflicts == [
+        {'symbol': 'A', 'old_price': '1.00', 'new_price': '2.00'}
+    ]
@@ -0,0 +1,202 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.crawler.core import YahooFinanceCrawler
+from src.crawler.parsing import parse_table
+from src.crawler.synthetic import FakeDriver, SyntheticScreener
+
+EXPECTED_ROWS = 30
+
+
+def test_screener_is_deterministic():
+    first = SyntheticScreener(rows_per_page=5, pages=2, seed=1)
+    second = SyntheticScreener(rows_per_page=5, pages=2, seed=1)
+
+    assert first.page_html(2) == second.page_html(2)
+
+
+def test_page_html_parses_like_the_screener():
+    screener = SyntheticScreener(rows_per_page=5, pages=2, extra_columns=3)
+
+    headers, rows = parse_table(screener.page_html(1))
+
+    assert headers[:3] == ['symbol', 'name', 'price (intraday)']
+    assert len(headers) == len(['symbol', 'name', 'price', 1, 2, 3])
+    assert rows == screener.rows(1)
+    assert screener.label(2) == '6-10 of 10'
+
+
+def test_noise_is_added_around_the_table():
+    plain = SyntheticScreener(rows_per_page=5, pages=1)
+    noisy = SyntheticScreener(rows_per_page=5, pages=1, noise_kb=10)
+
+    extra = len(noisy.page_html(1)) - len(plain.page_html(1))
+    assert extra >= 10 * 1024
+    assert noisy.table_html(1) == plain.table_html(1)
+
+
+def test_duplicates_repeat_the_previous_page():
+    screener = SyntheticScreener(
+        rows_per_page=10, pages=2, duplicate_ratio=0.3
+    )
+
+    assert screener.rows(2)[:3] == screener.rows(1)[-3:]
+
+
+@pytest.mark.parametrize('extract_mode', ['page', 'fragment', 'cells'])
+def test_fake_driver_runs_the_crawler_pipeline(extract_mode, tmp_path):
+    screener = SyntheticScreener(rows_per_page=10, pages=3)
+    driver = FakeDriver(screener)
+    crawler = YahooFinanceCrawler(
+        region='Benchmark',
+        base_url=screener.url,
+        driver=driver,
+        extract_mode=extract_mode,
+        output_dir=str(tmp_path),
+    )
+
+    crawler._scrape_all_pages()
+    crawler._save_output()
+
+    assert len(crawler.data) == EXPECTED_ROWS
+    assert crawler.data[0]['symbol'] == screener.rows(1)[0][0]
+    assert driver.page == screener.pages
+    [csv_file] = tmp_path.glob('*.csv')
+    assert len(csv_file.read_text().splitlines()) == EXPECTED_ROWS + 1
+    assert [timing.reason for timing in crawler.waiter.timings] == [
+        'symbol',
+        'symbol',
+    ]
+
+
+@pytest.mark.parametrize('extract_mode', ['page', 'fragment'])
+def test_parse_workers_keep_the_page_order(extract_mode, tmp_path):
+    screener = SyntheticScreener(
+        rows_per_page=10, pages=3, duplicate_ratio=0.2
+    )
+    crawlers = [
+        YahooFinanceCrawler(
+            region='Benchmark',
+            base_url=screener.url,
+            driver=FakeDriver(screener),
+            extract_mode=extract_mode,
+            output_dir=str(tmp_path / str(workers)),
+            checkpoint=True,
+            parse_workers=workers,
+        )
+        for workers in (0, 2)
+    ]
+
+    for crawler in crawlers:
+        crawler._scrape_all_pages()
+
+    inline, pipelined = crawlers
+    assert list(pipelined.data) == list(inline.data)
+    assert pipelined.metrics.rows == inline.metrics.rows
+    assert [page.rows for page in pipelined.metrics.pages] == [
+        page.rows for page in inline.metrics.pages
+    ]
+    assert pipelined.checkpoints.load().page == screener.pages
+
+
+@pytest.mark.parametrize('parse_workers', [0, 2])
+def test_page_range_scrapes_only_its_pages(parse_workers, tmp_path):
+    screener = SyntheticScreener(rows_per_page=10, pages=5)
+    crawler = YahooFinanceCrawler(
+        region='Benchmark',
+        base_url=screener.url,
+        driver=FakeDriver(screener),
+        output_dir=str(tmp_path),
+        first_page=2,
+        last_page=3,
+        page_size=screener.rows_per_page,
+        parse_workers=parse_workers,
+    )
+
+    crawler._open_start_page()
+    crawler._scrape_all_pages()
+
+    expected = screener.rows(2) + screener.rows(3)
+    assert [row['symbol'] for row in crawler.data] == [
+        row[0] for row in expected
+    ]
+    assert crawler.total_pages == screener.pages
+
+
+def run_with_restarts(screener, tmp_path, region_selected=True, **options):
+    drivers = []
+
+    def new_driver(*args):
+        drivers.append(FakeDriver(screener))
+        return drivers[-1]
+
+    with (
+        patch('src.crawler.core.create_driver', side_effect=new_driver),
+        patch('src.crawler.core.dismiss_initial_popup'),
+        patch.object(
+            YahooFinanceCrawler,
+            '_region_selected',
+            return_value=region_selected,
+        ),
+        patch.object(YahooFinanceCrawler, '_restore_filter') as restore,
+    ):
+        crawler = YahooFinanceCrawler(
+            region='Benchmark',
+            base_url=screener.url,
+            output_dir=str(tmp_path),
+            restart_after_pages=2,
+            **options,
+        )
+        crawler.page_size = screener.rows_per_page
+        crawler._scrape_all_pages()
+    return crawler, drivers, restore
+
+
+@pytest.mark.parametrize('parse_workers', [0, 2])
+def test_worn_out_driver_is_restarted_on_the_next_page(
+    parse_workers, tmp_path
+):
+    screener = SyntheticScreener(rows_per_page=10, pages=5)
+
+    crawler, drivers, restore = run_with_restarts(
+        screener, tmp_path, parse_workers=parse_workers
+    )
+
+    assert [row['symbol'] for row in crawler.data] == [
+        row[0] for page in range(1, 6) for row in screener.rows(page)
+    ]
+    # pages 1-2, 3-4 and 5; nothing is left to restart for after page 4
+    assert len(drivers) == 3  # noqa: PLR2004
+    assert crawler.metrics.driver_restarts == 2  # noqa: PLR2004
+    assert [driver.quit_called for driver in drivers] == [True, True, False]
+    assert 'start=40' in drivers[-1].current_url
+    restore.assert_not_called()
+
+
+def test_restart_reapplies_a_lost_filter(tmp_path):
+    screener = SyntheticScreener(rows_per_page=10, pages=3)
+
+    crawler, _, restore = run_with_restarts(
+        screener, tmp_path, region_selected=False
+    )
+
+    restore.assert_called_once_with(3)
+    assert crawler.metrics.driver_restarts == 1
+
+
+def test_lent_driver_is_never_restarted(tmp_path):
+    screener = SyntheticScreener(rows_per_page=10, pages=3)
+    driver = FakeDriver(screener)
+    crawler = YahooFinanceCrawler(
+        region='Benchmark',
+        base_url=screener.url,
+        driver=driver,
+        output_dir=str(tmp_path),
+        restart_after_pages=1,
+    )
+
+    crawler._scrape_all_pages()
+
+    assert crawler.driver is driver
+    assert crawler.metrics.driver_restarts == 0
@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+
+from src.crawler.waits import TableState, TableWaiter
+
+TIMEOUT = 0.05
+
+
+def state(symbol='AAA', rows=25, label='1-25 of 100', mutations=0):
+    return {
+        'symbol': symbol,
+        'rows': rows,
+        'label': label,
+        'mutations': mutations,
+        'first': None,
+    }
+
+
+@pytest.fixture
+def driver():
+    return MagicMock()
+
+
+@pytest.fixture
+def waiter(driver):
+    return TableWaiter(driver, timeout=TIMEOUT, poll_frequency=0.01)
+
+
+def test_snapshot(waiter, driver):
+    first_row = MagicMock()
+    driver.execute_script.side_effect = [
+        None,
+        dict(state(), first=first_row),
+    ]
+
+    snapshot = waiter.snapshot()
+
+    assert snapshot == TableState(
+        symbol='AAA', rows=25, label='1-25 of 100', first_row=first_row
+    )
+
+
+@pytest.mark.parametrize(
+    ('new_state', 'reason'),
+    [
+        (state(symbol='BBB'), 'symbol'),
+        (state(label='26-50 of 100'), 'label'),
+        (state(rows=100), 'rows'),
+    ],
+)
+def test_wait_for_change_detects_change(waiter, driver, new_state, reason):
+    driver.execute_script.return_value = new_state
+    previous = TableState(symbol='AAA', rows=25, label='1-25 of 100')
+
+    timing = waiter.wait_for_change(previous, 'page 2')
+
+    assert timing.reason == reason
+    assert timing.label == 'page 2'
+    assert timing.seconds < TIMEOUT
+    assert waiter.timings == [timing]
+
+
+def test_wait_for_change_detects_stale_row(waiter, driver):
+    first_row = MagicMock()
+    first_row.is_enabled.side_effect = StaleElementReferenceException()
+    driver.execute_script.return_value = state()
+    previous = TableState(
+        symbol='AAA', rows=25, label='1-25 of 100', first_row=first_row
+    )
+
+    assert waiter.wait_for_change(previous, 'page 2').reason == 'stale'
+
+
+def test_wait_for_change_waits_for_mutations_to_settle(waiter, driver):
+    EXPECTED_POLLS = 3
+    driver.execute_script.side_effect = [
+        state(mutations=3),
+        state(mutations=5),
+        state(mutations=5),
+    ]
+    previous = TableState(symbol='AAA', rows=25, label='1-25 of 100')
+
+    timing = waiter.wait_for_change(previous, 'page 2')
+
+    assert timing.reason == 'mutation'
+    assert driver.execute_script.call_count == EXPECTED_POLLS
+
+
+def test_wait_for_change_times_out(waiter, driver):
+    driver.execute_script.return_value = state()
+    previous = TableState(symbol='AAA', rows=25, label='1-25 of 100')
+
+    timing = waiter.wait_for_change(previous, 'page 2')
+
+    assert timing.reason == 'timeout'
+    assert timing.seconds >= TIMEOUT
+
+
+def test_wait_for_change_ignores_empty_table(waiter, driver):
+    driver.execute_script.return_value = state(symbol=None, rows=0)
+    previous = TableState(symbol='AAA', rows=25, label='1-25 of 100')
+
+    assert waiter.wait_for_change(previous, 'page 2').reason == 'timeout'
@@ -2,12 +2,17 @@ import os
 import sys
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from src.app import main
+from src.crawler.pool import RegionResult
+
+EXPECTED_REPLAY_WORKERS = 4
 
 
 def test_main_default_args():
     """Testa se o main usa os argumentos padrão quando nenhum é passado."""
-    with patch('src.app.YahooFinanceCrawler') as mock_crawler_class:
+    with patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class:
         mock_instance = MagicMock()
         mock_crawler_class.return_value = mock_instance
 
@@ -21,14 +26,39 @@ def test_main_default_args():
 
         # O padrão no app.py é 'Brazil' e headless=True
         mock_crawler_class.assert_called_once_with(
-            region='Brazil', base_url='http://mock.url', headless=True
+            region='Brazil',
+            base_url='http://mock.url',
+            headless=True,
+            conflict_policy='first',
+            extract_mode='fragment',
+            parser='html.parser',
+            tabs=1,
+            parse_workers=0,
+            retries=None,
+            failure_threshold=5,
+            restart_after_pages=0,
+            max_browser_mb=None,
+            max_slowdown=3.0,
+            max_error_rate=0.5,
+            stream=False,
+            output='csv',
+            delta=False,
+            delta_stop_after=None,
+            checkpoint=True,
+            resume=False,
+            filter_cache=True,
+            filter_cache_ttl=24.0,
+            block_profile='default',
+            measure_weight=False,
+            metrics=False,
+            record=False,
         )
         mock_instance.run.assert_called_once()
 
 
 def test_main_custom_args():
     """Testa se o main usa os argumentos passados via CLI."""
-    with patch('src.app.YahooFinanceCrawler') as mock_crawler_class:
+    with patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class:
         mock_instance = MagicMock()
         mock_crawler_class.return_value = mock_instance
 
@@ -37,7 +67,50 @@ def test_main_custom_args():
             patch.object(
                 sys,
                 'argv',
-                ['app.py', '--region', 'United States', '--show-browser'],
+                [
+                    'app.py',
+                    '--region',
+                    'United States',
+                    '--show-browser',
+                    '--on-duplicate',
+                    'flag',
+                    '--extract-mode',
+                    'cells',
+                    '--parser',
+                    'lxml',
+                    '--tabs',
+                    '4',
+                    '--parse-workers',
+                    '2',
+                    '--retries',
+                    '2',
+                    '--failure-threshold',
+                    '3',
+                    '--restart-after-pages',
+                    '200',
+                    '--max-browser-mb',
+                    '1024',
+                    '--max-slowdown',
+                    '0',
+                    '--max-error-rate',
+                    '0.3',
+                    '--stream',
+                    '--output',
+                    'ndjson',
+                    '--delta',
+                    '--delta-stop-after',
+                    '3',
+                    '--no-checkpoint',
+                    '--resume',
+                    '--no-filter-cache',
+                    '--filter-cache-ttl',
+                    '6',
+                    '--block-profile',
+                    'off',
+                    '--measure-weight',
+                    '--metrics',
+                    '--record',
+                ],
             ),
             patch.dict(
                 os.environ, {'BASE_URL': 'http://mock.url'}, clear=True
@@ -47,7 +120,32 @@ def test_main_custom_args():
 
         # Se passou --show-browser, headless deve ser False
         mock_crawler_class.assert_called_once_with(
-            region='United States', base_url='http://mock.url', headless=False
+            region='United States',
+            base_url='http://mock.url',
+            headless=False,
+            conflict_policy='flag',
+            extract_mode='cells',
+            parser='lxml',
+            tabs=4,
+            parse_workers=2,
+            retries=2,
+            failure_threshold=3,
+            restart_after_pages=200,
+            max_browser_mb=1024.0,
+            max_slowdown=0.0,
+            max_error_rate=0.3,
+            stream=True,
+            output='ndjson',
+            delta=True,
+            delta_stop_after=3,
+            checkpoint=False,
+            resume=True,
+            filter_cache=False,
+            filter_cache_ttl=6.0,
+            block_profile='off',
+            measure_weight=True,
+            metrics=True,
+            record=True,
         )
         mock_instance.run.assert_called_once()
 
@@ -55,7 +153,9 @@ def test_main_custom_args():
 def test_main_missing_env_var():
     """Testa se o main loga erro e sai se BASE_URL não estiver definida."""
     with patch('src.app.logger') as mock_logger:
-        with patch('src.app.YahooFinanceCrawler') as mock_crawler_class:
+        with patch(
+            'src.crawler.core.YahooFinanceCrawler'
+        ) as mock_crawler_class:
             with (
                 patch.object(sys, 'argv', ['app.py']),
                 patch.dict(os.environ, {}, clear=True),
@@ -66,3 +166,432 @@ def test_main_missing_env_var():
                 'BASE_URL environment variable is not set'
             )
             mock_crawler_class.assert_not_called()
+
+
+def test_main_multiple_regions(tmp_path):
+    """Testa se --regions e --regions-file distribuem o trabalho no pool."""
+    regions_file = tmp_path / 'regions.txt'
+    regions_file.write_text('# comentário\nArgentina\n\nChile\n')
+
+    with (
+        patch('src.app.crawl_regions') as mock_crawl_regions,
+        patch('src.app.log_summary') as mock_log_summary,
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(
+            sys,
+            'argv',
+            [
+                'app.py',
+                '--regions',
+                'Brazil',
+                'United States',
+                '--regions-file',
+                str(regions_file),
+                '--workers',
+                '3',
+            ],
+        ),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        main()
+
+    mock_crawl_regions.assert_called_once_with(
+        ['Brazil', 'United States', 'Argentina', 'Chile'],
+        'http://mock.url',
+        workers=3,
+        crawler_class=mock_crawler_class,
+        headless=True,
+        conflict_policy='first',
+        extract_mode='fragment',
+        parser='html.parser',
+        tabs=1,
+        parse_workers=0,
+        retries=None,
+        failure_threshold=5,
+        restart_after_pages=0,
+        max_browser_mb=None,
+        max_slowdown=3.0,
+        max_error_rate=0.5,
+        stream=False,
+        output='csv',
+        delta=False,
+        delta_stop_after=None,
+        checkpoint=True,
+        resume=False,
+        filter_cache=True,
+        filter_cache_ttl=24.0,
+        block_profile='default',
+        measure_weight=False,
+        metrics=False,
+        record=False,
+    )
+    mock_log_summary.assert_called_once_with(mock_crawl_regions.return_value)
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_multiple_regions_exit_status():
+    """Testa se o main retorna 1 quando alguma região falhou."""
+    results = [
+        RegionResult(region='Brazil', rows=10),
+        RegionResult(region='Chile', error='RuntimeError: boom'),
+    ]
+    with (
+        patch('src.app.crawl_regions', return_value=results),
+        patch('src.app.log_summary'),
+        patch.object(sys, 'argv', ['app.py', '--regions', 'Brazil', 'Chile']),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        assert main() == 1
+
+        results.pop()
+        assert main() == 0
+
+
+def test_main_http_backend():
+    """Testa se --backend http usa o crawler sem navegador."""
+    with (
+        patch('src.crawler.api.YahooFinanceApiCrawler') as mock_api_class,
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(sys, 'argv', ['app.py', '--backend', 'http']),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        main()
+
+    mock_api_class.assert_called_once()
+    mock_api_class.return_value.run.assert_called_once()
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_daemon():
+    """Testa se --daemon sobe o daemon com as sessões configuradas."""
+    with (
+        patch('src.crawler.daemon.CrawlerDaemon') as mock_daemon_class,
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(
+            sys,
+            'argv',
+            [
+                'app.py',
+                '--daemon',
+                '--sessions',
+                '2',
+                '--recycle-after',
+                '5',
+                '--daemon-port',
+                '9000',
+            ],
+        ),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        main()
+
+    mock_daemon_class.assert_called_once_with(
+        'http://mock.url',
+        port=9000,
+        sessions=2,
+        recycle_after=5,
+        headless=True,
+        block_profile='default',
+    )
+    mock_daemon_class.return_value.serve_forever.assert_called_once()
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_submit_to_daemon():
+    """Testa se --submit envia cada região ao daemon sem abrir o Chrome."""
+    with (
+        patch('src.app.submit') as mock_submit,
+        patch('src.app.log_summary') as mock_log_summary,
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(
+            sys,
+            'argv',
+            ['app.py', '--submit', '--regions', 'Brazil', 'Chile'],
+        ),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        mock_submit.side_effect = [
+            {'ok': True, 'rows': 10, 'seconds': 1.5},
+            {'ok': False, 'error': 'TimeoutException: boom', 'seconds': 2.0},
+        ]
+        main()
+
+    regions = [call.args[0]['region'] for call in mock_submit.call_args_list]
+    assert regions == ['Brazil', 'Chile']
+    assert mock_submit.call_args.kwargs == {'port': 8765}
+    results = mock_log_summary.call_args.args[0]
+    assert results[0].ok
+    assert results[1].error == 'TimeoutException: boom'
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_enqueue_without_base_url(tmp_path):
+    """Testa se --enqueue enfileira as regiões sem BASE_URL nem navegador."""
+    queue_path = str(tmp_path / 'jobs.sqlite')
+    with (
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(
+            sys,
+            'argv',
+            [
+                'app.py',
+                '--enqueue',
+                '--regions',
+                'Brazil',
+                'Chile',
+                '--pages-per-job',
+                '10',
+                '--queue',
+                queue_path,
+            ],
+        ),
+        patch.dict(os.environ, {}, clear=True),
+    ):
+        main()
+
+    from src.crawler.jobs import JobQueue  # noqa: PLC0415
+
+    queue = JobQueue(queue_path)
+    job = queue.claim('test')
+    assert (job.region, job.first_page, job.last_page) == ('Brazil', 1, 10)
+    assert job.options['headless'] is True
+    assert queue.counts() == {'pending': 1, 'running': 1}
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_work_and_merge():
+    """Testa se --work sobe os workers e --merge junta os resultados."""
+    with (
+        patch('src.crawler.jobs.JobQueue') as mock_queue_class,
+        patch('src.crawler.jobs.run_workers') as mock_run_workers,
+        patch('src.crawler.jobs.merge_jobs') as mock_merge,
+        patch('src.app.log_summary') as mock_log_summary,
+        patch.object(
+            sys,
+            'argv',
+            [
+                'app.py',
+                '--work',
+                '--merge',
+                '--workers',
+                '3',
+                '--queue',
+                'jobs.sqlite',
+                '--lease',
+                '30',
+            ],
+        ),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        main()
+
+    mock_queue_class.assert_called_once_with('jobs.sqlite', 30.0)
+    queue = mock_queue_class.return_value
+    queue.enqueue.assert_not_called()
+    mock_run_workers.assert_called_once_with(
+        queue, 'http://mock.url', workers=3, headless=True
+    )
+    mock_merge.assert_called_once_with(queue, 'cdn')
+    mock_log_summary.assert_called_once_with(mock_merge.return_value)
+
+
+def test_main_work_needs_base_url():
+    """Testa se --work exige BASE_URL, pois os workers abrem o site."""
+    with (
+        patch('src.crawler.jobs.run_workers') as mock_run_workers,
+        patch.object(sys, 'argv', ['app.py', '--work']),
+        patch.dict(os.environ, {}, clear=True),
+    ):
+        main()
+
+    mock_run_workers.assert_not_called()
+
+
+def test_main_stream_rejects_replacing_duplicates():
+    """Testa se --stream recusa --on-duplicate last, que trocaria linhas."""
+    with (
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(
+            sys, 'argv', ['app.py', '--stream', '--on-duplicate', 'last']
+        ),
+        patch.dict(os.environ, {'BASE_URL': 'http://test.url'}),
+        pytest.raises(SystemExit),
+    ):
+        main()
+
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_delta_rejects_sqlite_output():
+    """Testa se --delta recusa a saída sqlite, sem arquivo por snapshot."""
+    with (
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(sys, 'argv', ['app.py', '--delta', '--output', 'sqlite']),
+        patch.dict(os.environ, {'BASE_URL': 'http://test.url'}),
+        pytest.raises(SystemExit),
+    ):
+        main()
+
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_serve_without_base_url():
+    """Testa se --serve sobe a API de consulta sem BASE_URL nem navegador."""
+    with (
+        patch('src.crawler.query.QueryServer') as mock_server_class,
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(
+            sys, 'argv', ['app.py', '--serve', '--query-port', '9100']
+        ),
+        patch.dict(os.environ, {}, clear=True),
+    ):
+        main()
+
+    mock_server_class.assert_called_once_with('cdn', port=9100)
+    mock_server_class.return_value.serve_forever.assert_called_once()
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_compare_blocking():
+    """Testa se --compare-blocking mede cada perfil e encerra sem coletar."""
+    with (
+        patch('src.app.compare_profiles') as mock_compare,
+        patch('src.app.log_comparison') as mock_log_comparison,
+        patch('src.crawler.core.create_driver') as mock_create_driver,
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(sys, 'argv', ['app.py', '--compare-blocking']),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        main()
+        url, profiles, driver_factory = mock_compare.call_args.args
+        driver_factory('strict')
+
+    assert url == 'http://mock.url'
+    assert profiles == ('off', 'default', 'strict')
+    mock_create_driver.assert_called_once_with(True, 'strict')
+    mock_log_comparison.assert_called_once_with(mock_compare.return_value)
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_multiple_regions_writes_run_report():
+    """Testa se --metrics com várias regiões grava o relatório agregado."""
+    results = [
+        MagicMock(metrics={'region': 'Brazil'}),
+        MagicMock(metrics=None),
+    ]
+    with (
+        patch('src.app.crawl_regions', return_value=results),
+        patch('src.app.log_summary'),
+        patch('src.app.write_run_report') as mock_write_run_report,
+        patch.object(
+            sys,
+            'argv',
+            ['app.py', '--regions', 'Brazil', 'Chile', '--metrics'],
+        ),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        main()
+
+    mock_write_run_report.assert_called_once_with(
+        [{'region': 'Brazil'}], 'cdn'
+    )
+
+
+def test_main_replay_backend():
+    """Testa se --backend replay roda sem BASE_URL e repassa o manifesto."""
+    with (
+        patch(
+            'src.crawler.replay.YahooFinanceReplayCrawler'
+        ) as mock_replay_class,
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(
+            sys,
+            'argv',
+            [
+                'app.py',
+                '--backend',
+                'replay',
+                '--replay-manifest',
+                'cdn/recordings/1_Brazil.json',
+                '--replay-workers',
+                '4',
+            ],
+        ),
+        patch.dict(os.environ, {}, clear=True),
+    ):
+        main()
+
+    kwargs = mock_replay_class.call_args.kwargs
+    assert kwargs['base_url'] is None
+    assert kwargs['manifest'] == 'cdn/recordings/1_Brazil.json'
+    assert kwargs['parse_workers'] == EXPECTED_REPLAY_WORKERS
+    mock_replay_class.return_value.run.assert_called_once()
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_schedule_reuses_warm_sessions(tmp_path):
+    """Testa se --schedule roda os jobs nas sessões aquecidas do daemon."""
+    EXPECTED_SESSIONS = 2
+    config = tmp_path / 'schedule.toml'
+    config.write_text(
+        'max_concurrency = 2\n'
+        '[[jobs]]\n'
+        'region = "Chile"\n'
+        'interval = "15m"\n'
+        'options = { output = "ndjson" }\n'
+    )
+    with (
+        patch('src.crawler.daemon.CrawlerDaemon') as mock_daemon_class,
+        patch('src.crawler.scheduler.Scheduler') as mock_scheduler_class,
+        patch('src.crawler.core.YahooFinanceCrawler') as mock_crawler_class,
+        patch.object(sys, 'argv', ['app.py', '--schedule', str(config)]),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        mock_daemon = mock_daemon_class.return_value
+        mock_daemon.run_job.return_value = {
+            'ok': True,
+            'rows': 10,
+            'seconds': 1.0,
+        }
+        main()
+
+        [jobs, run_job] = mock_scheduler_class.call_args.args
+        result = run_job('Chile', jobs[0].options)
+
+    assert mock_daemon_class.call_args.kwargs['sessions'] == EXPECTED_SESSIONS
+    mock_daemon.warm_up.assert_called_once()
+    mock_scheduler_class.return_value.run_forever.assert_called_once()
+    mock_daemon.close.assert_called_once()
+    job = mock_daemon.run_job.call_args.args[0]
+    assert job['region'] == 'Chile'
+    assert job['options']['output'] == 'ndjson'
+    assert job['options']['extract_mode'] == 'fragment'
+    assert result.ok
+    mock_crawler_class.assert_not_called()
+
+
+def test_main_schedule_http_backend(tmp_path):
+    """Testa se --schedule com --backend http coleta sem navegador."""
+    config = tmp_path / 'schedule.toml'
+    config.write_text('[[jobs]]\nregion = "Chile"\ncron = "0 * * * *"\n')
+    with (
+        patch('src.crawler.daemon.CrawlerDaemon') as mock_daemon_class,
+        patch('src.crawler.scheduler.Scheduler') as mock_scheduler_class,
+        patch('src.app.crawl_region') as mock_crawl_region,
+        patch('src.crawler.api.YahooFinanceApiCrawler') as mock_api_class,
+        patch.object(
+            sys,
+            'argv',
+            ['app.py', '--schedule', str(config), '--backend', 'http'],
+        ),
+        patch.dict(os.environ, {'BASE_URL': 'http://mock.url'}, clear=True),
+    ):
+        main()
+        [_, run_job] = mock_scheduler_class.call_args.args
+        run_job('Chile', {})
+
+    mock_daemon_class.assert_not_called()
+    assert mock_crawl_region.call_args.args == ('Chile', 'http://mock.url')
+    assert mock_crawl_region.call_args.kwargs['crawler_class'] is (
+        mock_api_class
+    )